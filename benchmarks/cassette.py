@@ -0,0 +1,312 @@
+"""
+Record and replay the model and MCP tool calls of the chatbot graph.
+
+In record mode the graph runs against the real clients, and every chat model
+call (plain, with tools and structured output) and every MCP tool invocation
+made by ``chatbot.py`` is captured with its latency. In replay mode the
+recorded responses are served back without any network access, after their
+recorded latency multiplied by ``latency_scale`` (``0`` measures the pure
+framework overhead of the graph).
+
+Both modes swap ``chatbot._get_azure_chat_model`` and ``chatbot.get_mcp_tools``,
+the same seams the tests and ``state_bench`` use.
+
+A cassette is a JSONL file: a header line followed by one interaction per
+line. Interactions are matched by a hash of their request; when a request was
+not recorded verbatim (for example because fan-out branches completed in a
+different order and the assembler input changed), the next unused
+interaction of the same kind is served and counted as a fallback.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """A call had no recorded interaction left to replay."""
+
+
+class ReplayedError(RuntimeError):
+    """An error raised by a call during recording, raised again on replay."""
+
+
+def _message_fingerprint(message: Any) -> Any:
+    if isinstance(message, BaseMessage):
+        tool_calls = [(c["name"], c["args"]) for c in getattr(message, "tool_calls", None) or []]
+        return [message.type, message.content, tool_calls]
+    if isinstance(message, dict):
+        return [message.get("role"), message.get("content")]
+    return [type(message).__name__, str(message)]
+
+
+def request_key(channel: str, request: Any) -> str:
+    """Stable hash of a call's channel and request."""
+    if isinstance(request, list):
+        request = [_message_fingerprint(m) for m in request]
+    payload = json.dumps([channel, request], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _dump_request(request: Any) -> Any:
+    if isinstance(request, list):
+        return [message_to_dict(m) if isinstance(m, BaseMessage) else m for m in request]
+    return request
+
+
+class Cassette:
+    """Recorded interactions of one or more conversations."""
+
+    def __init__(self, interactions: Optional[List[Dict[str, Any]]] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.interactions: List[Dict[str, Any]] = interactions or []
+        self.metadata = metadata or {}
+        self._by_key: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_channel: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.stats = {"served": 0, "fallbacks": 0, "replayed_latency_s": 0.0}
+        self.rewind()
+
+    def rewind(self) -> None:
+        """Make every interaction available for replay again."""
+        self._by_key.clear()
+        self._by_channel.clear()
+        for interaction in self.interactions:
+            interaction["_used"] = False
+            self._by_key[interaction["key"]].append(interaction)
+            self._by_channel[interaction["channel"]].append(interaction)
+        self.stats = {"served": 0, "fallbacks": 0, "replayed_latency_s": 0.0}
+
+    def record(self, channel: str, request: Any, response: Any = None, error: Optional[BaseException] = None, latency: float = 0.0) -> None:
+        interaction = {
+            "channel": channel,
+            "key": request_key(channel, request),
+            "request": _dump_request(request),
+            "response": response,
+            "error": {"type": type(error).__name__, "message": str(error)} if error is not None else None,
+            "latency_s": round(latency, 6),
+        }
+        self.interactions.append(interaction)
+
+    def take(self, channel: str, request: Any) -> Dict[str, Any]:
+        """Next unused interaction for a request, falling back to its channel."""
+        for pool, fallback in ((self._by_key[request_key(channel, request)], False), (self._by_channel[channel], True)):
+            while pool and pool[0]["_used"]:
+                pool.popleft()
+            if pool:
+                interaction = pool.popleft()
+                interaction["_used"] = True
+                self.stats["served"] += 1
+                self.stats["fallbacks"] += int(fallback)
+                self.stats["replayed_latency_s"] += interaction["latency_s"]
+                return interaction
+        raise CassetteMiss(f"No recorded interaction left for {channel}")
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, **self.metadata}) + "\n")
+            for interaction in self.interactions:
+                row = {k: v for k, v in interaction.items() if k != "_used"}
+                f.write(json.dumps(row, default=str) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path) as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version {header.get('version')} in {path}")
+            interactions = [json.loads(line) for line in f if line.strip()]
+        return cls(interactions, {k: v for k, v in header.items() if k != "version"})
+
+
+# Serialized form of model responses
+
+def _dump_response(response: Any) -> Dict[str, Any]:
+    if isinstance(response, BaseMessage):
+        return {"message": message_to_dict(response)}
+    if hasattr(response, "model_dump"):
+        return {"structured": response.model_dump(mode="json")}
+    return {"value": response}
+
+
+def _load_response(data: Dict[str, Any], schema: Optional[type]) -> Any:
+    if "message" in data:
+        return messages_from_dict([data["message"]])[0]
+    if "structured" in data:
+        return schema(**data["structured"]) if schema is not None else data["structured"]
+    return data["value"]
+
+
+# Record mode
+
+class RecordingModel:
+    """Chat model wrapper that records every ``ainvoke``."""
+
+    def __init__(self, inner: Any, cassette: Cassette, channel: str = "model") -> None:
+        self._inner = inner
+        self._cassette = cassette
+        self._channel = channel
+
+    def with_structured_output(self, schema: type, **kwargs: Any) -> "RecordingModel":
+        return RecordingModel(self._inner.with_structured_output(schema, **kwargs), self._cassette, f"structured:{schema.__name__}")
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "RecordingModel":
+        return RecordingModel(self._inner.bind_tools(tools, **kwargs), self._cassette, "model_with_tools")
+
+    def with_config(self, *args: Any, **kwargs: Any) -> "RecordingModel":
+        return RecordingModel(self._inner.with_config(*args, **kwargs), self._cassette, self._channel)
+
+    def bind(self, **kwargs: Any) -> "RecordingModel":
+        return RecordingModel(self._inner.bind(**kwargs), self._cassette, self._channel)
+
+    async def ainvoke(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            response = await self._inner.ainvoke(messages, *args, **kwargs)
+        except Exception as e:
+            self._cassette.record(self._channel, messages, error=e, latency=time.perf_counter() - started)
+            raise
+        self._cassette.record(self._channel, messages, _dump_response(response), latency=time.perf_counter() - started)
+        return response
+
+
+def recording_tools(tools: List[Any], cassette: Cassette) -> List[Any]:
+    """Wrap MCP tools so that every invocation is recorded (and binding still works)."""
+    from langchain_core.tools import StructuredTool
+
+    def recorded(tool: Any) -> Any:
+        async def call_tool(**arguments: Any) -> Any:
+            channel = f"tool:{tool.name}"
+            started = time.perf_counter()
+            try:
+                result = await tool.ainvoke(arguments)
+            except Exception as e:
+                cassette.record(channel, arguments, error=e, latency=time.perf_counter() - started)
+                raise
+            cassette.record(channel, arguments, {"value": result}, latency=time.perf_counter() - started)
+            return result
+        return call_tool
+
+    return [
+        StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            coroutine=recorded(tool),
+            metadata=tool.metadata,
+        )
+        for tool in tools
+    ]
+
+
+# Replay mode
+
+async def _replay(cassette: Cassette, channel: str, request: Any, latency_scale: float) -> Dict[str, Any]:
+    interaction = cassette.take(channel, request)
+    # Always yield to the event loop, like a real network call
+    await asyncio.sleep(interaction["latency_s"] * latency_scale)
+    if interaction["error"]:
+        error = interaction["error"]
+        raise ReplayedError(f"{error['type']}: {error['message']}")
+    return interaction["response"]
+
+
+class ReplayModel:
+    """Chat model stand-in serving recorded responses."""
+
+    def __init__(self, cassette: Cassette, latency_scale: float, channel: str = "model", schema: Optional[type] = None) -> None:
+        self._cassette = cassette
+        self._latency_scale = latency_scale
+        self._channel = channel
+        self._schema = schema
+
+    def with_structured_output(self, schema: type, **kwargs: Any) -> "ReplayModel":
+        return ReplayModel(self._cassette, self._latency_scale, f"structured:{schema.__name__}", schema)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayModel":
+        return ReplayModel(self._cassette, self._latency_scale, "model_with_tools")
+
+    def with_config(self, *args: Any, **kwargs: Any) -> "ReplayModel":
+        return self
+
+    def bind(self, **kwargs: Any) -> "ReplayModel":
+        return self
+
+    async def ainvoke(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        response = await _replay(self._cassette, self._channel, messages, self._latency_scale)
+        return _load_response(response, self._schema)
+
+
+class ReplayTool:
+    """MCP tool stand-in serving recorded results."""
+
+    def __init__(self, name: str, cassette: Cassette, latency_scale: float) -> None:
+        self.name = name
+        self.description = f"Replayed tool {name}"
+        self._cassette = cassette
+        self._latency_scale = latency_scale
+
+    async def ainvoke(self, arguments: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        response = await _replay(self._cassette, f"tool:{self.name}", arguments, self._latency_scale)
+        return response["value"]
+
+
+def replay_tools(cassette: Cassette, latency_scale: float) -> List[ReplayTool]:
+    names = sorted({i["channel"][len("tool:"):] for i in cassette.interactions if i["channel"].startswith("tool:")})
+    return [ReplayTool(name, cassette, latency_scale) for name in names]
+
+
+# Installing into the chatbot module
+
+@contextmanager
+def _patched(chatbot: Any, get_model: Any, get_tools: Any) -> Iterator[None]:
+    original = (chatbot._get_azure_chat_model, chatbot.get_mcp_tools)
+    chatbot._get_azure_chat_model, chatbot.get_mcp_tools = get_model, get_tools
+    try:
+        yield
+    finally:
+        chatbot._get_azure_chat_model, chatbot.get_mcp_tools = original
+
+
+@contextmanager
+def recording(chatbot: Any, cassette: Cassette) -> Iterator[Cassette]:
+    """Record the model and tool calls of ``chatbot`` (the module) into ``cassette``."""
+    get_model, get_tools = chatbot._get_azure_chat_model, chatbot.get_mcp_tools
+    models: Dict[int, RecordingModel] = {}
+    wrapped_tools: Dict[int, List[Any]] = {}
+
+    def get_recording_model(*args: Any, **kwargs: Any) -> RecordingModel:
+        inner = get_model(*args, **kwargs)
+        # One wrapper per pooled model, so the runnable caches in clients stay warm
+        model = models.get(id(inner))
+        if model is None or model._inner is not inner:
+            model = models[id(inner)] = RecordingModel(inner, cassette)
+        return model
+
+    async def get_recording_tools(configuration: Any) -> List[Any]:
+        tools = await get_tools(configuration)
+        if id(tools) not in wrapped_tools:
+            wrapped_tools[id(tools)] = recording_tools(tools, cassette)
+        return wrapped_tools[id(tools)]
+
+    with _patched(chatbot, get_recording_model, get_recording_tools):
+        yield cassette
+
+
+@contextmanager
+def replaying(chatbot: Any, cassette: Cassette, latency_scale: float = 1.0) -> Iterator[Cassette]:
+    """Serve the model and tool calls of ``chatbot`` (the module) from ``cassette``."""
+    model = ReplayModel(cassette, latency_scale)
+    tools = replay_tools(cassette, latency_scale)
+
+    async def get_replay_tools(configuration: Any) -> List[Any]:
+        return tools
+
+    with _patched(chatbot, lambda *args, **kwargs: model, get_replay_tools):
+        yield cassette
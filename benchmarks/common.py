@@ -0,0 +1,102 @@
+"""Shared helpers for benchmarks: subprocess management, readiness and reporting."""
+
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+import httpx
+
+from src.api_support_chatbot.utils import percentile
+
+LLM_PORT = 9100
+MCP_PORT = 9101
+SERVICE_PORT = 9102
+
+
+def summarize_latencies(latencies: List[float], elapsed: float, errors: int) -> Dict[str, Any]:
+    """Summarize request latencies (seconds) into a report dictionary."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def memory_usage() -> Dict[str, float]:
+    """Current and peak resident memory of this process in MiB."""
+    with open("/proc/self/statm") as f:
+        rss_pages = int(f.read().split()[1])
+    current = rss_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    # ru_maxrss is KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"rss_mib": round(current, 1), "peak_rss_mib": round(peak, 1)}
+
+
+def mock_env(llm_port: int = LLM_PORT, mcp_port: int = MCP_PORT) -> Dict[str, str]:
+    """Environment pointing the chatbot at the local mock servers."""
+    return dict(
+        os.environ,
+        AZURE_OPENAI_ENDPOINT=f"http://127.0.0.1:{llm_port}",
+        AZURE_OPENAI_API_KEY="mock-key",
+        MCP_API_SUPPORT_SERVER_URL=f"http://127.0.0.1:{mcp_port}/mcp",
+        MCP_API_SUPPORT_SERVER_TRANSPORT="streamable_http",
+    )
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0, expect_ok: bool = False) -> None:
+    """Poll a URL until it answers (any status, or 2xx with ``expect_ok``) or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(url, timeout=1.0)
+                if not expect_ok or response.is_success:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} not ready after {timeout} seconds")
+
+
+@contextmanager
+def spawn(args: List[str], env: Dict[str, str]) -> Iterator[subprocess.Popen]:
+    """Run a subprocess for the duration of the context."""
+    process = subprocess.Popen(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@contextmanager
+def mock_servers(
+    llm_args: List[str] = (),
+    mcp_args: List[str] = (),
+    llm_port: int = LLM_PORT,
+    mcp_port: int = MCP_PORT,
+) -> Iterator[Dict[str, str]]:
+    """Run the mock LLM and MCP servers; yields the environment to reach them."""
+    env = mock_env(llm_port, mcp_port)
+    python = sys.executable
+    with spawn([python, "-m", "benchmarks.mock_llm", "--port", str(llm_port), *llm_args], env), \
+         spawn([python, "-m", "benchmarks.mock_mcp", "--port", str(mcp_port), *mcp_args], env):
+        asyncio.run(_wait_for_mocks(llm_port, mcp_port))
+        yield env
+
+
+async def _wait_for_mocks(llm_port: int, mcp_port: int) -> None:
+    await wait_until_ready(f"http://127.0.0.1:{llm_port}/_config")
+    await wait_until_ready(f"http://127.0.0.1:{mcp_port}/mcp")
@@ -0,0 +1,77 @@
+"""
+Configuration resolution benchmark.
+
+Usage:
+    python -m benchmarks.config_bench --calls 10000
+
+Every graph node resolves its ``Configuration`` from the runnable config.
+This reports the cost of one resolution with the cache (as nodes do) and
+without it (validating a new model and reading the environment each time,
+as before), and the resulting overhead per conversation turn.
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict
+
+from src.api_support_chatbot.configuration import (
+    Configuration,
+    clear_configuration_cache,
+)
+
+# Nodes that resolve the configuration in one turn with a single request item
+NODE_CALLS_PER_TURN = 4
+
+
+def sample_configurable(overrides: bool) -> Dict[str, Any]:
+    """A configurable as seen by a node, with LangGraph's runtime keys."""
+    configurable = {
+        "thread_id": "5f0c2d8e",
+        "checkpoint_ns": "",
+        "checkpoint_id": "1ef4f797-8335-6428-8001-8a1503f9b875",
+        "__pregel_task_id": "7a1e",
+        "langgraph_step": 3,
+        "langgraph_node": "generate_response",
+    }
+    if overrides:
+        configurable.update(max_retries=2, enable_request_coalescing=False, azure_openai_deployment_name="gpt-4o")
+    return configurable
+
+
+def time_per_call(fn: Callable[[], Any], calls: int) -> float:
+    """Mean microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def uncached(config: Dict[str, Any]) -> Configuration:
+    """Resolution without the cache: validate and read the environment every call."""
+    return Configuration(**config["configurable"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure per-node configuration resolution cost")
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {}
+    for name, overrides in (("defaults", False), ("overrides", True)):
+        config = {"configurable": sample_configurable(overrides)}
+        clear_configuration_cache()
+        cached_us = time_per_call(lambda: Configuration.from_runnable_config(config), args.calls)
+        uncached_us = time_per_call(lambda: uncached(config), args.calls)
+        report[name] = {
+            "cached_us": round(cached_us, 2),
+            "uncached_us": round(uncached_us, 2),
+            "cached_us_per_turn": round(cached_us * NODE_CALLS_PER_TURN, 2),
+            "uncached_us_per_turn": round(uncached_us * NODE_CALLS_PER_TURN, 2),
+        }
+    report["settings"] = vars(args)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Evaluation harness: answer quality against latency for configuration variants.
+
+Usage:
+    # Local stand-in model and MCP server (CI)
+    python -m benchmarks.eval_bench --mocks --output benchmarks/results/eval.json
+
+    # Configured Azure OpenAI and MCP servers
+    python -m benchmarks.eval_bench --variants benchmarks/eval/variants.json --baseline baseline
+
+Every labelled conversation (``benchmarks/eval/conversations.jsonl``, the
+batch input format plus an ``expected`` object for the last turn) is run
+through ``create_chatbot_graph()`` once per variant. A variant is a name and
+a set of ``configurable`` overrides, i.e. any ``Configuration`` field
+(``model_temperature``, ``max_tokens``, ``azure_openai_deployment_name``,
+``response_agent_max_iterations``, ...). The report puts, for each variant,
+turn latency percentiles, tokens per conversation and the accuracy of
+``valid_request_received``, the product id and the number of request items
+side by side, and names the fastest variant whose quality is within
+``--tolerance`` of the baseline.
+
+With ``--mocks`` the stand-in model answers each conversation with its
+labels, so the baseline scores 100% and differences come from the
+configuration alone (e.g. completions cut off by a low ``max_tokens``, extra
+tool rounds); against real endpoints the accuracies measure the model.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage
+
+from src.api_support_chatbot.accounting import usage_ledger
+from src.api_support_chatbot.batch import iter_records, record_messages
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.prompts import GENERIC_ERROR_MSG
+from src.api_support_chatbot.utils import percentile
+
+DEFAULT_CONVERSATIONS = "benchmarks/eval/conversations.jsonl"
+DEFAULT_VARIANTS = "benchmarks/eval/variants.json"
+THREAD_PREFIX = "eval-"
+QUALITY_METRICS = ("valid_request_received", "product_id", "items")
+
+# Called before each conversation, e.g. to script the stand-in model
+BeforeConversation = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def load_variants(path: str) -> List[Dict[str, Any]]:
+    """Read the variants to sweep, rejecting unknown configuration fields."""
+    with open(path) as f:
+        variants = json.load(f)
+    names = set()
+    for variant in variants:
+        unknown = set(variant.get("configurable", {})) - set(Configuration.model_fields)
+        if unknown:
+            raise ValueError(f"Variant {variant['name']} sets unknown configuration fields: {sorted(unknown)}")
+        if variant["name"] in names:
+            raise ValueError(f"Duplicate variant name: {variant['name']}")
+        names.add(variant["name"])
+    return variants
+
+
+def _product(value: Any) -> Optional[str]:
+    return (str(value).strip().lower() or None) if value else None
+
+
+def observe(prediction: Dict[str, Any], node: str, update: Any) -> None:
+    """Update a turn's prediction from one node's state update."""
+    if not isinstance(update, dict):
+        return
+    if node == "get_request_details" and update.get("request_details") is not None:
+        details = update["request_details"]
+        prediction["valid_request_received"] = details.valid_request_received
+        prediction["product_id"] = _product(details.produtct_id)
+    elif node == "coordinate_response":
+        # Items answered from the FAQ store are extracted items as well
+        prediction["items"] = len(update.get("request_items") or []) + len(update.get("response_items") or [])
+
+
+def score(expected: Dict[str, Any], prediction: Dict[str, Any]) -> Dict[str, Optional[bool]]:
+    """
+    Check a prediction against the labels of a conversation.
+
+    The product id and item count are only checked for conversations
+    labelled as valid requests (None otherwise).
+    """
+    checks: Dict[str, Optional[bool]] = {
+        "valid_request_received": prediction["valid_request_received"] == expected["valid_request_received"],
+        "product_id": None,
+        "items": None,
+    }
+    if expected["valid_request_received"]:
+        if "product_id" in expected:
+            checks["product_id"] = prediction["product_id"] == _product(expected["product_id"])
+        if "items" in expected:
+            checks["items"] = prediction["items"] == expected["items"]
+    return checks
+
+
+async def run_turn(graph: Any, message: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one turn and collect the answer and what the graph extracted from it."""
+    prediction: Dict[str, Any] = {"valid_request_received": False, "product_id": None, "items": 0, "answer": ""}
+    async for mode, chunk in graph.astream(
+        {"messages": [HumanMessage(content=message)]}, config=config, stream_mode=["updates", "values"]
+    ):
+        if mode == "values":
+            prediction["answer"] = chunk["messages"][-1].content
+        else:
+            for node, update in chunk.items():
+                observe(prediction, node, update)
+    return prediction
+
+
+async def evaluate_variant(
+    graph: Any,
+    records: List[Dict[str, Any]],
+    variant: Dict[str, Any],
+    before_conversation: Optional[BeforeConversation] = None,
+) -> Dict[str, Any]:
+    """Run every conversation with the variant's configuration and summarize latency, tokens and quality."""
+    turns: List[float] = []
+    tokens: List[Dict[str, float]] = []
+    checks: Dict[str, List[bool]] = {metric: [] for metric in QUALITY_METRICS}
+    mismatches: List[Dict[str, Any]] = []
+    errors = 0
+    for record in records:
+        thread_id = f"{THREAD_PREFIX}{variant['name']}-{record['id']}"
+        # Coalescing would let one conversation answer from another's cached response
+        config = {"configurable": {
+            "thread_id": thread_id, "enable_request_coalescing": False, **variant.get("configurable", {}),
+        }}
+        if before_conversation is not None:
+            await before_conversation(record)
+        prediction: Dict[str, Any] = {"valid_request_received": None, "product_id": None, "items": 0, "answer": ""}
+        try:
+            for message in record_messages(record):
+                started = time.perf_counter()
+                prediction = await run_turn(graph, message, config)
+                turns.append(time.perf_counter() - started)
+            if prediction["answer"].startswith(GENERIC_ERROR_MSG):
+                errors += 1
+        except Exception:
+            errors += 1
+        finally:
+            await graph.checkpointer.adelete_thread(thread_id)
+        totals = usage_ledger.thread_totals(thread_id)
+        tokens.append({"prompt": totals["prompt"], "completion": totals["completion"]})
+
+        result = score(record["expected"], prediction)
+        for metric, correct in result.items():
+            if correct is not None:
+                checks[metric].append(correct)
+        if not all(correct is not False for correct in result.values()):
+            mismatches.append({
+                "id": record["id"],
+                "expected": record["expected"],
+                "predicted": {k: prediction[k] for k in QUALITY_METRICS},
+            })
+
+    conversations = len(records) or 1
+    return {
+        "name": variant["name"],
+        "configurable": variant.get("configurable", {}),
+        "conversations": len(records),
+        "turns": len(turns),
+        "errors": errors,
+        "p50_ms": round(percentile(turns, 50) * 1000, 1),
+        "p95_ms": round(percentile(turns, 95) * 1000, 1),
+        "prompt_tokens": round(sum(t["prompt"] for t in tokens) / conversations, 1),
+        "completion_tokens": round(sum(t["completion"] for t in tokens) / conversations, 1),
+        "accuracy": {
+            metric: round(sum(values) / len(values), 3) if values else None
+            for metric, values in checks.items()
+        },
+        "mismatches": mismatches,
+    }
+
+
+def regressions(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Quality metrics on which a variant is worse than the baseline by more than ``tolerance``."""
+    regressed = [
+        metric for metric in QUALITY_METRICS
+        if baseline["accuracy"][metric] is not None
+        and (result["accuracy"][metric] or 0.0) < baseline["accuracy"][metric] - tolerance
+    ]
+    if result["errors"] > baseline["errors"]:
+        regressed.append("errors")
+    return regressed
+
+
+def choose(results: List[Dict[str, Any]], baseline: str, tolerance: float) -> Optional[str]:
+    """Name of the variant with the lowest p95 turn latency that does not regress quality."""
+    reference = next((r for r in results if r["name"] == baseline), None)
+    if reference is None:
+        return None
+    candidates = [r for r in results if not regressions(r, reference, tolerance)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: (r["p95_ms"], r["p50_ms"]))["name"]
+
+
+def format_table(results: List[Dict[str, Any]], baseline: str, tolerance: float) -> List[str]:
+    """Variants side by side, one line each."""
+    reference = next((r for r in results if r["name"] == baseline), None)
+    width = max([len(r["name"]) for r in results] + [7])
+    lines = [
+        f"{'variant':<{width}}  {'p50 ms':>8}  {'p95 ms':>8}  {'prompt':>8}  {'compl.':>7}  "
+        f"{'valid':>6}  {'product':>7}  {'items':>6}  {'errors':>6}  regressions"
+    ]
+
+    def pct(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 100:.0f}%"
+
+    for r in results:
+        regressed = regressions(r, reference, tolerance) if reference is not None else []
+        lines.append(
+            f"{r['name']:<{width}}  {r['p50_ms']:>8.1f}  {r['p95_ms']:>8.1f}  {r['prompt_tokens']:>8.0f}  "
+            f"{r['completion_tokens']:>7.0f}  {pct(r['accuracy']['valid_request_received']):>6}  "
+            f"{pct(r['accuracy']['product_id']):>7}  {pct(r['accuracy']['items']):>6}  {r['errors']:>6}  "
+            f"{', '.join(regressed) or '-'}"
+        )
+    return lines
+
+
+def stand_in_script(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Mock model script that answers a conversation with its labels."""
+    expected = record["expected"]
+    product_id = expected.get("product_id", "")
+    details = {
+        "valid_request_received": expected["valid_request_received"],
+        "clarifying_question": "" if expected["valid_request_received"] else "Which Lightspeed product do you use?",
+        "info_message": "",
+        "produtct_id": product_id,
+    }
+    items = [
+        {
+            "id": "",
+            "request_text": f"Question {i + 1} of conversation {record['id']}",
+            "category": "How-To on API Usage & Functionality",
+            "product_id": product_id,
+        }
+        for i in range(expected.get("items", 1))
+    ]
+    return {"RequestDetails": details, "ExtractedRequests": {"item_list": items}}
+
+
+def script_mock_llm(url: str) -> BeforeConversation:
+    """Script the mock model with each conversation's labels through ``POST /_config``."""
+    import httpx
+
+    async def before_conversation(record: Dict[str, Any]) -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{url}/_config", json={"script": stand_in_script(record)})
+            response.raise_for_status()
+
+    return before_conversation
+
+
+async def sweep(
+    conversations_path: str,
+    variants: List[Dict[str, Any]],
+    before_conversation: Optional[BeforeConversation] = None,
+) -> List[Dict[str, Any]]:
+    """Evaluate every variant on the labelled conversations, one variant after the other."""
+    # Imported here so the environment is set up before configuration is read
+    import src.api_support_chatbot.chatbot as chatbot
+
+    graph = chatbot.create_chatbot_graph()
+    records = [record async for record in iter_records(conversations_path)]
+    if records and variants:
+        # Unmeasured pass so connection setup and first-call costs do not land on the first variant
+        await evaluate_variant(graph, records[:1], {**variants[0], "name": "warmup"}, before_conversation)
+    return [await evaluate_variant(graph, records, variant, before_conversation) for variant in variants]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare answer quality and latency of configuration variants")
+    parser.add_argument("--conversations", default=DEFAULT_CONVERSATIONS, help="Labelled JSONL conversations")
+    parser.add_argument("--variants", default=DEFAULT_VARIANTS, help="JSON list of {name, configurable}")
+    parser.add_argument("--baseline", help="Variant to compare quality against (default: the first)")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Allowed accuracy drop against the baseline")
+    parser.add_argument("--mocks", action="store_true", help="Run against the local stand-in model and MCP server")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Base seconds per stand-in completion")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="Stand-in completion tokens per second")
+    parser.add_argument("--output", help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    variants = load_variants(args.variants)
+    baseline = args.baseline or variants[0]["name"]
+    if args.mocks:
+        from benchmarks.common import LLM_PORT, mock_servers
+        llm_args = ["--latency", str(args.llm_latency), "--token-rate", str(args.token_rate)]
+        with mock_servers(llm_args, ["--latency", "0"]) as env:
+            os.environ.update(env)
+            results = asyncio.run(sweep(args.conversations, variants, script_mock_llm(f"http://127.0.0.1:{LLM_PORT}")))
+    else:
+        from dotenv import load_dotenv
+        load_dotenv()
+        results = asyncio.run(sweep(args.conversations, variants))
+
+    print("\n".join(format_table(results, baseline, args.tolerance)))
+    chosen = choose(results, baseline, args.tolerance)
+    print(f"\nFastest variant without quality regression: {chosen or 'none'}")
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "baseline": baseline,
+                "tolerance": args.tolerance,
+                "chosen": chosen,
+                "variants": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Graph benchmark: drives the real ``create_chatbot_graph()`` against local mocks.
+
+Usage:
+    python -m benchmarks.graph_bench --concurrency 1,8,32 --fan-out 1,4 \\
+        --turns 40 --output benchmarks/results/latest.json \\
+        --baseline benchmarks/results/baseline.json
+
+For each (concurrency, fan-out) pair the graph runs ``--turns`` one-turn
+conversations and reports throughput, end-to-end and per-node p50/p95/p99
+latency and resident memory. Results are written as JSON; with
+``--baseline`` the p95 and throughput deltas against a previous run are
+printed so regressions can be spotted.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import LLM_PORT, memory_usage, mock_servers, summarize_latencies
+from src.api_support_chatbot.utils import percentile
+
+
+class NodeTimer(AsyncCallbackHandler):
+    """Callback handler collecting wall-clock durations of graph nodes."""
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self._started: Dict[Any, tuple[str, float]] = {}
+
+    async def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    async def _finish(self, run_id) -> None:
+        started = self._started.pop(run_id, None)
+        if started:
+            node, at = started
+            self.durations[node].append(time.perf_counter() - at)
+
+    async def on_chain_end(self, outputs, *, run_id, **kwargs):
+        await self._finish(run_id)
+
+    async def on_chain_error(self, error, *, run_id, **kwargs):
+        await self._finish(run_id)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            node: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+            }
+            for node, values in sorted(self.durations.items())
+        }
+
+
+async def run_scenario(graph: Any, concurrency: int, turns: int) -> Dict[str, Any]:
+    """Run ``turns`` one-turn conversations with at most ``concurrency`` in flight."""
+    timer = NodeTimer()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one_turn() -> None:
+        nonlocal errors
+        async with semaphore:
+            config = {"configurable": {"thread_id": str(uuid.uuid4())}, "callbacks": [timer]}
+            started = time.perf_counter()
+            try:
+                await graph.ainvoke(
+                    {"messages": [HumanMessage(content="How do I authenticate with the API?")]},
+                    config=config,
+                )
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one_turn() for _ in range(turns)])
+    elapsed = time.perf_counter() - started
+
+    report = summarize_latencies(latencies, elapsed, errors)
+    report["nodes"] = timer.summary()
+    report.update(memory_usage())
+    return report
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe p95 and throughput changes of each scenario against a baseline."""
+    lines = []
+    previous = {(s["concurrency"], s["fan_out"]): s for s in baseline.get("scenarios", [])}
+    for scenario in current["scenarios"]:
+        key = (scenario["concurrency"], scenario["fan_out"])
+        if key not in previous:
+            continue
+        old = previous[key]
+        p95_delta = (scenario["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        rps_delta = (scenario["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+        lines.append(
+            f"concurrency={key[0]} fan_out={key[1]}: p95 {old['p95_ms']} -> {scenario['p95_ms']} ms "
+            f"({p95_delta:+.1f}%), rps {old['rps']} -> {scenario['rps']} ({rps_delta:+.1f}%)"
+        )
+    return lines
+
+
+async def run_suite(concurrency_levels: List[int], fan_outs: List[int], turns: int) -> Dict[str, Any]:
+    """Run every (concurrency, fan-out) scenario against the already running mocks."""
+    # Imported here so the environment points at the mocks before configuration is read
+    from src.api_support_chatbot.chatbot import create_chatbot_graph
+
+    scenarios = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{LLM_PORT}") as mock:
+        for fan_out in fan_outs:
+            await mock.post("/_config", json={"fan_out": fan_out})
+            for concurrency in concurrency_levels:
+                graph = create_chatbot_graph()
+                report = await run_scenario(graph, concurrency, turns)
+                report.update({"concurrency": concurrency, "fan_out": fan_out, "turns": turns})
+                scenarios.append(report)
+                print(
+                    f"concurrency={concurrency} fan_out={fan_out}: {report['rps']} turns/s, "
+                    f"p95={report['p95_ms']} ms, rss={report['rss_mib']} MiB",
+                    flush=True,
+                )
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "scenarios": scenarios}
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the chatbot graph against local mocks")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--fan-out", type=_int_list, default=[1, 4])
+    parser.add_argument("--turns", type=int, default=40, help="Turns per scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--token-rate", type=float, default=0.0)
+    parser.add_argument("--mcp-latency", type=float, default=0.02)
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    llm_args = [
+        "--latency", str(args.llm_latency),
+        "--jitter", str(args.llm_jitter),
+        "--token-rate", str(args.token_rate),
+    ]
+    with mock_servers(llm_args, ["--latency", str(args.mcp_latency)]) as env:
+        os.environ.update(env)
+        results = asyncio.run(run_suite(args.concurrency, args.fan_out, args.turns))
+
+    results["settings"] = {
+        "llm_latency_s": args.llm_latency,
+        "llm_jitter_s": args.llm_jitter,
+        "token_rate": args.token_rate,
+        "mcp_latency_s": args.mcp_latency,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline: Optional[Dict[str, Any]] = None
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for line in compare(results, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
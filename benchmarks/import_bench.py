@@ -0,0 +1,117 @@
+"""
+Cold import benchmark based on ``python -X importtime``.
+
+Usage:
+    python -m benchmarks.import_bench --runs 3 --top 10
+
+Each module is imported in a fresh interpreter and the cumulative import
+time reported by ``-X importtime`` is taken (best of ``--runs``). The report
+lists the slowest dependencies of each module, which heavy libraries ended up
+loaded, and whether the module is within its budget. The command exits with a
+non-zero status when a budget is exceeded.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+# Cumulative cold import budgets in milliseconds
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    "src.api_support_chatbot.configuration": 500,
+    "src.api_support_chatbot.prompts": 100,
+    "src.api_support_chatbot.chatbot": 2500,
+    "src.api_support_chatbot.server": 3000,
+}
+
+# Libraries that must only be loaded when a client is first built
+HEAVY_MODULES = ("langchain_openai", "langchain_mcp_adapters", "openai", "mcp")
+
+# Libraries that light-weight modules (configuration, prompts) must not load
+FRAMEWORK_MODULES = ("langgraph", "langchain_core")
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, float]]:
+    """Parse ``-X importtime`` output into (module, depth, cumulative_ms) rows."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative_us) / 1000))
+    return rows
+
+
+def dependencies_of(rows: List[Tuple[str, int, float]], module: str) -> Tuple[float, List[Tuple[str, int, float]]]:
+    """Cumulative time of ``module`` and the rows it imported (interpreter start-up excluded)."""
+    index = max(i for i, row in enumerate(rows) if row[0] == module)
+    start = index
+    while start > 0 and rows[start - 1][1] > rows[index][1]:
+        start -= 1
+    return rows[index][2], rows[start:index]
+
+
+def loaded_packages(module: str, candidates: Tuple[str, ...]) -> List[str]:
+    """Which of ``candidates`` are in ``sys.modules`` after importing ``module``."""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(c for c in {candidates!r} if c in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    output = result.stdout.strip()
+    return output.split(",") if output else []
+
+
+def measure_import(module: str, runs: int = 3, top: int = 10) -> Dict[str, Any]:
+    """Best cumulative import time of ``module`` in a fresh interpreter."""
+    best: List[Tuple[str, int, float]] = []
+    best_ms = float("inf")
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        total, dependencies = dependencies_of(parse_importtime(result.stderr), module)
+        if total < best_ms:
+            best, best_ms = dependencies, total
+
+    slowest = sorted(best, key=lambda row: row[2], reverse=True)
+    return {
+        "module": module,
+        "cumulative_ms": round(best_ms, 1),
+        "budget_ms": IMPORT_BUDGETS_MS.get(module),
+        "slowest": [
+            {"module": name, "cumulative_ms": round(cumulative, 1)}
+            for name, _, cumulative in slowest[:top]
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold import time of the chatbot modules")
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGETS_MS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest dependencies to list per module")
+    args = parser.parse_args()
+
+    report = []
+    over_budget = False
+    for module in args.modules:
+        row = measure_import(module, args.runs, args.top)
+        row["heavy_loaded"] = loaded_packages(module, HEAVY_MODULES)
+        budget = row["budget_ms"]
+        row["within_budget"] = budget is None or row["cumulative_ms"] <= budget
+        over_budget |= not row["within_budget"]
+        report.append(row)
+
+    print(json.dumps(report, indent=2))
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Load test for the HTTP service against local mock LLM and MCP servers.
+
+Usage:
+    python -m benchmarks.load_test --workers 2 --concurrency 32 --duration 20
+
+Starts the mock Azure OpenAI server, the mock MCP server and the chatbot
+service as subprocesses, drives new-thread turns at a fixed concurrency and
+reports sustained requests per second and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import (
+    SERVICE_PORT,
+    mock_servers,
+    spawn,
+    summarize_latencies,
+    wait_until_ready,
+)
+
+
+async def run_load(base_url: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    """Drive one-turn conversations at a fixed concurrency for ``duration`` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    stop_at = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    thread = (await client.post("/threads")).json()["thread_id"]
+                    response = await client.post(
+                        f"/threads/{thread}/messages",
+                        json={"message": "How do I authenticate with the API?"},
+                    )
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return summarize_latencies(latencies, elapsed, errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the chatbot HTTP service")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--mcp-latency", type=float, default=0.02)
+    parser.add_argument("--fan-out", type=int, default=2)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    llm_args = ["--latency", str(args.llm_latency), "--fan-out", str(args.fan_out)]
+    mcp_args = ["--latency", str(args.mcp_latency)]
+    with mock_servers(llm_args, mcp_args) as env, \
+         spawn([sys.executable, "-m", "src.api_support_chatbot.server", "--port", str(SERVICE_PORT),
+                "--workers", str(args.workers), "--per-worker-checkpoints"], env):
+
+        async def scenario() -> Dict[str, Any]:
+            await wait_until_ready(f"http://127.0.0.1:{SERVICE_PORT}/readyz", expect_ok=True)
+            return await run_load(f"http://127.0.0.1:{SERVICE_PORT}", args.concurrency, args.duration)
+
+        report = asyncio.run(scenario())
+
+    report.update({
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "llm_latency_s": args.llm_latency,
+        "mcp_latency_s": args.mcp_latency,
+        "fan_out": args.fan_out,
+    })
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Event-loop stall benchmark: print-based logging versus the queue-backed logger.
+
+Usage:
+    python -m benchmarks.logging_bench --tasks 20 --events 50 --write-delay 0.001
+
+A ticker task sleeps in 1 ms steps and records how late it wakes up while
+concurrent tasks log agent actions to an artificially slow stream (each
+write blocks for ``--write-delay`` seconds, as a congested container stdout
+or log shipper would). The total and worst stall of the loop are reported
+for both implementations.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from src.api_support_chatbot.logger import (
+    LogSettings,
+    configure_logging,
+    shutdown_logging,
+)
+from src.api_support_chatbot.utils import log_agent_action, percentile
+
+
+class SlowStream:
+    """Text stream whose writes block the calling thread."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        self.writes += 1
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def make_print_logger(stream: SlowStream) -> Callable[..., None]:
+    """The original ``log_agent_action`` implementation, writing to ``stream``."""
+
+    def log(agent_name: str, action: str, details: Dict[str, Any] = None) -> None:
+        timestamp = datetime.now().isoformat()
+        print(f"[{timestamp}] {agent_name}: {action}", file=stream, flush=True)
+        if details:
+            for key, value in details.items():
+                print(f"  {key}: {value}", file=stream, flush=True)
+
+    return log
+
+
+async def measure_stall(log: Callable[..., None], tasks: int, events: int) -> Dict[str, float]:
+    """Log from concurrent tasks while sampling event-loop wake-up lag."""
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        interval = 0.001
+        while not done.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    async def producer(index: int) -> None:
+        for event in range(events):
+            log("ResponseAgent", f"Generated response for item {index}-{event}", {
+                "Request Text": "How do I authenticate with the API?",
+                "Response Text": "Use an API token in the Authorization header.",
+                "Iterations": 1,
+            })
+            await asyncio.sleep(0)
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*[producer(i) for i in range(tasks)])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker_task
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total_stall_ms": round(sum(lags) * 1000, 1),
+        "max_stall_ms": round(max(lags, default=0.0) * 1000, 2),
+        "p99_stall_ms": round(percentile(lags, 99) * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure event-loop stalls caused by logging")
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--write-delay", type=float, default=0.001, help="Seconds each stream write blocks")
+    args = parser.parse_args()
+
+    report = {}
+    report["print"] = asyncio.run(measure_stall(make_print_logger(SlowStream(args.write_delay)), args.tasks, args.events))
+
+    configure_logging(stream=SlowStream(args.write_delay), settings=LogSettings())
+    report["queue"] = asyncio.run(measure_stall(log_agent_action, args.tasks, args.events))
+    shutdown_logging()
+
+    report["settings"] = vars(args)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+MCP transport benchmark: per-tool-call latency over each transport.
+
+Usage:
+    python -m benchmarks.mcp_transport_bench --calls 200 --concurrency 1 8 --latency 0
+
+For each transport the local MCP stand-in (``benchmarks.mock_mcp``) is
+started, the tools are listed through ``clients.get_mcp_tools`` exactly as
+the response agent does, and ``retrieve_support_context`` is called
+``--calls`` times at each concurrency. ``streamable_http`` opens a session
+(HTTP requests and the MCP handshake) per call and ``stdio`` spawns the
+server process per call, while ``websocket`` and ``sse`` keep one session
+per replica open; with ``--latency 0`` the report shows the overhead of the
+transport alone.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import MCP_PORT, spawn, summarize_latencies, wait_until_ready
+from src.api_support_chatbot.clients import close_clients, get_mcp_tools
+from src.api_support_chatbot.configuration import (
+    Configuration,
+    MCPServerConfig,
+    MCPTransport,
+)
+
+TRANSPORTS = ["streamable_http", "sse", "websocket", "stdio"]
+# Server flag and client URL of each network transport
+ENDPOINTS = {
+    "streamable_http": ("streamable-http", "http://127.0.0.1:{port}/mcp"),
+    "sse": ("sse", "http://127.0.0.1:{port}/sse"),
+    "websocket": ("websocket", "ws://127.0.0.1:{port}/ws"),
+}
+
+
+def server_config(transport: str, port: int, latency: float) -> MCPServerConfig:
+    if transport == "stdio":
+        return MCPServerConfig(
+            command=sys.executable,
+            args=["-m", "benchmarks.mock_mcp", "--transport", "stdio", "--latency", str(latency)],
+            transport=MCPTransport.STDIO,
+        )
+    return MCPServerConfig(url=ENDPOINTS[transport][1].format(port=port), transport=MCPTransport(transport))
+
+
+async def measure(transport: str, port: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Latency of ``args.calls`` tool calls at each concurrency over one transport."""
+    configuration = Configuration(mcp_servers={"api_support": server_config(transport, port, args.latency)})
+    started = time.perf_counter()
+    tools = await get_mcp_tools(configuration)
+    tool = next(t for t in tools if t.name == "retrieve_support_context")
+    result: Dict[str, Any] = {"list_tools_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    # First call, which opens the persistent sessions
+    started = time.perf_counter()
+    await tool.ainvoke({"query": "warm up"})
+    result["first_call_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    for concurrency in args.concurrency:
+        latencies: List[float] = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(i: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                call_started = time.perf_counter()
+                try:
+                    await tool.ainvoke({"query": f"question {i}", "product_id": "X-Series"})
+                except Exception:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - call_started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call(i) for i in range(args.calls)))
+        result[f"concurrency_{concurrency}"] = summarize_latencies(latencies, time.perf_counter() - started, errors)
+    await close_clients()
+    return result
+
+
+def run_transport(transport: str, args: argparse.Namespace) -> Dict[str, Any]:
+    if transport == "stdio":
+        return asyncio.run(measure(transport, args.port, args))
+    flag, url = ENDPOINTS[transport]
+    server_args = [
+        sys.executable, "-m", "benchmarks.mock_mcp",
+        "--port", str(args.port), "--latency", str(args.latency), "--transport", flag,
+    ]
+    with spawn(server_args, env=None):
+        # Any HTTP answer (a 404 for the WebSocket endpoint) means the server is up
+        asyncio.run(wait_until_ready(f"http://127.0.0.1:{args.port}/"))
+        return asyncio.run(measure(transport, args.port, args))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-tool-call latency across MCP transports")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stand-in waits per tool call")
+    parser.add_argument("--port", type=int, default=MCP_PORT)
+    args = parser.parse_args()
+
+    report = {transport: run_transport(transport, args) for transport in args.transports}
+    print(json.dumps({"transports": report, "settings": vars(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
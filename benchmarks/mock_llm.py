@@ -0,0 +1,229 @@
+"""
+Local stand-in for the Azure OpenAI chat completions API.
+
+Responses are driven by a script with an entry per structured-output schema
+(``RequestDetails``, ``ExtractedRequests``, ``AssembledResponse``), a list of
+tool-call rounds for tool-bound calls and the final response agent answer.
+Latency is ``latency`` seconds plus ``completion_tokens / token_rate``.
+Completions longer than the request's ``max_completion_tokens`` are cut
+off with ``finish_reason: "length"``, as the real API does.
+Settings can be changed at run time with ``POST /_config``.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+DEFAULT_SCRIPT: Dict[str, Any] = {
+    "RequestDetails": {
+        "valid_request_received": True,
+        "clarifying_question": "",
+        "info_message": "",
+        "produtct_id": "X-Series",
+    },
+    "AssembledResponse": {
+        "response_text": "Here is everything you need to know about the API.",
+        "follow_up_question": "Is there anything else I can help with?",
+    },
+    # One entry per response agent iteration that should request tools
+    "tool_calls": [
+        [{"name": "retrieve_support_context", "args": {"query": "{request}"}}],
+    ],
+    "final": {
+        "response_text": "Use the documented endpoint with your API token.",
+        "response_found": True,
+        "confidence": 0.9,
+    },
+}
+
+
+class MockSettings:
+    """Mutable settings of the mock server."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        token_rate: float = 0.0,
+        fan_out: int = 2,
+        script: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.token_rate = token_rate
+        self.fan_out = fan_out
+        self.script = copy.deepcopy(script or DEFAULT_SCRIPT)
+        self.calls: Dict[str, int] = {}
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for name in ("latency", "jitter", "token_rate", "fan_out"):
+            if name in values:
+                setattr(self, name, type(getattr(self, name))(values[name]))
+        if "script" in values:
+            self.script.update(values["script"])
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency,
+            "jitter": self.jitter,
+            "token_rate": self.token_rate,
+            "fan_out": self.fan_out,
+            "calls": dict(self.calls),
+        }
+
+
+def _last_user_text(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user" and isinstance(message.get("content"), str):
+            return message["content"]
+    return ""
+
+
+def _structured_content(schema_name: str, settings: MockSettings) -> Dict[str, Any]:
+    """Scripted structured output for the graph's response schemas."""
+    if schema_name == "ExtractedRequests" and "ExtractedRequests" not in settings.script:
+        return {
+            "item_list": [
+                {
+                    "id": "",
+                    "request_text": f"How do I use feature {i} of the API?",
+                    "category": "How-To on API Usage & Functionality",
+                    "product_id": "X-Series",
+                }
+                for i in range(settings.fan_out)
+            ]
+        }
+    return settings.script.get(schema_name, {})
+
+
+def _tool_calls(round_script: List[Dict[str, Any]], request_text: str) -> List[Dict[str, Any]]:
+    calls = []
+    for call in round_script:
+        args = {
+            key: value.replace("{request}", request_text[:200]) if isinstance(value, str) else value
+            for key, value in call.get("args", {}).items()
+        }
+        calls.append({
+            "id": f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": call["name"], "arguments": json.dumps(args)},
+        })
+    return calls
+
+
+def build_completion(body: Dict[str, Any], settings: MockSettings) -> tuple[Dict[str, Any], str]:
+    """
+    Build a chat completion for the request body.
+
+    Returns:
+        Tuple of (completion, kind) where kind labels the call for statistics.
+    """
+    messages = body.get("messages", [])
+    message: Dict[str, Any] = {"role": "assistant", "content": None}
+    finish_reason = "stop"
+
+    response_format = body.get("response_format") or {}
+    tool_rounds = sum(1 for m in messages if m.get("role") == "assistant" and m.get("tool_calls"))
+    if response_format.get("type") == "json_schema":
+        kind = response_format["json_schema"].get("name", "")
+        message["content"] = json.dumps(_structured_content(kind, settings))
+    elif body.get("tools") and tool_rounds < len(settings.script.get("tool_calls", [])):
+        kind = "tool_calls"
+        message["tool_calls"] = _tool_calls(settings.script["tool_calls"][tool_rounds], _last_user_text(messages))
+        finish_reason = "tool_calls"
+    else:
+        kind = "final"
+        message["content"] = json.dumps(settings.script.get("final", {}))
+
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    completion_tokens = len(str(message.get("content") or message.get("tool_calls") or "")) // 4 + 1
+    limit = body.get("max_completion_tokens") or body.get("max_tokens")
+    if limit and completion_tokens > limit and message["content"] is not None:
+        message["content"] = message["content"][:limit * 4]
+        completion_tokens = limit
+        finish_reason = "length"
+    completion = {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+    return completion, kind
+
+
+def completion_delay(completion: Dict[str, Any], settings: MockSettings) -> float:
+    """Seconds to wait before returning the completion."""
+    delay = settings.latency + random.uniform(0, settings.jitter)
+    if settings.token_rate > 0:
+        delay += completion["usage"]["completion_tokens"] / settings.token_rate
+    return delay
+
+
+def create_app(settings: Optional[MockSettings] = None) -> FastAPI:
+    """Create the mock chat completions app."""
+    settings = settings or MockSettings()
+    app = FastAPI(title="Mock Azure OpenAI")
+    app.state.settings = settings
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request) -> Dict[str, Any]:
+        body = await request.json()
+        body.setdefault("model", deployment)
+        completion, kind = build_completion(body, settings)
+        settings.calls[kind] = settings.calls.get(kind, 0) + 1
+        await asyncio.sleep(completion_delay(completion, settings))
+        return completion
+
+    @app.get("/_config")
+    async def get_config() -> Dict[str, Any]:
+        return settings.as_dict()
+
+    @app.post("/_config")
+    async def set_config(request: Request) -> Dict[str, Any]:
+        settings.update(await request.json())
+        return settings.as_dict()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock Azure OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.05, help="Base seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform random extra seconds")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Completion tokens per second (0 = instant)")
+    parser.add_argument("--fan-out", type=int, default=2, help="Request items per ExtractedRequests")
+    parser.add_argument("--script", help="JSON file overriding the default response script")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = dict(DEFAULT_SCRIPT, **json.load(f))
+    settings = MockSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        token_rate=args.token_rate,
+        fan_out=args.fan_out,
+        script=script,
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Local stand-in for the API support MCP server."""
+
+import argparse
+import asyncio
+import random
+
+from mcp.server.fastmcp import FastMCP
+
+
+def create_server(
+    latency: float = 0.02,
+    jitter: float = 0.0,
+    host: str = "127.0.0.1",
+    port: int = 9000,
+) -> FastMCP:
+    """
+    Create a mock MCP server exposing ``readme`` and ``retrieve_support_context``.
+
+    Args:
+        latency: Seconds to wait before answering each tool call
+        jitter: Uniform random extra seconds per tool call
+    """
+    server = FastMCP(
+        "api_support",
+        host=host,
+        port=port,
+        stateless_http=True,
+        json_response=True,
+        log_level="WARNING",
+    )
+
+    @server.tool()
+    async def readme() -> str:
+        """Describe the capabilities of this support server."""
+        await asyncio.sleep(latency + random.uniform(0, jitter))
+        return "Use retrieve_support_context to search the API documentation and past tickets."
+
+    @server.tool()
+    async def retrieve_support_context(query: str, product_id: str = "") -> str:
+        """Retrieve support documentation relevant to the query."""
+        await asyncio.sleep(latency + random.uniform(0, jitter))
+        return (
+            f"[doc:{product_id or 'any'}] Answer for '{query[:80]}': authenticate with "
+            "an API token in the Authorization header and retry on 429 responses."
+        )
+
+    return server
+
+
+class WebSocketEndpoint:
+    """ASGI endpoint serving an MCP server over a WebSocket (one session per connection)."""
+
+    def __init__(self, server: FastMCP) -> None:
+        self.server = server
+
+    async def __call__(self, scope, receive, send) -> None:
+        from mcp.server.websocket import websocket_server
+
+        mcp_server = self.server._mcp_server
+        async with websocket_server(scope, receive, send) as (read, write):
+            await mcp_server.run(read, write, mcp_server.create_initialization_options())
+
+
+def run_websocket(server: FastMCP, host: str, port: int) -> None:
+    """Serve ``server`` over WebSocket at ``ws://host:port/ws``."""
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.routing import WebSocketRoute
+
+    app = Starlette(routes=[WebSocketRoute("/ws", WebSocketEndpoint(server))])
+    uvicorn.run(app, host=host, port=port, log_level="warning")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock MCP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--transport",
+        choices=["streamable-http", "sse", "websocket", "stdio"],
+        default="streamable-http",
+        help="Endpoints: /mcp (streamable-http), /sse (sse), /ws (websocket)",
+    )
+    args = parser.parse_args()
+    server = create_server(latency=args.latency, jitter=args.jitter, host=args.host, port=args.port)
+    if args.transport == "websocket":
+        run_websocket(server, args.host, args.port)
+    else:
+        server.run(transport=args.transport)
+
+
+if __name__ == "__main__":
+    main()
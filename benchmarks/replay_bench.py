@@ -0,0 +1,186 @@
+"""
+Replay benchmark: framework overhead of the graph on recorded conversations.
+
+Usage:
+    # Record once against the configured Azure OpenAI and MCP servers
+    # (or the local mocks with --mocks)
+    python -m benchmarks.replay_bench record conversations.jsonl \\
+        --cassette benchmarks/cassettes/support.jsonl
+
+    # Replay offline, without any network access
+    python -m benchmarks.replay_bench replay conversations.jsonl \\
+        --cassette benchmarks/cassettes/support.jsonl --latency-scale 0 --runs 5 \\
+        --output benchmarks/results/replay.json --baseline benchmarks/results/replay_baseline.json
+
+The input has the format of ``src.api_support_chatbot.batch``: one JSON
+conversation per line with ``message`` or ``messages``. Recording runs every
+conversation through ``create_chatbot_graph()`` and captures each model and
+MCP tool call (see ``benchmarks/cassette.py``). Replaying runs the same
+conversations through the graph with the recorded responses, after their
+recorded latency times ``--latency-scale``.
+
+With ``--latency-scale 0`` the turn latency is the time spent in the graph
+itself (state handling, checkpointing, serialization, scheduling), so a
+regression there shows up directly instead of being buried in model latency
+noise. With ``--baseline`` the command exits with status 1 when the p95
+turn overhead grew by more than ``--max-regression`` percent.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.cassette import Cassette, recording, replaying
+from src.api_support_chatbot.batch import iter_records, record_messages
+from src.api_support_chatbot.utils import percentile
+
+THREAD_PREFIX = "replay-"
+
+
+async def run_conversations(input_path: str, cassette: Optional[Cassette] = None, latency_scale: float = 0.0) -> Dict[str, Any]:
+    """
+    Run every conversation of the input one after the other and time each turn.
+
+    When replaying from ``cassette``, each turn's overhead is its latency
+    minus the (scaled) latency replayed during the turn.
+    """
+    # Imported here so the environment is set up before configuration is read
+    import src.api_support_chatbot.chatbot as chatbot
+
+    graph = chatbot.create_chatbot_graph()
+    turns: List[float] = []
+    overheads: List[float] = []
+    answers: Dict[str, List[str]] = {}
+    errors = 0
+    async for record in iter_records(input_path):
+        record_id = str(record["id"])
+        thread_id = f"{THREAD_PREFIX}{record_id}"
+        # Coalescing would let one conversation answer from another's cached response
+        config = {"configurable": {"thread_id": thread_id, "enable_request_coalescing": False}}
+        answers[record_id] = []
+        try:
+            for message in record_messages(record):
+                replayed = cassette.stats["replayed_latency_s"] if cassette is not None else 0.0
+                started = time.perf_counter()
+                result = await graph.ainvoke({"messages": [HumanMessage(content=message)]}, config=config)
+                turns.append(time.perf_counter() - started)
+                if cassette is not None:
+                    replayed = (cassette.stats["replayed_latency_s"] - replayed) * latency_scale
+                    overheads.append(max(0.0, turns[-1] - replayed))
+                answers[record_id].append(result["messages"][-1].content)
+        except Exception:
+            errors += 1
+        finally:
+            await graph.checkpointer.adelete_thread(thread_id)
+    return {"turns": turns, "overheads": overheads, "answers": answers, "errors": errors}
+
+
+async def record(input_path: str, cassette_path: str) -> Dict[str, Any]:
+    import src.api_support_chatbot.chatbot as chatbot
+
+    cassette = Cassette(metadata={
+        "input": os.path.basename(input_path),
+        "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    with recording(chatbot, cassette):
+        result = await run_conversations(input_path)
+    cassette.metadata["answers"] = result["answers"]
+    os.makedirs(os.path.dirname(cassette_path) or ".", exist_ok=True)
+    cassette.save(cassette_path)
+    return {
+        "turns": len(result["turns"]),
+        "errors": result["errors"],
+        "interactions": len(cassette.interactions),
+        "recorded_latency_s": round(sum(i["latency_s"] for i in cassette.interactions), 3),
+    }
+
+
+async def replay(input_path: str, cassette: Cassette, latency_scale: float, runs: int) -> Dict[str, Any]:
+    """Replay the conversations ``runs`` times and report turn latency and overhead."""
+    import src.api_support_chatbot.chatbot as chatbot
+
+    turns: List[float] = []
+    overheads: List[float] = []
+    reports = []
+    for _ in range(runs):
+        cassette.rewind()
+        with replaying(chatbot, cassette, latency_scale):
+            result = await run_conversations(input_path, cassette, latency_scale)
+        turns.extend(result["turns"])
+        overheads.extend(result["overheads"])
+        reports.append({
+            "errors": result["errors"],
+            "served": cassette.stats["served"],
+            "unused": len(cassette.interactions) - cassette.stats["served"],
+            "fallbacks": cassette.stats["fallbacks"],
+            "matches_recording": result["answers"] == cassette.metadata.get("answers", result["answers"]),
+        })
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "latency_scale": latency_scale,
+        "runs": reports,
+        "turns": len(turns),
+        "p50_ms": round(percentile(turns, 50) * 1000, 2),
+        "p95_ms": round(percentile(turns, 95) * 1000, 2),
+        "overhead_p50_ms": round(percentile(overheads, 50) * 1000, 2),
+        "overhead_p95_ms": round(percentile(overheads, 95) * 1000, 2),
+    }
+
+
+def regression(current: Dict[str, Any], baseline: Dict[str, Any]) -> Optional[float]:
+    """Relative change (%) of the p95 turn overhead against a baseline run with the same scale."""
+    if baseline.get("latency_scale") != current["latency_scale"] or not baseline.get("overhead_p95_ms"):
+        return None
+    return (current["overhead_p95_ms"] - baseline["overhead_p95_ms"]) / baseline["overhead_p95_ms"] * 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record conversations and replay them to measure graph overhead")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("input", help="JSONL file of conversations")
+    parser.add_argument("--cassette", required=True, help="Cassette file to write or read")
+    parser.add_argument("--mocks", action="store_true", help="Record against the local mock servers")
+    parser.add_argument("--latency-scale", type=float, default=0.0, help="Factor applied to recorded latencies")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default="benchmarks/results/replay.json")
+    parser.add_argument("--baseline", help="Previous replay results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Allowed p95 overhead growth in percent")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        if args.mocks:
+            from benchmarks.common import mock_servers
+            with mock_servers([], []) as env:
+                os.environ.update(env)
+                report = asyncio.run(record(args.input, args.cassette))
+        else:
+            from dotenv import load_dotenv
+            load_dotenv()
+            report = asyncio.run(record(args.input, args.cassette))
+        print(json.dumps(report, indent=2))
+        return
+
+    results = asyncio.run(replay(args.input, Cassette.load(args.cassette), args.latency_scale, args.runs))
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            delta = regression(results, json.load(f))
+        if delta is None:
+            print("Baseline was run with a different latency scale, not compared")
+        else:
+            print(f"p95 turn overhead {delta:+.1f}% against the baseline")
+            if delta > args.max_regression:
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
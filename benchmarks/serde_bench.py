@@ -0,0 +1,115 @@
+"""
+Checkpoint serializer benchmark: bytes and (de)serialization time on long threads.
+
+Usage:
+    python -m benchmarks.serde_bench --turns 10 50 200 --repeat 20
+
+For each thread length the channel values of the thread's latest checkpoint
+(the full message history, the request details, the assembled response and a
+turn's response items) are serialized and deserialized with LangGraph's
+default ``JsonPlusSerializer`` and with ``ChatbotSerializer`` for each
+compression. The report gives the checkpoint size in bytes and the best
+serialize and deserialize times; the messages imitate real turns (a
+customer question, a multi-paragraph assembled answer with the final
+response artifact and usage metadata).
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.api_support_chatbot.configuration import CheckpointCompression
+from src.api_support_chatbot.serde import ChatbotSerializer
+from src.api_support_chatbot.state import (
+    AssembledResponse,
+    RequestDetails,
+    ResponseItem,
+)
+
+ANSWER_PARAGRAPH = (
+    "To rotate an API key, open the developer console, select the project and choose Credentials. "
+    "Create the new key first, deploy it to every client, and only then revoke the old key so that "
+    "no request fails in between. Keys of the X-Series gateway are cached for up to five minutes. "
+)
+
+
+def make_thread(turns: int) -> Dict[str, Any]:
+    """Channel values of a thread's latest checkpoint after ``turns`` turns."""
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"Question {turn}: how do I rotate the key of project {turn}?", id=f"h{turn}"))
+        answer = AIMessage(
+            content=ANSWER_PARAGRAPH * 6 + "\n\n Is there anything else I can help with?",
+            id=f"a{turn}",
+            usage_metadata={"input_tokens": 1800, "output_tokens": 420, "total_tokens": 2220},
+            response_metadata={"model_name": "gpt-4o", "finish_reason": "stop"},
+        )
+        answer.additional_kwargs = {"artifact": {"final_response": True}}
+        messages.append(answer)
+    return {
+        "messages": messages,
+        "request_details": RequestDetails(valid_request_received=True, produtct_id="X-Series"),
+        "response_items": {
+            f"item-{i}": ResponseItem(
+                request_id=f"item-{i}", request_text="How do I rotate a key?", response_text=ANSWER_PARAGRAPH * 2,
+                response_found=True, confidence=0.9,
+            )
+            for i in range(3)
+        },
+        "assembled_response": AssembledResponse(response_text=ANSWER_PARAGRAPH * 6, follow_up_question="Anything else?"),
+        "clarification_attempts": 0,
+    }
+
+
+def measure(serde: Any, values: Dict[str, Any], repeat: int) -> Dict[str, float]:
+    """Checkpoint bytes and best-of-``repeat`` serialize / deserialize times."""
+    best_dump = best_load = float("inf")
+    dumped: List[Tuple[str, Tuple[str, bytes]]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        dumped = [(key, serde.dumps_typed(value)) for key, value in values.items()]
+        best_dump = min(best_dump, time.perf_counter() - started)
+        started = time.perf_counter()
+        loaded = {key: serde.loads_typed(data) for key, data in dumped}
+        best_load = min(best_load, time.perf_counter() - started)
+    assert loaded == values
+    return {
+        "bytes": sum(len(data[1]) for _, data in dumped),
+        "dump_ms": round(best_dump * 1000, 3),
+        "load_ms": round(best_load * 1000, 3),
+    }
+
+
+def serializers() -> Dict[str, Any]:
+    result = {"default": JsonPlusSerializer()}
+    for compression in CheckpointCompression:
+        try:
+            result[f"compact_{compression.value}"] = ChatbotSerializer(compression)
+        except ImportError:
+            # zstd needs the optional zstandard package
+            continue
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure checkpoint size and serialization time on long threads")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    for turns in args.turns:
+        values = make_thread(turns)
+        row: Dict[str, Any] = {"turns": turns, "messages": len(values["messages"])}
+        for name, serde in serializers().items():
+            row[name] = measure(serde, values, args.repeat)
+        rows.append(row)
+    print(json.dumps({"threads": rows, "settings": vars(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
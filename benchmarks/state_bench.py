@@ -0,0 +1,171 @@
+"""
+Graph state benchmark: reducer cost and checkpoint size.
+
+Usage:
+    python -m benchmarks.state_bench --items 10 100 1000 --turns 20
+
+Two measurements are reported as JSON:
+
+- ``reducers``: time to merge N fan-out writes into the item channel, for the
+  former list-concatenating reducer (one copy of the accumulated list per
+  write) and for ``KeyedItemsChannel`` (one copy per super-step).
+- ``checkpoints``: serialized size of the latest checkpoint after each of
+  ``--turns`` conversation turns, run through the real graph with in-process
+  fake models. The ``legacy_bytes`` column re-adds what the former state kept
+  after a turn (the transient status messages, the last turn's request and
+  response items and the request details) and serializes it with the same
+  serializer.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.channels.binop import BinaryOperatorAggregate
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.state import (
+    AssembledResponse,
+    ExtractedRequests,
+    KeyedItemsChannel,
+    RequestDetails,
+    RequestItem,
+    ResponseItem,
+)
+
+
+def legacy_items_reducer(current_value: List[Any], new_value: Any) -> List[Any]:
+    """The former list reducer of ``request_items`` and ``response_items``."""
+    if isinstance(new_value, list) and new_value == []:
+        return []
+    elif isinstance(new_value, list):
+        return current_value + new_value
+    else:
+        return current_value + [new_value]
+
+
+def make_items(count: int) -> List[ResponseItem]:
+    return [
+        ResponseItem(request_id=f"item-{i}", request_text="How do I rotate an API key?", response_text="Use the console.")
+        for i in range(count)
+    ]
+
+
+def time_reducers(count: int, repeat: int = 5) -> Dict[str, float]:
+    """Best-of-``repeat`` time to apply ``count`` writes to each channel."""
+    writes = make_items(count)
+    results = {}
+    for name, factory in (
+        ("legacy_ms", lambda: BinaryOperatorAggregate(list, legacy_items_reducer)),
+        ("keyed_ms", lambda: KeyedItemsChannel()),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            channel = factory()
+            started = time.perf_counter()
+            channel.update(writes)
+            best = min(best, time.perf_counter() - started)
+        results[name] = round(best * 1000, 3)
+    return {"items": count, **results}
+
+
+class FakeStructured:
+    def __init__(self, schema: Any, items: int) -> None:
+        self.schema = schema
+        self.items = items
+
+    def with_config(self, *args: Any, **kwargs: Any) -> "FakeStructured":
+        return self
+
+    async def ainvoke(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        if self.schema is RequestDetails:
+            return RequestDetails(valid_request_received=True, produtct_id="X-Series")
+        if self.schema is ExtractedRequests:
+            return ExtractedRequests(item_list=[
+                RequestItem(id="", request_text=f"How do I configure feature {i}?", category="How-To", product_id="X-Series")
+                for i in range(self.items)
+            ])
+        return AssembledResponse(response_text="Here is how to configure the features. " * 5, follow_up_question="Anything else?")
+
+
+class FakeModel:
+    """In-process stand-in for the chat model, so only state handling is measured."""
+
+    def __init__(self, items: int) -> None:
+        self.items = items
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> FakeStructured:
+        return FakeStructured(schema, self.items)
+
+    def bind_tools(self, tools: Any) -> "FakeModel":
+        return self
+
+    async def ainvoke(self, messages: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        return AIMessage(content=json.dumps({
+            "response_text": "Open the settings page and enable the feature. " * 3,
+            "response_found": True,
+            "confidence": 0.9,
+        }))
+
+
+async def measure_checkpoints(turns: int, items: int) -> List[Dict[str, int]]:
+    """Checkpoint size after each turn of one conversation."""
+
+    async def no_tools(configuration: Any) -> List[Any]:
+        return []
+
+    chatbot._get_azure_chat_model = lambda *args, **kwargs: FakeModel(items)
+    chatbot.get_mcp_tools = no_tools
+
+    graph = chatbot.create_chatbot_graph()
+    serde = graph.checkpointer.serde
+    config = {"configurable": {"thread_id": "state-bench", "enable_request_coalescing": False}}
+
+    rows = []
+    for turn in range(1, turns + 1):
+        result = await graph.ainvoke({"messages": [HumanMessage(content=f"Question {turn}")]}, config=config)
+        checkpoint = (await graph.checkpointer.aget_tuple(config)).checkpoint
+        values = checkpoint["channel_values"]
+        size = sum(len(serde.dumps_typed(value)[1]) for value in values.values())
+
+        # What the list-based state kept on top of the pruned state
+        legacy_extra = {
+            "status_messages": [AIMessage(content="Working on your request...") for _ in range(turn)],
+            "request_items": [
+                RequestItem(id=f"r{i}", request_text=f"How do I configure feature {i}?", category="How-To", product_id="X-Series")
+                for i in range(items)
+            ],
+            "response_items": list(make_items(items)),
+            "request_details": RequestDetails(valid_request_received=True, produtct_id="X-Series"),
+        }
+        legacy_size = size + sum(len(serde.dumps_typed(value)[1]) for value in legacy_extra.values())
+        rows.append({
+            "turn": turn,
+            "messages": len(result["messages"]),
+            "bytes": size,
+            "legacy_bytes": legacy_size,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure reducer cost and checkpoint size of the graph state")
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000], help="Fan-out widths for the reducer timing")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--turn-items", type=int, default=3, help="Request items per conversation turn")
+    args = parser.parse_args()
+
+    checkpoints = asyncio.run(measure_checkpoints(args.turns, args.turn_items))
+    report = {
+        "reducers": [time_reducers(count) for count in args.items],
+        "checkpoints": checkpoints,
+        "settings": vars(args),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,8 @@ async def run_example():
         
     try:
         # Run the chatbot thread_id
-        graph_config = {"configurable": config.model_dump()}
+        # Secrets are resolved from the environment, not passed in the config
+        graph_config = {"configurable": config.to_configurable()}
         graph_config["configurable"]["thread_id"] = str(uuid.uuid4())[:8]
         #Show a greeting message
         print(GREETING_MESSAGE)
@@ -0,0 +1,184 @@
+"""Token and cost accounting for chat model calls."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.api_support_chatbot.telemetry import REGISTRY, current_span
+
+TOKEN_TYPES = ("prompt", "completion", "cached")
+
+TOKENS = REGISTRY.counter(
+    "chatbot_tokens_total", "Model tokens by node, deployment and type", ["node", "deployment", "type"]
+)
+TOKEN_COST = REGISTRY.counter(
+    "chatbot_token_cost_total", "Model cost (configured currency) by node and deployment", ["node", "deployment"]
+)
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {"prompt": 0, "completion": 0, "cached": 0, "calls": 0, "cost": 0.0}
+
+
+def _add(totals: Dict[str, float], usage: Dict[str, float]) -> None:
+    for key, value in usage.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+def compute_cost(usage: Dict[str, int], prices: Optional[Dict[str, float]]) -> float:
+    """
+    Cost of a call from per-1K-token prices.
+
+    Cached prompt tokens are billed at the ``cached`` price (when configured)
+    instead of the ``prompt`` price.
+    """
+    if not prices:
+        return 0.0
+    cached = usage.get("cached", 0)
+    cached_price = prices.get("cached", prices.get("prompt", 0.0))
+    return (
+        (usage.get("prompt", 0) - cached) * prices.get("prompt", 0.0)
+        + cached * cached_price
+        + usage.get("completion", 0) * prices.get("completion", 0.0)
+    ) / 1000
+
+
+class UsageLedger:
+    """
+    Side store of running token totals.
+
+    Totals are kept per node, per deployment, per thread and per request
+    item. Thread and item entries are bounded and evicted least recently
+    updated first, so the ledger does not grow with traffic.
+    """
+
+    def __init__(self, max_threads: int = 10000, max_items: int = 50000) -> None:
+        self.max_threads = max_threads
+        self.max_items = max_items
+        self._by_node: Dict[str, Dict[str, float]] = {}
+        self._by_deployment: Dict[str, Dict[str, float]] = {}
+        self._by_thread: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._by_item: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bounded(store: "OrderedDict[str, Dict[str, float]]", key: str, limit: int) -> Dict[str, float]:
+        totals = store.get(key)
+        if totals is None:
+            totals = store[key] = _empty_totals()
+            while len(store) > limit:
+                store.popitem(last=False)
+        else:
+            store.move_to_end(key)
+        return totals
+
+    def record(
+        self,
+        usage: Dict[str, int],
+        cost: float,
+        node: str = "",
+        deployment: str = "",
+        thread_id: str = "",
+        request_item_id: str = "",
+    ) -> None:
+        """Add one model call to all aggregates."""
+        entry = dict(usage, calls=1, cost=cost)
+        with self._lock:
+            _add(self._by_node.setdefault(node, _empty_totals()), entry)
+            _add(self._by_deployment.setdefault(deployment, _empty_totals()), entry)
+            if thread_id:
+                _add(self._bounded(self._by_thread, thread_id, self.max_threads), entry)
+            if request_item_id:
+                _add(self._bounded(self._by_item, request_item_id, self.max_items), entry)
+
+    def by_node(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._by_node.items()}
+
+    def by_deployment(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._by_deployment.items()}
+
+    def thread_totals(self, thread_id: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._by_thread.get(thread_id) or _empty_totals())
+
+    def item_totals(self, request_item_id: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._by_item.get(request_item_id) or _empty_totals())
+
+    def top_threads(self, n: int = 10, key: str = "cost") -> List[Tuple[str, Dict[str, float]]]:
+        """Threads with the highest ``key`` (cost, prompt, completion, ...)."""
+        with self._lock:
+            ranked = sorted(self._by_thread.items(), key=lambda kv: kv[1].get(key, 0), reverse=True)
+            return [(thread, dict(totals)) for thread, totals in ranked[:n]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_node.clear()
+            self._by_deployment.clear()
+            self._by_thread.clear()
+            self._by_item.clear()
+
+
+# Process-wide ledger
+usage_ledger = UsageLedger()
+
+
+def extract_usage(response: LLMResult) -> Dict[str, int]:
+    """Get prompt, completion and cached token counts from a model result."""
+    usage = {"prompt": 0, "completion": 0, "cached": 0}
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if not metadata:
+                continue
+            usage["prompt"] += metadata.get("input_tokens", 0)
+            usage["completion"] += metadata.get("output_tokens", 0)
+            usage["cached"] += (metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+    return usage
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    Records token usage of every call made by a chat model.
+
+    Attribution (node, thread, request item) comes from the span that is
+    open around the call, see ``telemetry.model_call_span``.
+    """
+
+    # Run in the caller's context so the current span is visible
+    run_inline = True
+
+    def __init__(
+        self,
+        deployment: str,
+        prices: Optional[Dict[str, float]] = None,
+        ledger: Optional[UsageLedger] = None,
+    ) -> None:
+        self.deployment = deployment
+        self.prices = prices
+        self.ledger = ledger or usage_ledger
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        usage = extract_usage(response)
+        attributes = current_span().attributes if current_span() else {}
+        node = str(attributes.get("node", ""))
+        cost = compute_cost(usage, self.prices)
+
+        self.ledger.record(
+            usage,
+            cost,
+            node=node,
+            deployment=self.deployment,
+            thread_id=str(attributes.get("thread_id", "")),
+            request_item_id=str(attributes.get("request_item_id", "")),
+        )
+        for token_type in TOKEN_TYPES:
+            if usage[token_type]:
+                TOKENS.inc(usage[token_type], node=node, deployment=self.deployment, type=token_type)
+        if cost:
+            TOKEN_COST.inc(cost, node=node, deployment=self.deployment)
@@ -0,0 +1,182 @@
+"""Admission control: pick a degradation mode per turn from queue depth and turn latency."""
+
+import time
+from typing import Callable, Optional
+
+from src.api_support_chatbot.configuration import Configuration, DegradationMode
+from src.api_support_chatbot.telemetry import REGISTRY
+from src.api_support_chatbot.utils import log_agent_action
+
+# Pressure at which each mode of the ladder is entered (normal below the first)
+DEGRADATION_THRESHOLDS = (
+    (DegradationMode.SKIP_ASSEMBLER, 0.5),
+    (DegradationMode.CAP_FAN_OUT, 0.6),
+    (DegradationMode.MINI_ONLY, 0.7),
+    (DegradationMode.REDUCED_ITERATIONS, 0.8),
+    (DegradationMode.CACHE_ONLY, 0.9),
+    (DegradationMode.REJECT, 1.0),
+)
+# A mode is left only once pressure is this far below its threshold
+HYSTERESIS = 0.1
+# Half-life of the turn latency signal when no turn completes (e.g. while rejecting)
+LATENCY_HALF_LIFE = 30.0
+# Weight of the newest turn latency in the moving average
+LATENCY_ALPHA = 0.2
+
+MODE_TRANSITIONS = REGISTRY.counter(
+    "chatbot_degradation_transitions_total",
+    "Changes of the automatically chosen degradation mode",
+    ["from_mode", "to_mode"],
+)
+ADMITTED_TURNS = REGISTRY.counter(
+    "chatbot_admitted_turns_total", "Turns admitted, by degradation mode", ["mode"]
+)
+REJECTED_TURNS = REGISTRY.counter(
+    "chatbot_rejected_turns_total", "Turns rejected by admission control"
+)
+DEGRADED_ACTIONS = REGISTRY.counter(
+    "chatbot_degraded_actions_total",
+    "Work skipped or substituted by degradation modes",
+    ["action"],
+)
+
+
+class Overloaded(Exception):
+    """The worker rejects new turns for now."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"The service is overloaded, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class Admission:
+    """An admitted turn and the degradation mode it runs in."""
+
+    __slots__ = ("mode", "started_at", "released")
+
+    def __init__(self, mode: DegradationMode, started_at: float) -> None:
+        self.mode = mode
+        self.started_at = started_at
+        self.released = False
+
+
+class AdmissionController:
+    """
+    Admission control for one worker.
+
+    Pressure is the larger of the turns in flight relative to
+    ``admission_max_in_flight`` and the moving average of turn latency
+    relative to ``admission_latency_target``. The mode is raised as soon as
+    pressure crosses a threshold of ``DEGRADATION_THRESHOLDS`` and lowered
+    only once pressure falls ``HYSTERESIS`` below it, so it does not flap.
+    Without completed turns the latency signal decays with
+    ``LATENCY_HALF_LIFE``, so a rejecting worker recovers.
+
+    A ``degradation_mode`` other than normal in the configuration forces
+    that mode.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self.in_flight = 0
+        self.mode = DegradationMode.NORMAL
+        self._latency: Optional[float] = None
+        self._latency_at = 0.0
+
+    def reset(self) -> None:
+        self.__init__(self._clock)
+
+    def latency(self) -> float:
+        """Turn latency moving average, decayed by the time since the last sample."""
+        if self._latency is None:
+            return 0.0
+        return self._latency * 0.5 ** ((self._clock() - self._latency_at) / LATENCY_HALF_LIFE)
+
+    def pressure(self, configuration: Configuration) -> float:
+        depth = self.in_flight / max(1, configuration.admission_max_in_flight)
+        latency = self.latency() / configuration.admission_latency_target if configuration.admission_latency_target > 0 else 0.0
+        return max(depth, latency)
+
+    def _select(self, pressure: float) -> DegradationMode:
+        raised = DegradationMode.NORMAL
+        lowered = DegradationMode.NORMAL
+        for mode, threshold in DEGRADATION_THRESHOLDS:
+            if pressure >= threshold:
+                raised = mode
+            if pressure >= threshold - HYSTERESIS:
+                lowered = mode
+        if raised.level >= self.mode.level:
+            return raised
+        return lowered if lowered.level < self.mode.level else self.mode
+
+    def update(self, configuration: Configuration) -> DegradationMode:
+        """Re-evaluate the automatic mode and return the mode for a new turn."""
+        if configuration.degradation_mode != DegradationMode.NORMAL:
+            return configuration.degradation_mode
+        if not configuration.enable_admission_control:
+            return DegradationMode.NORMAL
+
+        pressure = self.pressure(configuration)
+        mode = self._select(pressure)
+        if mode != self.mode:
+            MODE_TRANSITIONS.inc(from_mode=self.mode.value, to_mode=mode.value)
+            log_agent_action("Admission", "Degradation mode changed", {
+                "from": self.mode.value,
+                "to": mode.value,
+                "pressure": round(pressure, 3),
+                "in_flight": self.in_flight,
+                "latency_s": round(self.latency(), 3),
+            })
+            self.mode = mode
+        return mode
+
+    def admit(self, configuration: Configuration) -> Admission:
+        """
+        Admit a new turn.
+
+        Raises:
+            Overloaded: If the turn is rejected
+        """
+        mode = self.update(configuration)
+        if mode == DegradationMode.REJECT:
+            REJECTED_TURNS.inc()
+            raise Overloaded(configuration.admission_retry_after)
+        self.in_flight += 1
+        ADMITTED_TURNS.inc(mode=mode.value)
+        return Admission(mode, self._clock())
+
+    def release(self, admission: Admission) -> None:
+        """Record the end of an admitted turn (once)."""
+        if admission.released:
+            return
+        admission.released = True
+        self.in_flight -= 1
+        now = self._clock()
+        sample = now - admission.started_at
+        current = self.latency()
+        self._latency = sample if self._latency is None else LATENCY_ALPHA * sample + (1 - LATENCY_ALPHA) * current
+        self._latency_at = now
+
+
+# Admission control of this worker
+admission_controller = AdmissionController()
+
+REGISTRY.gauge(
+    "chatbot_degradation_level",
+    "Automatically chosen degradation level (0 normal ... 6 reject)",
+    callback=lambda: {(): admission_controller.mode.level},
+)
+REGISTRY.gauge(
+    "chatbot_degradation_mode",
+    "1 for the automatically chosen degradation mode",
+    ["mode"],
+    callback=lambda: {(mode.value,): int(mode == admission_controller.mode) for mode in DegradationMode},
+)
+REGISTRY.gauge(
+    "chatbot_admission_in_flight", "Admitted turns in flight", callback=lambda: {(): admission_controller.in_flight}
+)
+REGISTRY.gauge(
+    "chatbot_turn_latency_average_seconds",
+    "Decayed moving average of turn latency used by admission control",
+    callback=lambda: {(): admission_controller.latency()},
+)
@@ -0,0 +1,208 @@
+"""Latency-aware load balancing and circuit breaking across MCP server replicas."""
+
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.api_support_chatbot.telemetry import REGISTRY
+from src.api_support_chatbot.utils import log_agent_action
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric breaker states for the metrics
+BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+REPLICA_CALLS = REGISTRY.counter(
+    "chatbot_mcp_replica_calls_total",
+    "MCP tool calls by server, replica and outcome",
+    ["server", "replica", "outcome"],
+)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single probe
+    call through (half-open): success closes the breaker, failure opens it
+    again for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now (reserves the half-open probe)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def available(self) -> bool:
+        """Whether ``allow`` would accept a call, without reserving the probe."""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._probing)
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def release(self) -> None:
+        """Give back a reserved half-open probe whose call was cancelled, without a verdict."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            self._state = OPEN
+            self._opened_at = self._clock()
+        self._probing = False
+
+
+class Replica:
+    """One endpoint of a logical MCP server, with its latency estimate and breaker."""
+
+    def __init__(self, url: str, breaker: CircuitBreaker, alpha: float = 0.3) -> None:
+        self.url = url
+        self.breaker = breaker
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.in_flight = 0
+
+    def score(self) -> float:
+        # Unmeasured replicas score 0 so that they get explored first
+        return (self.ewma or 0.0) * (self.in_flight + 1)
+
+    def observe(self, latency: float) -> None:
+        self.ewma = latency if self.ewma is None else self.alpha * latency + (1 - self.alpha) * self.ewma
+
+
+class NoReplicaAvailable(RuntimeError):
+    """All replicas of a server have open circuit breakers."""
+
+
+class ReplicaSet:
+    """
+    Replicas of a logical MCP server.
+
+    ``choose`` picks two random replicas whose breakers accept calls and
+    returns the one with the lower EWMA latency weighted by in-flight calls
+    (power of two choices). Replicas with open breakers are skipped; if none
+    is left, the call fails fast instead of waiting for a timeout.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        urls: List[str],
+        failure_threshold: int = 3,
+        reset_timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.server = server
+        self.replicas = [Replica(url, CircuitBreaker(failure_threshold, reset_timeout, clock)) for url in urls]
+        self._rng = rng or random.Random()
+
+    def choose(self, exclude: Optional[Replica] = None) -> Replica:
+        candidates = [r for r in self.replicas if r is not exclude and r.breaker.available()]
+        if not candidates:
+            raise NoReplicaAvailable(f"No available replica for MCP server {self.server}")
+        if len(candidates) > 1:
+            first, second = self._rng.sample(candidates, 2)
+            candidates = [first, second] if first.score() <= second.score() else [second, first]
+        for replica in candidates:
+            if replica.breaker.allow():
+                return replica
+        raise NoReplicaAvailable(f"No available replica for MCP server {self.server}")
+
+    def begin(self, replica: Replica) -> float:
+        replica.in_flight += 1
+        return time.perf_counter()
+
+    def end(self, replica: Replica, started: float, ok: bool) -> None:
+        replica.in_flight -= 1
+        # Failures count towards latency too, so a slow failing replica is not preferred
+        replica.observe(time.perf_counter() - started)
+        if ok:
+            replica.breaker.record_success()
+        else:
+            previous = replica.breaker.state
+            replica.breaker.record_failure()
+            if replica.breaker.state != previous:
+                log_agent_action("ReplicaSet", "Circuit breaker opened", {"server": self.server, "replica": replica.url})
+        REPLICA_CALLS.inc(server=self.server, replica=replica.url, outcome="success" if ok else "failure")
+
+    def abandon(self, replica: Replica) -> None:
+        """Release a call that was cancelled (deadline, superseded turn) without judging the replica."""
+        replica.in_flight -= 1
+        replica.breaker.release()
+        REPLICA_CALLS.inc(server=self.server, replica=replica.url, outcome="cancelled")
+
+
+# Replica sets in use, for the metrics
+_replica_sets: Dict[str, ReplicaSet] = {}
+
+
+def register_replica_set(replica_set: ReplicaSet) -> None:
+    _replica_sets[replica_set.server] = replica_set
+
+
+def clear_replica_sets() -> None:
+    _replica_sets.clear()
+
+
+def _replica_metric(value: Callable[[Replica], Optional[float]]) -> Callable[[], Dict[tuple, float]]:
+    def collect() -> Dict[tuple, float]:
+        samples = {}
+        for replica_set in list(_replica_sets.values()):
+            for replica in replica_set.replicas:
+                sample = value(replica)
+                if sample is not None:
+                    samples[(replica_set.server, replica.url)] = sample
+        return samples
+    return collect
+
+
+REGISTRY.gauge(
+    "chatbot_mcp_replica_breaker_state",
+    "Circuit breaker state per MCP replica (0 closed, 1 half-open, 2 open)",
+    ["server", "replica"],
+    callback=_replica_metric(lambda r: BREAKER_STATE_VALUES[r.breaker.state]),
+)
+REGISTRY.gauge(
+    "chatbot_mcp_replica_latency_ewma_seconds",
+    "EWMA of MCP tool call latency per replica",
+    ["server", "replica"],
+    callback=_replica_metric(lambda r: r.ewma),
+)
+REGISTRY.gauge(
+    "chatbot_mcp_replica_in_flight",
+    "MCP tool calls in flight per replica",
+    ["server", "replica"],
+    callback=_replica_metric(lambda r: r.in_flight),
+)
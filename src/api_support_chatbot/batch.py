@@ -0,0 +1,237 @@
+"""
+Concurrent JSONL batch runner for offline conversation processing.
+
+Usage:
+    python -m src.api_support_chatbot.batch tickets.jsonl answers.jsonl --concurrency 8
+
+Each input line is a JSON object with an ``id`` and either a ``message``
+string or a ``messages`` list of customer messages, which are sent as
+successive turns on a dedicated thread. Results are appended to the output
+file as they complete; records already answered without error in the output
+are skipped, so an interrupted run can be resumed with the same command.
+Turns the graph answered with its generic error message and malformed
+input lines are written as errors, so a resumed run retries them.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import aiofiles
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+
+from src.api_support_chatbot.chatbot import create_chatbot_graph
+from src.api_support_chatbot.prompts import GENERIC_ERROR_MSG
+from src.api_support_chatbot.utils import (
+    create_error_message,
+    log_agent_action,
+    percentile,
+)
+
+# Key of the error of an input line that is not a JSON object
+_INVALID = "_invalid"
+
+
+class BatchStats:
+    """Running counters and a bounded latency window for progress reporting."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.latencies: deque = deque(maxlen=window)
+
+    def record(self, latency: float, error: bool) -> None:
+        self.latencies.append(latency)
+        if error:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        done = self.completed + self.failed
+        latencies = list(self.latencies)
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 1),
+            "records_per_s": round(done / elapsed, 2) if elapsed else 0.0,
+            "p50_s": round(percentile(latencies, 50), 3),
+            "p95_s": round(percentile(latencies, 95), 3),
+        }
+
+
+def record_messages(record: Dict[str, Any]) -> List[str]:
+    """Get the customer messages of an input record."""
+    if isinstance(record.get("messages"), list):
+        return [str(m) for m in record["messages"]]
+    if "message" in record:
+        return [str(record["message"])]
+    raise ValueError("Record has neither 'message' nor 'messages'")
+
+
+async def load_completed_ids(output_path: str) -> Set[str]:
+    """Stream an existing output file and collect ids of finished records."""
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+    async with aiofiles.open(output_path, "r") as f:
+        async for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A partially written last line from an interrupted run
+                continue
+            if not result.get("error"):
+                completed.add(str(result["id"]))
+    return completed
+
+
+async def iter_records(input_path: str) -> AsyncIterator[Dict[str, Any]]:
+    """Stream records from a JSONL file, one line at a time."""
+    async with aiofiles.open(input_path, "r") as f:
+        line_number = 0
+        async for line in f:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"id": str(line_number), _INVALID: f"Malformed JSON on line {line_number}: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield {"id": str(line_number), _INVALID: f"Line {line_number} is not a JSON object"}
+                continue
+            record.setdefault("id", str(line_number))
+            yield record
+
+
+async def process_record(graph: Any, record: Dict[str, Any], thread_prefix: str) -> Dict[str, Any]:
+    """Run all turns of a record on its own thread and build the output row."""
+    record_id = str(record["id"])
+    thread_id = f"{thread_prefix}{record_id}"
+    config = {"configurable": {"thread_id": thread_id}}
+    started = time.perf_counter()
+    responses: List[str] = []
+    error: Optional[str] = None
+    try:
+        if _INVALID in record:
+            raise ValueError(record[_INVALID])
+        for turn, message in enumerate(record_messages(record), 1):
+            result = await graph.ainvoke({"messages": [HumanMessage(content=message)]}, config=config)
+            response = result["messages"][-1].content
+            responses.append(response)
+            # Node failures are answered with the generic error message rather than raised
+            if response.startswith(GENERIC_ERROR_MSG):
+                raise RuntimeError(f"Turn {turn} failed in the graph")
+    except Exception as e:
+        error = create_error_message(e, f"record {record_id}")
+    finally:
+        # Drop the thread's checkpoints so memory stays flat over long runs
+        if graph.checkpointer is not None:
+            await graph.checkpointer.adelete_thread(thread_id)
+    return {
+        "id": record_id,
+        "thread_id": thread_id,
+        "responses": responses,
+        "latency_s": round(time.perf_counter() - started, 3),
+        "error": error,
+    }
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    report_interval: float = 10.0,
+    thread_prefix: str = "batch-",
+    graph: Any = None,
+) -> Dict[str, Any]:
+    """
+    Process a JSONL file of conversations with bounded concurrency.
+
+    Args:
+        input_path: JSONL file of input records
+        output_path: JSONL file results are appended to
+        concurrency: Number of records processed at the same time
+        report_interval: Seconds between progress log lines
+        thread_prefix: Prefix for per-record thread ids
+        graph: Compiled graph to use (defaults to ``create_chatbot_graph()``)
+
+    Returns:
+        Final statistics snapshot
+    """
+    graph = graph or create_chatbot_graph()
+    completed_ids = await load_completed_ids(output_path)
+    stats = BatchStats()
+    # Bounded queue keeps only a few records in memory ahead of the workers
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async with aiofiles.open(output_path, "a") as out:
+
+        async def worker() -> None:
+            while True:
+                record = await queue.get()
+                if record is None:
+                    return
+                result = await process_record(graph, record, thread_prefix)
+                await out.write(json.dumps(result) + "\n")
+                await out.flush()
+                stats.record(result["latency_s"], bool(result["error"]))
+
+        async def reporter() -> None:
+            while True:
+                await asyncio.sleep(report_interval)
+                log_agent_action("BatchRunner", "Progress", stats.snapshot())
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        reporter_task = asyncio.create_task(reporter())
+        try:
+            async for record in iter_records(input_path):
+                if str(record["id"]) in completed_ids:
+                    stats.skipped += 1
+                    continue
+                await queue.put(record)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            reporter_task.cancel()
+            for task in workers:
+                task.cancel()
+
+    final = stats.snapshot()
+    log_agent_action("BatchRunner", "Finished", final)
+    return final
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run JSONL conversations through the chatbot graph")
+    parser.add_argument("input", help="Input JSONL file")
+    parser.add_argument("output", help="Output JSONL file (appended to, used for resume)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("MAX_CONCURRENT_REQUESTS", "5")))
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    parser.add_argument("--thread-prefix", default="batch-")
+    args = parser.parse_args()
+
+    load_dotenv()
+    asyncio.run(run_batch(
+        args.input,
+        args.output,
+        concurrency=args.concurrency,
+        report_interval=args.report_interval,
+        thread_prefix=args.thread_prefix,
+    ))
+
+
+if __name__ == "__main__":
+    main()
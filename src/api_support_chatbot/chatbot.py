@@ -1,60 +1,94 @@
 """Main chatbot implementation with LangGraph multi-agent architecture."""
 
-from typing import Any, Dict, List, Literal, Optional
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
-from langgraph.constants import Send
 from langgraph.graph import END, START, StateGraph
-from langgraph.types import Command
-from langgraph.checkpoint.memory import InMemorySaver
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_openai import AzureChatOpenAI
+from langgraph.types import Command, Send
+import asyncio
 import json
-
-
-from src.api_support_chatbot.configuration import Configuration
+import logging
+import time
+
+if TYPE_CHECKING:
+    # Heavy client libraries are only imported when a client is first built
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langchain_openai import AzureChatOpenAI
+    from langgraph.graph.state import CompiledStateGraph
+
+
+from src.api_support_chatbot.admission import DEGRADED_ACTIONS
+from src.api_support_chatbot.clients import (
+    get_chat_model,
+    get_mcp_client,
+    get_mcp_tools,
+    get_model_with_tools,
+    get_structured_model,
+)
+from src.api_support_chatbot.configuration import Configuration, DegradationMode
+from src.api_support_chatbot.faq import get_faq_store
+from src.api_support_chatbot.followups import LATE_ITEMS, follow_ups
+from src.api_support_chatbot.iterations import IterationBudget
+from src.api_support_chatbot.prompts import (
+    DEGRADED_RESPONSE_MSG,
+    FAILED_ITEM_MSG,
+    GENERIC_ERROR_MSG,
+    PENDING_FOLLOW_UP_MSG,
+    PENDING_RESPONSE_MSG,
+    RECALLED_CONTEXT_TEMPLATE,
+    format_assembler_prompt,
+    format_coordinator_prompt,
+    format_request_details_prompt,
+    format_response_agent_prompt,
+)
+from src.api_support_chatbot.recovery import plan_recovery, record_recovery
+from src.api_support_chatbot.retrieval_memory import (
+    RetrievalMemory,
+    for_product,
+    forget,
+    share,
+    shared,
+)
+from src.api_support_chatbot.singleflight import (
+    recent_responses,
+    request_fingerprint,
+    response_singleflight,
+)
 from src.api_support_chatbot.state import (
+    AssembledResponse,
     ChatbotState,
+    ExtractedRequests,
     RequestDetails,
     RequestItem,
-    ExtractedRequests,
     ResponseItem,
-    AssembledResponse,
+    is_transient,
+    mark_transient,
 )
-from src.api_support_chatbot.prompts import (
-    format_request_details_prompt,
-    format_coordinator_prompt,
-    format_response_agent_prompt,
-    format_assembler_prompt,
-    GENERIC_ERROR_MSG,
+from src.api_support_chatbot.telemetry import (
+    model_call_span,
+    thread_id_from_config,
+    tool_call_span,
+    traced_node,
 )
 from src.api_support_chatbot.utils import (
+    create_error_message,
     generate_request_id,
     log_agent_action,
-    create_error_message,
 )
 
 
-async def initialize_mcp_client(config: Configuration) -> MultiServerMCPClient:
-    """Initialize MCP client with configured servers."""
-    mcp_connections = config.get_mcp_connections()
-    return MultiServerMCPClient(mcp_connections)
+async def initialize_mcp_client(config: Configuration) -> "MultiServerMCPClient":
+    """Get the pooled MCP client for the configured servers."""
+    return get_mcp_client(config)
 
-def _get_azure_chat_model(configuration: Configuration, hq_model: bool = False) -> AzureChatOpenAI:
-    """Helper function to create an AzureChatOpenAI instance from configuration."""
-    if hq_model:
+def _get_azure_chat_model(configuration: Configuration, hq_model: bool = False) -> "AzureChatOpenAI":
+    """Helper function to get a pooled AzureChatOpenAI instance from configuration."""
+    if hq_model and not configuration.degraded(DegradationMode.MINI_ONLY):
         deployment = configuration.azure_hq_openai_deployment_name
     else:
         deployment = configuration.azure_openai_deployment_name
 
-    return AzureChatOpenAI(
-        model = deployment,
-        temperature = configuration.model_temperature,
-        max_tokens = configuration.max_tokens,
-        azure_endpoint = configuration.azure_openai_endpoint,
-        api_key = configuration.azure_openai_api_key,
-        api_version = configuration.azure_openai_api_version
-    )
+    return get_chat_model(configuration, deployment)
 
 def split_messages_context(messages: List[BaseMessage]) -> tuple[List[BaseMessage], List[BaseMessage]]:
     """
@@ -109,7 +143,12 @@ def format_conversation_context(messages: List[BaseMessage]) -> str:
     """
     return prompt.format(conversation=conversation, historical_conversation=historical_conversation)
 
+def remove_transient_messages(messages: List[BaseMessage]) -> List[RemoveMessage]:
+    """Build removals for the transient status messages of the current turn."""
+    return [RemoveMessage(id=msg.id) for msg in messages if msg.id and is_transient(msg)]
+
 
+@traced_node("get_request_details")
 async def get_request_details(
     state: ChatbotState, config: RunnableConfig
 ) -> Command:
@@ -125,8 +164,7 @@ async def get_request_details(
         
         # Configure the model for structured output
         model = (
-            _get_azure_chat_model(configuration, hq_model=False)
-            .with_structured_output(RequestDetails)
+            get_structured_model(_get_azure_chat_model(configuration, hq_model=False), RequestDetails)
             .with_config({
                 "tags": ["get_request_details"]
             })
@@ -140,7 +178,8 @@ async def get_request_details(
         # Analyze the request
         messages = [SystemMessage(content=system_prompt)] + [HumanMessage(content=clarification_text)]
         
-        request_details = await model.ainvoke(messages)
+        with model_call_span("get_request_details", configuration.azure_openai_deployment_name):
+            request_details = await model.ainvoke(messages)
         
         log_agent_action(
             "GetRequestDetails", 
@@ -176,10 +215,11 @@ async def get_request_details(
                 update={
                     "request_details": request_details,
                     "clarification_attempts": 0,
-                    "request_items": [], # Reset previous requests
-                    "response_items": [], # Reset previous responses
+                    "request_items": {}, # Reset previous requests
+                    "response_items": {}, # Reset previous responses
                     #TODO: Add streaming through AIMessageChunk
-                    "messages": [AIMessage(content="Working on your request...")],
+                    # Status message only, removed again when the turn completes
+                    "messages": [mark_transient(AIMessage(content="Working on your request..."))],
                 },
                 goto="coordinate_response"
             )
@@ -194,6 +234,7 @@ async def get_request_details(
         )
 
 
+@traced_node("coordinate_response")
 async def coordinate_response(
     state: ChatbotState, config: RunnableConfig
 ) -> Command:
@@ -215,10 +256,7 @@ async def coordinate_response(
             raise ValueError("No product specified.")
         
         # Configure the model for structured output
-        model = (
-            _get_azure_chat_model(configuration)
-            .with_structured_output(ExtractedRequests)
-        )
+        model = get_structured_model(_get_azure_chat_model(configuration), ExtractedRequests)
         # Create system prompt
         system_prompt = format_coordinator_prompt()
 
@@ -226,11 +264,18 @@ async def coordinate_response(
 
         messages = [SystemMessage(content=system_prompt)] + [HumanMessage(content=conversation_text)]
         # Generate request items
-        request_items = await model.ainvoke(messages)
+        with model_call_span("coordinate_response", configuration.azure_openai_deployment_name):
+            request_items = await model.ainvoke(messages)
         # Add unique IDs to request items
         for item in request_items.item_list:
             item.id = generate_request_id()
-            print(item)
+            log_agent_action(
+                "ResponseCoordinator",
+                "Extracted request item",
+                item.model_dump(),
+                level=logging.DEBUG,
+                sampled=True,
+            )
 
         # Create Send commands for each request item
        
@@ -242,144 +287,379 @@ async def coordinate_response(
         "Delegating to response agents",
         {"count": len(request_items.item_list), "items": [f"{item.id}: {item.category}" for item in request_items.item_list]}
         )        
+        item_list = request_items.item_list
+        answered: List[ResponseItem] = []
+        faq_store = get_faq_store(configuration.faq_store_path)
+        if faq_store is not None:
+            # Items with a precomputed answer skip the response agents
+            remaining = []
+            for item in item_list:
+                entry = await faq_store.alookup(item, configuration.faq_ttl)
+                if entry is None:
+                    remaining.append(item)
+                else:
+                    answered.append(entry.to_response_item(item))
+            item_list = remaining
+        if configuration.degraded(DegradationMode.CAP_FAN_OUT) and len(item_list) > configuration.degraded_max_fan_out:
+            # Under overload only the first items get a response agent
+            item_list, deferred = item_list[:configuration.degraded_max_fan_out], item_list[configuration.degraded_max_fan_out:]
+            answered.extend(degraded_response(item) for item in deferred)
+            DEGRADED_ACTIONS.inc(action="fan_out_capped")
+
+        update: Dict[str, Any] = {
+            "request_items": item_list,
+            # Re-runs of failed items share this deadline instead of getting a new one
+            "fan_out_deadline": time.time() + configuration.fan_out_deadline if configuration.fan_out_deadline > 0 else None,
+        }
+        if answered:
+            update["response_items"] = answered
+        if not item_list:
+            # Nothing to fan out: assemble right away
+            return Command(update=update, goto="assemble_final_response")
         # Send list of items to fan out function
-        return Command(
-            update={"request_items": request_items.item_list},
-        )
+        return Command(update=update)
         
     except Exception as e:
         error_msg = create_error_message(e, "coordinate_response")
         log_agent_action("ResponseCoordinator", "Error occurred", {"error": error_msg})
         return Command(
             graph=END,
-            update={"messages": [AIMessage(content = f"{GENERIC_ERROR_MSG} {error_msg} ")]},
+            update={
+                "messages": remove_transient_messages(state["messages"])
+                + [AIMessage(content = f"{GENERIC_ERROR_MSG} {error_msg} ")]
+            },
             goto=END
         )
 
 
-async def fan_out_requests(state: ChatbotState) -> List[Send]:
-    """Create Send commands to fan out to response agents."""
-    request_items = state.get("request_items", [])
+async def fan_out_requests(state: ChatbotState, config: RunnableConfig) -> List[Send]:
+    """
+    Create Send commands to fan out to response agents.
+
+    With a fan-out deadline configured, every branch gets the turn's absolute
+    deadline (wall clock, so it survives a resume from checkpoint). With the
+    retrieval memory enabled, every branch gets the keys of the thread's
+    remembered tool results for its product.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    request_items = state.get("request_items", {})
+    return response_sends(list(request_items.values()), state, configuration, thread_id_from_config(config))
+
+
+def response_sends(
+    request_items: List[RequestItem],
+    state: ChatbotState,
+    configuration: Configuration,
+    thread_id: str,
+    attempts: Optional[Dict[str, int]] = None,
+) -> List[Send]:
+    """Send commands running the response agent for request items (``attempts`` by item id, for re-runs)."""
+    deadline = state.get("fan_out_deadline")
+    memory = None
+    if configuration.enable_retrieval_memory and thread_id:
+        # Payloads are checkpointed per branch: they carry keys, the entries are shared in process
+        memory = state.get("retrieval_memory") or {}
+        share(thread_id, memory)
     sends = []
     for item in request_items:
-        sends.append(
-            Send(
-                "generate_response",
-                {"request_item": item},
-            )
-        )        
+        data = {"request_item": item, "deadline": deadline}
+        if memory is not None:
+            data["retrieval_memory"] = sorted(for_product(memory, item.product_id))
+        if attempts:
+            data["attempt"] = attempts[item.id]
+        sends.append(Send("generate_response", data))
     return sends
 
-async def generate_response(
-     data: Dict[str, Any], *, config: RunnableConfig
-) -> Dict[str, ResponseItem]:
+def degraded_response(request_item: RequestItem) -> ResponseItem:
+    """Placeholder answer for a request item not researched because of overload."""
+    return ResponseItem(
+        request_id = request_item.id,
+        request_text = request_item.request_text,
+        product_id = request_item.product_id,
+        response_text = DEGRADED_RESPONSE_MSG,
+        response_found = False,
+        confidence = 0.0,
+        pending = True,
+    )
+
+
+async def run_response_agent(
+    request_item: RequestItem,
+    configuration: Configuration,
+    deadline: Optional[float] = None,
+    memory: Optional[RetrievalMemory] = None,
+) -> tuple[ResponseItem, int]:
     """
-    Agent 2.1: Response Agent
-    Uses MCP tools to gather context and generate responses for individual request item.
+    Run the response agent tool loop for a single request item.
+
+    The number of tool rounds follows the item category's iteration budget;
+    ``deadline`` (wall clock) decides whether the budget may be extended.
+    With the thread's retrieval ``memory``, the item is answered without
+    tools when the remembered passages cover it, repeated tool calls are
+    answered from memory and new tool results are collected into it.
+
+    Returns:
+        Tuple of (response_item, iterations)
     """
+    # Get the (pooled) MCP tools
     try:
-        request_item = data.get("request_item", None)
-        if not request_item:
-            raise ValueError("No request item provided to response agent")
+        tools = await get_mcp_tools(configuration)
+    except Exception as e:
+        raise RuntimeError(f"Failed to initialize MCP client or retrieve tools: {str(e)}")
     
-        log_agent_action("ResponseAgent", f"Generating response for item {request_item.id}")
+    # Configure the model with tools
+    model = _get_azure_chat_model(configuration)
+    model_with_tools = get_model_with_tools(model, tools)
     
-        # Get configuration
-        configuration = Configuration.from_runnable_config(config)
-        
-        # Initialize MCP client and get tools
-        try:
-            mcp_client = await initialize_mcp_client(configuration)
-            tools = await mcp_client.get_tools()
-        except Exception as e:
-            raise RuntimeError(f"Failed to initialize MCP client or retrieve tools: {str(e)}")
-        
-        # Configure the model with tools
-        model = _get_azure_chat_model(configuration)
-        model_with_tools = model.bind_tools(tools)
-        
-        system_prompt = format_response_agent_prompt()
-        
-        # Create response generation prompt
-        response_prompt = f"""
-        Request Text: {request_item.request_text}
-        Product ID: {request_item.product_id}
-        Request Category: {request_item.category}
-        """
-        
-        # Initialize conversation messages
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=response_prompt)
-        ]
-        
-        # Tool execution loop with maximum iterations
-        # create_react_agent from langgraph.prebuilt can be used here instead
-        max_iterations = 2
-        iteration = 0
-        final_response = None
+    system_prompt = format_response_agent_prompt()
+    
+    # Create response generation prompt
+    response_prompt = f"""
+    Request Text: {request_item.request_text}
+    Product ID: {request_item.product_id}
+    Request Category: {request_item.category}
+    """
+    
+    # Initialize conversation messages
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=response_prompt)
+    ]
+    
+    # Tool execution loop within the category's iteration budget
+    # create_react_agent from langgraph.prebuilt can be used here instead
+    budget = IterationBudget(configuration, request_item.category, deadline)
+    iteration = 0
+    final_response = None
+    retrieved: List[str] = []
+
+    recalled = memory.recall(request_item.request_text, request_item.product_id) if memory else []
+    if recalled:
+        context = "\n\n".join(entry.content for entry in recalled)
+        messages.append(HumanMessage(content=RECALLED_CONTEXT_TEMPLATE.format(context=context)))
+        with model_call_span("generate_response", configuration.azure_openai_deployment_name, iteration=iteration):
+            final_response = await model.ainvoke(messages)
+
+    while final_response is None:
+        iteration += 1
+        round_started = time.perf_counter()
         
-        while iteration < max_iterations:
-            iteration += 1
-            
-            # Get model response with potential tool calls
+        # Get model response with potential tool calls
+        with model_call_span("generate_response", configuration.azure_openai_deployment_name, iteration=iteration):
             response = await model_with_tools.ainvoke(messages)
-            
-            # Check if there are tool calls to execute
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                messages.append(response)
-                # Execute each tool call
-                for tool_call in response.tool_calls:
-                    try:
-                        # Find the tool by name
-                        tool_to_call = next((t for t in tools if t.name == tool_call["name"]), None)
-                        if tool_to_call:
+        
+        # Check if there are tool calls to execute
+        if hasattr(response, 'tool_calls') and response.tool_calls:
+            messages.append(response)
+            # Execute each tool call
+            for tool_call in response.tool_calls:
+                try:
+                    # Find the tool by name
+                    tool_to_call = next((t for t in tools if t.name == tool_call["name"]), None)
+                    if tool_to_call:
+                        # Reuse the result of the same call made earlier on the thread
+                        tool_result = memory.tool_result(tool_call["name"], tool_call["args"]) if memory else None
+                        if tool_result is None:
                             # Execute the tool
-                            tool_result = await tool_to_call.ainvoke(tool_call["args"])
-                            
-                            # Add tool result to messages
-                            tool_message = {
-                                "role": "tool",
-                                "content": str(tool_result),
-                                "tool_call_id": tool_call.get("id", "")
-                            }
-                            messages.append(tool_message)
-                        else:
-                            # Tool not found
-                            tool_message = {
-                                "role": "tool", 
-                                "content": f"Tool {tool_call['name']} not found",
-                                "tool_call_id": tool_call.get("id", "")
-                            }
-                            messages.append(tool_message)
-                    except Exception as e:
-                        # Tool execution failed
+                            with tool_call_span(tool_call["name"], iteration=iteration):
+                                tool_result = await tool_to_call.ainvoke(tool_call["args"])
+                            if memory:
+                                memory.store(tool_call["name"], tool_call["args"], request_item.product_id, str(tool_result))
+                        retrieved.append(str(tool_result))
+                        
+                        # Add tool result to messages
                         tool_message = {
                             "role": "tool",
-                            "content": f"Tool execution failed: {str(e)}",
+                            "content": str(tool_result),
                             "tool_call_id": tool_call.get("id", "")
                         }
                         messages.append(tool_message)
-            else:
-                # No more tool calls, take the result and break the loop
-                final_response = response
+                    else:
+                        # Tool not found
+                        tool_message = {
+                            "role": "tool", 
+                            "content": f"Tool {tool_call['name']} not found",
+                            "tool_call_id": tool_call.get("id", "")
+                        }
+                        messages.append(tool_message)
+                except Exception as e:
+                    # Tool execution failed
+                    tool_message = {
+                        "role": "tool",
+                        "content": f"Tool execution failed: {str(e)}",
+                        "tool_call_id": tool_call.get("id", "")
+                    }
+                    messages.append(tool_message)
+            budget.record_round(time.perf_counter() - round_started)
+            # Answer now if the context suffices or the budget is spent
+            if budget.sufficient(request_item.request_text, retrieved) or not budget.next_round(iteration):
                 break
-        # If we exit the loop without a final response, call the model one last time without tools
-        if not final_response:
+        else:
+            # No more tool calls, take the result, which ends the loop
+            final_response = response
+    budget.finish(iteration)
+    # If we exit the loop without a final response, call the model one last time without tools
+    if not final_response:
+        with model_call_span("generate_response", configuration.azure_openai_deployment_name, iteration=iteration):
             final_response = await model.ainvoke(messages)
 
-        response_dict = json.loads(final_response.content)
-        if not isinstance(response_dict, dict):
-            response_dict = {"response_text": final_response.content, "response_found": False, "confidence": 0.0}
-        # Create response item (could not use structured output here due to tool calls)
-        response_item = ResponseItem(
-            request_id = request_item.id,
-            request_text = request_item.request_text,
-            product_id = request_item.product_id,
-            response_text = response_dict.get("response_text", "No response found."),
-            response_found = response_dict.get("response_found", False),
-            confidence = response_dict.get("confidence", 0.0),
+    response_dict = json.loads(final_response.content)
+    if not isinstance(response_dict, dict):
+        response_dict = {"response_text": final_response.content, "response_found": False, "confidence": 0.0}
+    # Create response item (could not use structured output here due to tool calls)
+    response_item = ResponseItem(
+        request_id = request_item.id,
+        request_text = request_item.request_text,
+        product_id = request_item.product_id,
+        response_text = response_dict.get("response_text", "No response found."),
+        response_found = response_dict.get("response_found", False),
+        confidence = response_dict.get("confidence", 0.0),
+    )
+    return response_item, iteration
+
+
+async def respond_to_item(
+    request_item: RequestItem,
+    configuration: Configuration,
+    deadline: Optional[float] = None,
+    memory: Optional[RetrievalMemory] = None,
+) -> tuple[ResponseItem, int]:
+    """
+    Produce the response for a request item, coalescing identical items
+    in flight on other threads into one computation. Found answers are
+    remembered for the ``cache_only`` degradation mode.
+
+    Items are only shared between threads resolved with the same answer
+    settings, in flight or through the remembered answers, and never when
+    the thread has a retrieval memory to answer from: such answers are the
+    thread's own.
+
+    Returns:
+        Tuple of (response_item, iterations)
+    """
+    key = request_fingerprint(
+        request_item.product_id, request_item.category, request_item.request_text, configuration.answer_fingerprint
+    )
+    if configuration.degraded(DegradationMode.CACHE_ONLY):
+        return cached_response(request_item, key), 0
+
+    thread_local = memory is not None and bool(memory.entries)
+    if not configuration.enable_request_coalescing or thread_local:
+        response_item, iteration = await run_response_agent(request_item, configuration, deadline, memory)
+    else:
+        (response_item, iteration), shared = await response_singleflight.do(
+            # Degraded modes change the answer too (mini model, fewer tool rounds)
+            f"{key}:{configuration.degradation_mode.value}",
+            lambda: run_response_agent(request_item, configuration, deadline, memory),
+            configuration.coalescing_wait_timeout,
         )
+        if shared:
+            # Re-key the shared answer to this thread's request item
+            response_item = response_item.model_copy(update={
+                "request_id": request_item.id,
+                "request_text": request_item.request_text,
+            })
+            log_agent_action("ResponseAgent", f"Reused in-flight response for item {request_item.id}", sampled=True)
+    if response_item.response_found and not thread_local:
+        recent_responses.put(key, response_item)
+    return response_item, iteration
+
+
+def cached_response(request_item: RequestItem, key: str) -> ResponseItem:
+    """Answer a request item from recent answers only (``cache_only`` degradation mode)."""
+    cached = recent_responses.get(key)
+    if cached is None:
+        DEGRADED_ACTIONS.inc(action="cache_miss")
+        return degraded_response(request_item)
+    DEGRADED_ACTIONS.inc(action="cache_hit")
+    return cached.model_copy(update={
+        "request_id": request_item.id,
+        "request_text": request_item.request_text,
+    })
+
+
+def pending_response(
+    request_item: RequestItem,
+    work: "asyncio.Future[tuple[ResponseItem, int]]",
+    configuration: Configuration,
+    config: RunnableConfig,
+) -> ResponseItem:
+    """
+    Handle a response agent that missed the fan-out deadline.
+
+    The straggler is cancelled, or with ``deliver_late_results`` kept running
+    so that its answer can be delivered as a follow-up message on the thread.
+    """
+    thread_id = thread_id_from_config(config)
+    follow_up = configuration.deliver_late_results and bool(thread_id)
+    if follow_up:
+        async def late_item() -> ResponseItem:
+            response_item, _ = await work
+            return response_item
+
+        turn_id = str((config.get("configurable") or {}).get("turn_id", ""))
+        follow_ups.adopt(thread_id, late_item(), configuration.late_result_timeout, turn_id)
+        LATE_ITEMS.inc(outcome="follow_up")
+    else:
+        work.cancel()
+        LATE_ITEMS.inc(outcome="cancelled")
+
+    log_agent_action(
+        "ResponseAgent",
+        f"Item {request_item.id} missed the fan-out deadline",
+        {"follow_up": follow_up},
+    )
+    return ResponseItem(
+        request_id = request_item.id,
+        request_text = request_item.request_text,
+        product_id = request_item.product_id,
+        response_text = PENDING_FOLLOW_UP_MSG if follow_up else PENDING_RESPONSE_MSG,
+        response_found = False,
+        confidence = 0.0,
+        pending = True,
+    )
+
+
+@traced_node("generate_response")
+async def generate_response(
+     data: Dict[str, Any], *, config: RunnableConfig
+) -> Dict[str, ResponseItem]:
+    """
+    Agent 2.1: Response Agent
+    Uses MCP tools to gather context and generate responses for individual request item.
+    Identical items in flight on other threads are coalesced into one computation.
+    Items not answered by the fan-out deadline are returned as pending.
+    Tool results retrieved or reused are written to the thread's retrieval memory.
+    """
+    try:
+        request_item = data.get("request_item", None)
+        if not request_item:
+            raise ValueError("No request item provided to response agent")
+    
+        log_agent_action("ResponseAgent", f"Generating response for item {request_item.id}", sampled=True)
+    
+        # Get configuration
+        configuration = Configuration.from_runnable_config(config)
+
+        memory = None
+        if configuration.enable_retrieval_memory and "retrieval_memory" in data:
+            memory = RetrievalMemory(shared(thread_id_from_config(config), data["retrieval_memory"]), configuration)
+
+        attempt = data.get("attempt", 1)
+        deadline = data.get("deadline")
+        if deadline is None:
+            response_item, iteration = await respond_to_item(request_item, configuration, memory=memory)
+        else:
+            work = asyncio.ensure_future(respond_to_item(request_item, configuration, deadline, memory))
+            try:
+                response_item, iteration = await asyncio.wait_for(
+                    asyncio.shield(work), timeout=max(0.0, deadline - time.time())
+                )
+            except asyncio.TimeoutError:
+                return {"response_items": pending_response(request_item, work, configuration, config)}
+            except asyncio.CancelledError:
+                work.cancel()
+                raise
         
         log_agent_action(
             "ResponseAgent",
@@ -391,7 +671,13 @@ async def generate_response(
             }
         )
         
-        return {"response_items": response_item}
+        if attempt > 1:
+            response_item = response_item.model_copy(update={"attempts": attempt})
+        update = {"response_items": response_item}
+        memory_update = memory.update() if memory else None
+        if memory_update:
+            update["retrieval_memory"] = memory_update
+        return update
         
     except Exception as e:
         error_msg = create_error_message(e, f"generate_response for item {request_item.id}")
@@ -400,33 +686,64 @@ async def generate_response(
         # Return error response item
         err_item = ResponseItem(
             request_id = request_item.id,
+            request_text = request_item.request_text,
+            product_id = request_item.product_id,
             response_text = f"{GENERIC_ERROR_MSG} {error_msg}",
             response_found = False,
-            error = True
+            error = True,
+            attempts = data.get("attempt", 1),
         )
         return {"response_items": err_item}
 
 
+@traced_node("assemble_final_response")
 async def assemble_final_response(
     state: ChatbotState, config: RunnableConfig
-) -> Command[Literal["__end__"]]:
+) -> Command[Literal["generate_response", "__end__"]]:
     """
     Agent 3: Response Assembler
     Combines all response items into a coherent final response.
+    Failed items are re-run on their own, up to ``response_item_retries``
+    times and only while the turn's fan-out deadline has not passed, while
+    the answered items are kept in the state; items still failing after
+    that are assembled as not answered.
     """
     log_agent_action("ResponseAssembler", "Starting final response assembly")
+    # The fan-out is done; a re-run shares the memory again
+    forget(thread_id_from_config(config))
     
     try:
         # Get configuration
         configuration = Configuration.from_runnable_config(config)
-        response_items = state.get("response_items", [])
+        response_items = state.get("response_items", {})
+        retry, given_up = plan_recovery(
+            response_items,
+            state.get("request_items", {}),
+            configuration.response_item_retries,
+            state.get("fan_out_deadline"),
+        )
+        record_recovery(response_items, len(retry), len(given_up))
+        if retry:
+            log_agent_action("ResponseAssembler", "Re-running failed response items", {
+                "failed_items": [item.id for item in retry],
+                "kept_items_count": len(response_items) - len(retry),
+            })
+            attempts = {item.id: response_items[item.id].attempts + 1 for item in retry}
+            return Command(goto=response_sends(retry, state, configuration, thread_id_from_config(config), attempts))
+        if given_up and len(given_up) == len(response_items):
+            # Nothing to assemble
+            raise ValueError(f"{given_up[0].response_text}")
+
         qa_pairs = ""
-        for item in response_items:
-            # Check for error in individual response item
+        response_texts = []
+        for item in response_items.values():
             if item.error:
-                raise ValueError(f"{item.response_text}")
-            
-            response_text = item.response_text if item.response_found and item.response_text else "Could not answer the request"
+                response_text = FAILED_ITEM_MSG
+            elif item.pending:
+                response_text = item.response_text
+            else:
+                response_text = item.response_text if item.response_found and item.response_text else "Could not answer the request"
+            response_texts.append(response_text)
             qa_pairs += """
             <REQUEST TEXT. PRODUCT ID={product_id}>
             {request_text}
@@ -445,25 +762,32 @@ async def assemble_final_response(
         if not qa_pairs:
             raise ValueError("No valid response items to assemble.")
 
-        # Configure the model for structured output
-        model = (
-            _get_azure_chat_model(configuration)
-            .with_structured_output(AssembledResponse)
-            .with_config({
-                "tags": ["response_assembler"]
-            })
-        )
-        
-        # Create system prompt
-        system_prompt = format_assembler_prompt()
-        
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=qa_pairs)
-        ]
-        
-        # Generate final response
-        assembled_response = await model.ainvoke(messages)
+        if configuration.degraded(DegradationMode.CACHE_ONLY) or (
+            configuration.degraded(DegradationMode.SKIP_ASSEMBLER) and len(response_texts) == 1
+        ):
+            # Under overload the answers are returned as they are
+            assembled_response = AssembledResponse(response_text="\n\n".join(response_texts))
+            DEGRADED_ACTIONS.inc(action="assembler_skipped")
+        else:
+            # Configure the model for structured output
+            model = (
+                get_structured_model(_get_azure_chat_model(configuration), AssembledResponse)
+                .with_config({
+                    "tags": ["response_assembler"]
+                })
+            )
+
+            # Create system prompt
+            system_prompt = format_assembler_prompt()
+
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=qa_pairs)
+            ]
+
+            # Generate final response
+            with model_call_span("assemble_final_response", configuration.azure_openai_deployment_name):
+                assembled_response = await model.ainvoke(messages)
         
         # Add sources to the response content
         
@@ -472,18 +796,27 @@ async def assemble_final_response(
             "Completed final response assembly",
             {
                 "response_items_count": len(response_items),
+                "pending_items_count": sum(1 for item in response_items.values() if item.pending),
+                "failed_items_count": len(given_up),
                 "Response Text": assembled_response.response_text[:100] + ("..." if len(assembled_response.response_text) > 100 else "") if hasattr(assembled_response, 'response_text') else "No content",
             }
         )
-        ai_message = AIMessage(content = 
-                f"{assembled_response.response_text} \n\n {assembled_response.follow_up_question}"
-                )
+        content = assembled_response.response_text
+        if assembled_response.follow_up_question:
+            content = f"{content} \n\n {assembled_response.follow_up_question}"
+        ai_message = AIMessage(content = content)
         ai_message.additional_kwargs = {"artifact": {"final_response": True}}
 
+        # The turn is committed: keep the answer and drop per-turn scratch state
+        # so checkpoints do not grow with every turn.
         return Command(
             update={
                 "assembled_response": assembled_response,
-                "messages": [ai_message],
+                "messages": remove_transient_messages(state["messages"]) + [ai_message],
+                "request_details": None,
+                "request_items": {},
+                "response_items": {},
+                "fan_out_deadline": None,
             }
         )
         
@@ -495,7 +828,8 @@ async def assemble_final_response(
             graph=END,
             update={
                 "error_state": error_msg,
-                "messages": [AIMessage(content = f"{GENERIC_ERROR_MSG} {error_msg}")]
+                "messages": remove_transient_messages(state["messages"])
+                + [AIMessage(content = f"{GENERIC_ERROR_MSG} {error_msg}")]
             },
             goto=END
         )
@@ -523,14 +857,28 @@ def create_chatbot_graph() -> StateGraph:
     builder.add_edge("assemble_final_response", END)
     
     # TODO add persistent checkpointing
-    memory = InMemorySaver()
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from src.api_support_chatbot.serde import create_serializer
+
+    memory = InMemorySaver(serde=create_serializer(Configuration.from_runnable_config()))
     return builder.compile(checkpointer=memory)
 
 
-# Graph instance for LangGraph server
-graph = create_chatbot_graph()
+# Shared graph instance, compiled on first use
+_graph: Optional["CompiledStateGraph"] = None
+
+
+def create_graph() -> "CompiledStateGraph":
+    """Entry point for LangGraph server configuration; compiles the shared graph on first call."""
+    global _graph
+    if _graph is None:
+        _graph = create_chatbot_graph()
+    return _graph
 
 
-def create_graph() -> StateGraph:
-    """Entry point for LangGraph server configuration."""
-    return graph
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    # Keep `from chatbot import graph` working without compiling at import time
+    if name == "graph":
+        return create_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
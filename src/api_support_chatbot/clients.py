@@ -0,0 +1,304 @@
+"""
+Pooled model and MCP clients shared across graph invocations.
+
+``langchain_openai`` and ``langchain_mcp_adapters`` are imported on first
+use, so importing this module (and the graph) does not pay for them.
+"""
+
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from src.api_support_chatbot.balancer import (
+    NoReplicaAvailable,
+    Replica,
+    ReplicaSet,
+    clear_replica_sets,
+    register_replica_set,
+)
+from src.api_support_chatbot.configuration import (
+    Configuration,
+    MCPServerConfig,
+    MCPTransport,
+)
+from src.api_support_chatbot.mcp_sessions import (
+    PersistentSession,
+    close_sessions,
+    get_session,
+)
+
+if TYPE_CHECKING:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langchain_openai import AzureChatOpenAI
+
+
+# Model instances keyed by their construction parameters. Each AzureChatOpenAI
+# owns an httpx connection pool, so reusing instances keeps TLS sessions warm.
+_model_pool: Dict[Tuple[Any, ...], "AzureChatOpenAI"] = {}
+
+# MCP clients and their tool lists keyed by the serialized connection config
+_mcp_clients: Dict[str, "MultiServerMCPClient"] = {}
+_mcp_tools: Dict[str, List[Any]] = {}
+_mcp_locks: Dict[str, asyncio.Lock] = {}
+
+# Transports whose connections carry all tool calls of a replica
+PERSISTENT_TRANSPORTS = (MCPTransport.WEBSOCKET, MCPTransport.SSE)
+
+# Runnables derived from pooled models (structured output, bound tools), keyed
+# by object identity. Entries keep their model alive so ids are not reused.
+_structured_models: Dict[Tuple[int, type], Tuple[Any, Any]] = {}
+_tool_models: Dict[Tuple[int, int], Tuple[Any, List[Any], Any]] = {}
+
+
+def _model_key(configuration: Configuration, deployment: str) -> Tuple[Any, ...]:
+    return (
+        deployment,
+        configuration.model_temperature,
+        configuration.max_tokens,
+        configuration.azure_openai_endpoint,
+        configuration.azure_openai_api_key,
+        configuration.azure_openai_api_version,
+        json.dumps(configuration.token_prices.get(deployment), sort_keys=True),
+    )
+
+
+def _mcp_key(configuration: Configuration) -> str:
+    return json.dumps(
+        [
+            {name: server.model_dump(mode="json") for name, server in configuration.mcp_servers.items()},
+            configuration.mcp_breaker_failure_threshold,
+            configuration.mcp_breaker_reset_timeout,
+            configuration.mcp_keepalive_interval,
+            configuration.mcp_reconnect_backoff,
+            configuration.mcp_reconnect_max_backoff,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def get_chat_model(configuration: Configuration, deployment: str) -> "AzureChatOpenAI":
+    """Get a pooled AzureChatOpenAI instance for the given deployment."""
+    key = _model_key(configuration, deployment)
+    model = _model_pool.get(key)
+    if model is None:
+        from langchain_openai import AzureChatOpenAI
+
+        from src.api_support_chatbot.accounting import UsageCallbackHandler
+
+        model = AzureChatOpenAI(
+            model = deployment,
+            temperature = configuration.model_temperature,
+            max_tokens = configuration.max_tokens,
+            azure_endpoint = configuration.azure_openai_endpoint,
+            api_key = configuration.azure_openai_api_key,
+            api_version = configuration.azure_openai_api_version,
+            max_retries = configuration.max_retries,
+            timeout = configuration.request_timeout,
+            callbacks = [UsageCallbackHandler(deployment, configuration.token_prices.get(deployment))],
+        )
+        _model_pool[key] = model
+    return model
+
+
+def get_structured_model(model: Any, schema: type) -> Any:
+    """
+    Get ``model.with_structured_output(schema)``, built once per model and schema.
+
+    Building it converts the schema to the JSON schema response format, which
+    is otherwise repeated on every call.
+    """
+    key = (id(model), schema)
+    entry = _structured_models.get(key)
+    if entry is None or entry[0] is not model:
+        entry = (model, model.with_structured_output(schema))
+        _structured_models[key] = entry
+    return entry[1]
+
+
+def get_model_with_tools(model: Any, tools: List[Any]) -> Any:
+    """Get ``model.bind_tools(tools)``, built once per model and tool list."""
+    key = (id(model), id(tools))
+    entry = _tool_models.get(key)
+    if entry is None or entry[0] is not model or entry[1] is not tools:
+        entry = (model, tools, model.bind_tools(tools))
+        _tool_models[key] = entry
+    return entry[2]
+
+
+def get_mcp_client(configuration: Configuration) -> "MultiServerMCPClient":
+    """Get a pooled MCP client for the configured servers."""
+    key = _mcp_key(configuration)
+    client = _mcp_clients.get(key)
+    if client is None:
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+
+        client = MultiServerMCPClient(configuration.get_mcp_connections())
+        _mcp_clients[key] = client
+    return client
+
+
+class ReplicaTools:
+    """
+    Tools of a logical MCP server, routed to its replicas call by call.
+
+    Over ``streamable_http`` every call opens its own session. Over the
+    persistent transports (``websocket``, ``sse``) each replica has one
+    long-lived session multiplexing all calls (see ``mcp_sessions``); a call
+    failing on it makes the session check that the server still answers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        server: MCPServerConfig,
+        replica_set: ReplicaSet,
+        configuration: Optional[Configuration] = None,
+    ) -> None:
+        self.name = name
+        self.server = server
+        self.replica_set = replica_set
+        self.configuration = configuration or Configuration()
+        self._tools: Dict[str, Dict[str, Any]] = {}
+
+    def _session(self, replica: Replica) -> PersistentSession:
+        return get_session(
+            self.name,
+            self.server.to_connection_dict(replica.url),
+            keepalive_interval=self.configuration.mcp_keepalive_interval,
+            backoff=self.configuration.mcp_reconnect_backoff,
+            max_backoff=self.configuration.mcp_reconnect_max_backoff,
+        )
+
+    async def _replica_tools(self, replica: Replica) -> Dict[str, Any]:
+        if self.server.transport in PERSISTENT_TRANSPORTS:
+            return await self._session(replica).tools()
+        tools = self._tools.get(replica.url)
+        if tools is None:
+            from langchain_mcp_adapters.client import MultiServerMCPClient
+
+            client = MultiServerMCPClient({self.name: self.server.to_connection_dict(replica.url)})
+            tools = {tool.name: tool for tool in await client.get_tools(server_name=self.name)}
+            self._tools[replica.url] = tools
+        return tools
+
+    async def call(self, fn: Any) -> Any:
+        """
+        Run ``fn(replica_tools)`` on a chosen replica, failing over once.
+
+        Exceptions (transport errors, timeouts) count as replica failures;
+        tool errors reported by the server are returned by the tool itself.
+        A cancelled call releases the replica without counting either way.
+        """
+        replica = self.replica_set.choose()
+        failed_over = False
+        while True:
+            started = self.replica_set.begin(replica)
+            try:
+                result = await fn(await self._replica_tools(replica))
+            except Exception as error:
+                self.replica_set.end(replica, started, ok=False)
+                if self.server.transport in PERSISTENT_TRANSPORTS:
+                    await self._session(replica).verify()
+                if failed_over:
+                    raise
+                try:
+                    replica = self.replica_set.choose(exclude=replica)
+                except NoReplicaAvailable:
+                    raise error
+                failed_over = True
+                continue
+            except BaseException:
+                # Cancelled: release the replica (and a half-open probe) so it stays usable
+                self.replica_set.abandon(replica)
+                raise
+            self.replica_set.end(replica, started, ok=True)
+            return result
+
+    async def list_tools(self) -> List[Any]:
+        """List the server's tools as tools that balance each call across replicas."""
+        from langchain_core.tools import StructuredTool
+
+        async def listing(tools: Dict[str, Any]) -> List[Any]:
+            return list(tools.values())
+
+        def routed(tool_name: str) -> Any:
+            async def call_tool(**arguments: Any) -> Any:
+                async def invoke(tools: Dict[str, Any]) -> Any:
+                    return await tools[tool_name].coroutine(**arguments)
+                return await self.call(invoke)
+            return call_tool
+
+        balanced = []
+        for template in await self.call(listing):
+            balanced.append(StructuredTool(
+                name=template.name,
+                description=template.description,
+                args_schema=template.args_schema,
+                coroutine=routed(template.name),
+                response_format=template.response_format,
+                metadata=template.metadata,
+            ))
+        return balanced
+
+
+async def _list_server_tools(configuration: Configuration, name: str, server: MCPServerConfig) -> List[Any]:
+    if server.transport == MCPTransport.STDIO:
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+
+        return await MultiServerMCPClient({name: server.to_connection_dict()}).get_tools(server_name=name)
+
+    replica_set = ReplicaSet(
+        name,
+        server.endpoints(),
+        failure_threshold=configuration.mcp_breaker_failure_threshold,
+        reset_timeout=configuration.mcp_breaker_reset_timeout,
+    )
+    register_replica_set(replica_set)
+    return await ReplicaTools(name, server, replica_set, configuration).list_tools()
+
+
+async def get_mcp_tools(configuration: Configuration) -> List[Any]:
+    """
+    Get the MCP tools for the configured servers, listing them only once.
+
+    Tools of URL-based servers are balanced across the server's replicas
+    with per-replica circuit breakers (see ``balancer``). Concurrent callers
+    for the same servers wait on a single listing.
+    """
+    key = _mcp_key(configuration)
+    tools = _mcp_tools.get(key)
+    if tools is not None:
+        return tools
+
+    lock = _mcp_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        tools = _mcp_tools.get(key)
+        if tools is None:
+            tools = []
+            for name, server in configuration.mcp_servers.items():
+                tools.extend(await _list_server_tools(configuration, name, server))
+            _mcp_tools[key] = tools
+    return tools
+
+
+def invalidate_mcp_tools() -> None:
+    """Drop cached MCP tool lists so they are fetched again on next use."""
+    _mcp_tools.clear()
+    _mcp_locks.clear()
+    _tool_models.clear()
+    clear_replica_sets()
+
+
+async def close_clients() -> None:
+    """Close pooled HTTP connections and clear all pools."""
+    for model in list(_model_pool.values()):
+        try:
+            await model.root_async_client.close()
+        except Exception:
+            pass
+    _model_pool.clear()
+    _structured_models.clear()
+    _mcp_clients.clear()
+    invalidate_mcp_tools()
+    await close_sessions()
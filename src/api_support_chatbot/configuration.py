@@ -1,11 +1,59 @@
 """Configuration management for the API Support Chatbot."""
 
+import hashlib
+import json
 import os
+from collections import OrderedDict
 from enum import Enum
-from typing import Any, Dict, Optional
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 
-from langchain_core.runnables import RunnableConfig
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+
+
+# Returns the value of a secret by environment variable name, or None
+SecretProvider = Callable[[str], Optional[str]]
+
+_secret_provider: SecretProvider = os.getenv
+
+# Fields resolved through the secret provider and never read from `configurable`
+SECRET_FIELDS = frozenset({"azure_openai_api_key"})
+
+# Fields a response agent's answer depends on (see ``Configuration.answer_fingerprint``)
+ANSWER_FIELDS = frozenset({
+    "azure_openai_endpoint",
+    "azure_openai_api_version",
+    "azure_openai_deployment_name",
+    "azure_hq_openai_deployment_name",
+    "mcp_servers",
+    "fan_out_deadline",
+    "response_agent_max_iterations",
+    "iteration_budgets",
+    "context_sufficiency_threshold",
+    "iteration_extensions",
+    "model_temperature",
+    "max_tokens",
+})
+
+
+def set_secret_provider(provider: Optional[SecretProvider]) -> None:
+    """
+    Set the function used to resolve secrets (default: process environment).
+
+    Resolved configurations are cached, so the cache is cleared as well.
+    """
+    global _secret_provider
+    _secret_provider = provider or os.getenv
+    clear_configuration_cache()
+
+
+def resolve_secret(name: str, default: str = "") -> str:
+    """Resolve a secret by name through the configured provider."""
+    value = _secret_provider(name)
+    return default if value is None else value
 
 
 class MCPTransport(Enum):
@@ -16,36 +64,105 @@ class MCPTransport(Enum):
     SSE = "sse"
 
 
+class DegradationMode(Enum):
+    """
+    Degradation ladder under overload; each mode includes the ones before it.
+
+    - ``skip_assembler``: single-item turns return the item's answer without the assembler call
+    - ``cap_fan_out``: at most ``degraded_max_fan_out`` response agents per turn
+    - ``mini_only``: every node uses the mini deployment
+    - ``reduced_iterations``: one tool round per response agent
+    - ``cache_only``: answers only from recently answered identical items, no assembler call
+    - ``reject``: turns are rejected with a retry-after
+    """
+    NORMAL = "normal"
+    SKIP_ASSEMBLER = "skip_assembler"
+    CAP_FAN_OUT = "cap_fan_out"
+    MINI_ONLY = "mini_only"
+    REDUCED_ITERATIONS = "reduced_iterations"
+    CACHE_ONLY = "cache_only"
+    REJECT = "reject"
+
+    @property
+    def level(self) -> int:
+        return _DEGRADATION_LEVELS[self]
+
+
+_DEGRADATION_LEVELS = {mode: level for level, mode in enumerate(DegradationMode)}
+
+
+class CheckpointCompression(Enum):
+    """Compression of long message text in checkpoints (zstd needs ``zstandard``)."""
+    NONE = "none"
+    ZLIB = "zlib"
+    ZSTD = "zstd"
+
+
 class MCPServerConfig(BaseModel):
     """Configuration for an MCP server connection."""
     
     url: Optional[str] = None
+    replicas: list[str] = Field(
+        default_factory=list,
+        description="Replica endpoints of this server; tool calls are balanced across them (default: url)"
+    )
     command: Optional[str] = None
     args: Optional[list[str]] = None
     transport: MCPTransport = MCPTransport.STREAMABLE_HTTP
     timeout: int = 30
+
+    def endpoints(self) -> list[str]:
+        """URLs of all replicas of this server."""
+        return list(self.replicas) or ([self.url] if self.url else [])
     
-    def to_connection_dict(self) -> Dict[str, Any]:
-        """Convert to connection dictionary format for MCP client."""
+    def to_connection_dict(self, url: Optional[str] = None) -> Dict[str, Any]:
+        """Convert to connection dictionary format for MCP client (optionally for one replica url)."""
         if self.transport == MCPTransport.STREAMABLE_HTTP:
             return {
-                "url": self.url,
+                "url": url or self.url,
                 "transport": self.transport.value,
                 "timeout": self.timeout
             }
+        elif self.transport == MCPTransport.SSE:
+            return {
+                "url": url or self.url,
+                "transport": self.transport.value,
+                "timeout": self.timeout
+            }
+        elif self.transport == MCPTransport.WEBSOCKET:
+            return {
+                "url": url or self.url,
+                "transport": self.transport.value,
+            }
         elif self.transport == MCPTransport.STDIO:
             return {
                 "command": self.command,
                 "args": self.args or [],
                 "transport": self.transport.value,
-                "timeout": self.timeout
             }
         else:
             raise ValueError(f"Unsupported transport: {self.transport}")
 
 
+def _server_from_env(prefix: str, default_url: str) -> MCPServerConfig:
+    """Build a server config from ``<prefix>_URL`` (comma-separated replicas) and ``<prefix>_TRANSPORT``."""
+    urls = [url.strip() for url in os.getenv(f"{prefix}_URL", default_url).split(",") if url.strip()]
+    return MCPServerConfig(
+        url=urls[0] if urls else None,
+        replicas=urls if len(urls) > 1 else [],
+        transport=MCPTransport(os.getenv(f"{prefix}_TRANSPORT", "streamable_http")),
+    )
+
+
 class Configuration(BaseModel):
-    """Main configuration for the API Support Chatbot."""
+    """
+    Main configuration for the API Support Chatbot.
+
+    Instances are immutable, so a resolved configuration can be shared by all
+    nodes and invocations that use the same settings.
+    """
+
+    model_config = ConfigDict(frozen=True)
     
     # Azure OpenAI Configuration
     azure_openai_endpoint: str = Field(
@@ -53,8 +170,9 @@ class Configuration(BaseModel):
         description="Azure OpenAI service endpoint"
     )
     azure_openai_api_key: str = Field(
-        default_factory=lambda: os.getenv("AZURE_OPENAI_API_KEY", ""),
-        description="Azure OpenAI API key"
+        default_factory=lambda: resolve_secret("AZURE_OPENAI_API_KEY"),
+        description="Azure OpenAI API key (resolved from the secret provider)",
+        repr=False,
     )
     azure_openai_api_version: str = Field(
         default_factory=lambda: os.getenv("AZURE_OPENAI_API_VERSION", "2025-04-01-preview"),
@@ -72,13 +190,30 @@ class Configuration(BaseModel):
     # MCP Server Configuration
     mcp_servers: Dict[str, MCPServerConfig] = Field(
         default_factory=lambda: {
-            "api_support": MCPServerConfig(
-                url=os.getenv("MCP_API_SUPPORT_SERVER_URL", "http://localhost:9000/mcp"),
-                transport=MCPTransport(os.getenv("MCP_API_SUPPORT_SERVER_TRANSPORT", "streamable_http"))
-            )
+            "api_support": _server_from_env("MCP_API_SUPPORT_SERVER", "http://localhost:9000/mcp")
         },
         description="MCP server configurations"
     )
+    mcp_breaker_failure_threshold: int = Field(
+        default_factory=lambda: int(os.getenv("MCP_BREAKER_FAILURE_THRESHOLD", "3")),
+        description="Consecutive failures after which an MCP replica's circuit breaker opens"
+    )
+    mcp_breaker_reset_timeout: float = Field(
+        default_factory=lambda: float(os.getenv("MCP_BREAKER_RESET_TIMEOUT", "10")),
+        description="Seconds an open MCP replica breaker waits before a half-open probe"
+    )
+    mcp_keepalive_interval: float = Field(
+        default_factory=lambda: float(os.getenv("MCP_KEEPALIVE_INTERVAL", "15")),
+        description="Seconds between keep-alive pings of persistent (websocket, sse) MCP sessions"
+    )
+    mcp_reconnect_backoff: float = Field(
+        default_factory=lambda: float(os.getenv("MCP_RECONNECT_BACKOFF", "1")),
+        description="Seconds a persistent MCP session waits after a failed connect, doubled on every failure"
+    )
+    mcp_reconnect_max_backoff: float = Field(
+        default_factory=lambda: float(os.getenv("MCP_RECONNECT_MAX_BACKOFF", "30")),
+        description="Upper bound of the reconnect backoff of persistent MCP sessions"
+    )
     
     # Chatbot Configuration
     max_retries: int = Field(
@@ -93,7 +228,183 @@ class Configuration(BaseModel):
         default_factory=lambda: int(os.getenv("REQUEST_TIMEOUT", "30")),
         description="Request timeout in seconds"
     )
-    
+
+    # Request Coalescing
+    enable_request_coalescing: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_REQUEST_COALESCING", "true").lower() == "true",
+        description="Share one response computation between identical concurrent request items"
+    )
+    coalescing_wait_timeout: float = Field(
+        default_factory=lambda: float(os.getenv("COALESCING_WAIT_TIMEOUT", "20")),
+        description="Maximum seconds to wait for a coalesced computation before running independently"
+    )
+
+    # Fan-out Deadline
+    fan_out_deadline: float = Field(
+        default_factory=lambda: float(os.getenv("FAN_OUT_DEADLINE", "0")),
+        description="Seconds after fan-out at which the assembler proceeds without late response items (0 disables)"
+    )
+    deliver_late_results: bool = Field(
+        default_factory=lambda: os.getenv("DELIVER_LATE_RESULTS", "false").lower() == "true",
+        description="Keep late response agents running and deliver their answers as a follow-up message"
+    )
+    late_result_timeout: float = Field(
+        default_factory=lambda: float(os.getenv("LATE_RESULT_TIMEOUT", "120")),
+        description="Maximum seconds a late response agent keeps running for a follow-up"
+    )
+
+    # FAQ Store
+    faq_store_path: str = Field(
+        default_factory=lambda: os.getenv("FAQ_STORE_PATH", ""),
+        description="Directory of precomputed FAQ answers consulted before the fan-out (empty disables)"
+    )
+    faq_ttl: float = Field(
+        default_factory=lambda: float(os.getenv("FAQ_TTL", str(30 * 24 * 3600))),
+        description="Age in seconds after which a precomputed FAQ answer is no longer served"
+    )
+    faq_refresh_after: float = Field(
+        default_factory=lambda: float(os.getenv("FAQ_REFRESH_AFTER", str(7 * 24 * 3600))),
+        description="Age in seconds after which the FAQ pipeline recomputes an answer"
+    )
+
+    # Response Agent Iteration Budget
+    response_agent_max_iterations: int = Field(
+        default_factory=lambda: int(os.getenv("RESPONSE_AGENT_MAX_ITERATIONS", "2")),
+        description="Tool rounds of a response agent for categories without a budget of their own"
+    )
+    iteration_budgets: Dict[str, int] = Field(
+        default_factory=lambda: json.loads(os.getenv("ITERATION_BUDGETS", "{}")),
+        description="Tool rounds of a response agent by request category, e.g. {'How-To on API Usage & Functionality': 1}"
+    )
+    context_sufficiency_threshold: float = Field(
+        default_factory=lambda: float(os.getenv("CONTEXT_SUFFICIENCY_THRESHOLD", "0.8")),
+        description="Share of a request's significant words in the retrieved context that ends the tool loop early (0 disables)"
+    )
+    iteration_extensions: int = Field(
+        default_factory=lambda: int(os.getenv("ITERATION_EXTENSIONS", "1")),
+        description="Tool rounds a response agent may add past its budget when the fan-out deadline allows"
+    )
+
+    # Partial Failure Recovery
+    response_item_retries: int = Field(
+        default_factory=lambda: int(os.getenv("RESPONSE_ITEM_RETRIES", "1")),
+        description="Times a failed response item is re-run on its own before the turn is assembled without it"
+    )
+
+    # Retrieval Memory
+    enable_retrieval_memory: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_RETRIEVAL_MEMORY", "true").lower() == "true",
+        description="Keep the thread's tool results in its state and reuse them on follow-up turns"
+    )
+    retrieval_memory_max_entries: int = Field(
+        default_factory=lambda: int(os.getenv("RETRIEVAL_MEMORY_MAX_ENTRIES", "32")),
+        description="Tool results kept per thread, the least recently used are evicted first"
+    )
+    retrieval_memory_max_chars: int = Field(
+        default_factory=lambda: int(os.getenv("RETRIEVAL_MEMORY_MAX_CHARS", "50000")),
+        description="Characters of tool results kept per thread, the least recently used are evicted first"
+    )
+    retrieval_memory_min_coverage: float = Field(
+        default_factory=lambda: float(os.getenv("RETRIEVAL_MEMORY_MIN_COVERAGE", "0.8")),
+        description="Share of a request's significant words the remembered passages must cover to answer without retrieving (0 disables)"
+    )
+    retrieval_memory_ttl: float = Field(
+        default_factory=lambda: float(os.getenv("RETRIEVAL_MEMORY_TTL", "3600")),
+        description="Seconds a tool result is reused after it was retrieved (0 keeps it until evicted)"
+    )
+
+    # Turn Supersession
+    enable_turn_supersession: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_TURN_SUPERSESSION", "true").lower() == "true",
+        description="Cancel a thread's in-flight turn when a new customer message arrives on the thread"
+    )
+
+    # Message Debouncing
+    message_debounce_window: float = Field(
+        default_factory=lambda: float(os.getenv("MESSAGE_DEBOUNCE_WINDOW", "0")),
+        description="Seconds to wait for further messages on a thread before starting a turn (0 disables)"
+    )
+    message_debounce_max_wait: float = Field(
+        default_factory=lambda: float(os.getenv("MESSAGE_DEBOUNCE_MAX_WAIT", "3")),
+        description="Maximum seconds a burst of messages is held after its first message"
+    )
+
+    # Admission Control
+    enable_admission_control: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_ADMISSION_CONTROL", "false").lower() == "true",
+        description="Pick the degradation mode of each turn from queue depth and turn latency"
+    )
+    admission_max_in_flight: int = Field(
+        default_factory=lambda: int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "50")),
+        description="Turns in flight per worker at which new turns are rejected"
+    )
+    admission_latency_target: float = Field(
+        default_factory=lambda: float(os.getenv("ADMISSION_LATENCY_TARGET", "20")),
+        description="Turn latency in seconds at which new turns are rejected"
+    )
+    admission_retry_after: int = Field(
+        default_factory=lambda: int(os.getenv("ADMISSION_RETRY_AFTER", "5")),
+        description="Retry-After seconds sent with rejected turns"
+    )
+    degradation_mode: DegradationMode = Field(
+        default_factory=lambda: DegradationMode(os.getenv("DEGRADATION_MODE", "normal")),
+        description="Degradation mode of a turn (set per turn by admission control, or forced)"
+    )
+    degraded_max_fan_out: int = Field(
+        default_factory=lambda: int(os.getenv("DEGRADED_MAX_FAN_OUT", "3")),
+        description="Maximum response agents per turn from the cap_fan_out mode on"
+    )
+
+    # Checkpoint Serialization
+    enable_compact_checkpoints: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_COMPACT_CHECKPOINTS", "true").lower() == "true",
+        description="Serialize messages and state models in checkpoints with the compact chatbot format"
+    )
+    checkpoint_compression: CheckpointCompression = Field(
+        default_factory=lambda: CheckpointCompression(os.getenv("CHECKPOINT_COMPRESSION", "zlib")),
+        description="Compression of long message text in compact checkpoints"
+    )
+    checkpoint_compression_threshold: int = Field(
+        default_factory=lambda: int(os.getenv("CHECKPOINT_COMPRESSION_THRESHOLD", "1024")),
+        description="Minimum UTF-8 size in bytes of a text compressed in compact checkpoints"
+    )
+
+    # Warm-up
+    enable_warmup: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_WARMUP", "true").lower() == "true",
+        description="Warm up connections, MCP tools and model runnables before reporting ready"
+    )
+    warmup_probe: bool = Field(
+        default_factory=lambda: os.getenv("WARMUP_PROBE", "false").lower() == "true",
+        description="Issue a one-token probe completion per deployment during warm-up"
+    )
+    warmup_timeout: float = Field(
+        default_factory=lambda: float(os.getenv("WARMUP_TIMEOUT", "30")),
+        description="Maximum seconds for each warm-up step"
+    )
+
+    # Loop Lag Monitor and Node Profiler
+    enable_loop_monitor: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_LOOP_MONITOR", "true").lower() == "true",
+        description="Measure event loop lag and attribute stalls to the running graph node"
+    )
+    loop_lag_interval: float = Field(
+        default_factory=lambda: float(os.getenv("LOOP_LAG_INTERVAL", "0.5")),
+        description="Seconds between event loop lag measurements"
+    )
+    loop_lag_threshold: float = Field(
+        default_factory=lambda: float(os.getenv("LOOP_LAG_THRESHOLD", "0.1")),
+        description="Event loop lag in seconds reported as a stall"
+    )
+    enable_node_profiler: bool = Field(
+        default_factory=lambda: os.getenv("ENABLE_NODE_PROFILER", "false").lower() == "true",
+        description="Sample the stacks of graph nodes from start-up (can be toggled at run time)"
+    )
+    node_profiler_interval: float = Field(
+        default_factory=lambda: float(os.getenv("NODE_PROFILER_INTERVAL", "0.005")),
+        description="Seconds between node profiler stack samples"
+    )
+
     # Model Configuration
     model_temperature: float = Field(
         default=0.1,
@@ -104,24 +415,65 @@ class Configuration(BaseModel):
         description="Maximum tokens for model responses"
     )
     
+    # Token Accounting
+    token_prices: Dict[str, Dict[str, float]] = Field(
+        default_factory=lambda: json.loads(os.getenv("TOKEN_PRICES", "{}")),
+        description="Price per 1K tokens by deployment, e.g. {'gpt-4o': {'prompt': 0.0025, 'completion': 0.01, 'cached': 0.00125}}"
+    )
+    
     @classmethod
     def from_env(cls) -> "Configuration":
         """Create configuration from environment variables."""
         return cls()
     
     @classmethod
-    def from_runnable_config(cls, config: Optional[RunnableConfig] = None) -> "Configuration":
-        """Create configuration from LangGraph runnable config."""
-        if config is None or "configurable" not in config:
-            return cls.from_env()
-        
-        configurable = config["configurable"]
-        if isinstance(configurable, dict):
-            return cls(**configurable)
-        elif isinstance(configurable, Configuration):
+    def from_runnable_config(cls, config: Optional["RunnableConfig"] = None) -> "Configuration":
+        """
+        Resolve configuration from LangGraph runnable config.
+
+        Only keys that are configuration fields are used (thread ids and
+        LangGraph internals are ignored), and secrets are always taken from
+        the secret provider. Resolved configurations are cached by the
+        fingerprint of those keys, so environment variables are read once
+        per distinct set of overrides rather than on every node call.
+        """
+        configurable = (config or {}).get("configurable")
+        if isinstance(configurable, Configuration):
             return configurable
+        if not isinstance(configurable, dict):
+            configurable = {}
+
+        overrides = {
+            key: value for key, value in configurable.items() if key in _OVERRIDABLE_FIELDS
+        }
+        cache_key = _cache_key(overrides)
+        resolved = _resolved_configurations.get(cache_key)
+        if resolved is None:
+            resolved = cls(**overrides)
+            _resolved_configurations[cache_key] = resolved
+            while len(_resolved_configurations) > _MAX_RESOLVED_CONFIGURATIONS:
+                _resolved_configurations.popitem(last=False)
         else:
-            return cls.from_env()
+            _resolved_configurations.move_to_end(cache_key)
+        return resolved
+
+    @cached_property
+    def answer_fingerprint(self) -> str:
+        """
+        Fingerprint of the settings a response agent's answer depends on.
+
+        Request items are only coalesced with, or answered from, items
+        resolved under the same model, MCP servers and agent limits.
+        """
+        return config_fingerprint(self.model_dump(mode="json", include=set(ANSWER_FIELDS)))
+
+    def degraded(self, mode: DegradationMode) -> bool:
+        """Whether this configuration's degradation mode includes ``mode``."""
+        return self.degradation_mode.level >= mode.level
+
+    def to_configurable(self) -> Dict[str, Any]:
+        """Settings to pass as `configurable`, without secrets."""
+        return self.model_dump(mode="json", exclude=set(SECRET_FIELDS))
     
     
     def get_mcp_connections(self) -> Dict[str, Dict[str, Any]]:
@@ -129,4 +481,35 @@ class Configuration(BaseModel):
         return {
             name: server.to_connection_dict() 
             for name, server in self.mcp_servers.items()
-        }
\ No newline at end of file
+        }
+
+
+# Configuration fields that may be set through `configurable`
+_OVERRIDABLE_FIELDS = frozenset(Configuration.model_fields) - SECRET_FIELDS
+
+# Resolved configurations keyed by their overrides
+_MAX_RESOLVED_CONFIGURATIONS = 128
+_resolved_configurations: "OrderedDict[Any, Configuration]" = OrderedDict()
+
+
+def _cache_key(overrides: Dict[str, Any]) -> Any:
+    # Scalar overrides are used as-is; nested values fall back to the fingerprint
+    key = tuple(sorted(overrides.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return config_fingerprint(overrides)
+    return key
+
+
+def config_fingerprint(overrides: Dict[str, Any]) -> str:
+    """Stable fingerprint of configuration overrides."""
+    if not overrides:
+        return ""
+    payload = json.dumps(overrides, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def clear_configuration_cache() -> None:
+    """Drop resolved configurations, e.g. after the environment changed."""
+    _resolved_configurations.clear()
@@ -0,0 +1,157 @@
+"""Per-thread debounce window that merges bursts of customer messages into one turn."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.api_support_chatbot.telemetry import REGISTRY
+from src.api_support_chatbot.turns import RunTurn, Turn, TurnRegistry, turn_registry
+from src.api_support_chatbot.utils import log_agent_action
+
+MERGED_MESSAGES = REGISTRY.counter(
+    "chatbot_debounce_merged_messages_total",
+    "Customer messages merged into another message's turn (each saves at least one get_request_details call)",
+)
+DEBOUNCE_DELAY = REGISTRY.histogram(
+    "chatbot_debounce_delay_seconds",
+    "Latency added by the debounce window, from the last message of a burst to the start of its turn",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+BATCH_MESSAGES = REGISTRY.histogram(
+    "chatbot_debounce_batch_messages",
+    "Customer messages per debounced turn",
+    buckets=(1, 2, 3, 4, 5, 8, 13),
+)
+
+# The window is this multiple of the thread's typical gap between burst messages
+_CADENCE_FACTOR = 1.5
+# ...but no shorter than this fraction of the configured window
+_MIN_WINDOW_FRACTION = 0.25
+# Weight of the newest gap in the cadence average
+_CADENCE_ALPHA = 0.5
+
+
+class _Batch:
+    """Messages of one thread waiting for the debounce window to close."""
+
+    __slots__ = ("messages", "run", "first_at", "last_at", "timer", "turn")
+
+    def __init__(self, now: float) -> None:
+        self.messages: List[Any] = []
+        self.run: Optional[RunTurn] = None
+        self.first_at = now
+        self.last_at = now
+        self.timer: Optional[asyncio.Task] = None
+        self.turn: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class MessageDebouncer:
+    """
+    Hold a thread's messages for a short window and start one turn for all of them.
+
+    Every message restarts the window, bounded by ``max_wait`` from the first
+    message of the burst. The window adapts to the thread's typing cadence: it
+    is ``_CADENCE_FACTOR`` times the moving average of the gaps between
+    messages that arrived within ``max_wait`` of each other, so quick typists
+    wait less and slow ones are still merged.
+    """
+
+    def __init__(self, registry: Optional[TurnRegistry] = None, max_threads: int = 10000) -> None:
+        self._registry = registry or turn_registry
+        self._max_threads = max_threads
+        self._batches: Dict[str, _Batch] = {}
+        # thread_id -> (last message time, average gap or None)
+        self._cadence: "OrderedDict[str, Tuple[float, Optional[float]]]" = OrderedDict()
+
+    def window(self, thread_id: str, base: float, max_wait: float) -> float:
+        """Current debounce window of a thread in seconds."""
+        _, gap = self._cadence.get(thread_id, (0.0, None))
+        if gap is None:
+            return min(base, max_wait)
+        return min(max_wait, max(base * _MIN_WINDOW_FRACTION, gap * _CADENCE_FACTOR))
+
+    def _observe(self, thread_id: str, now: float, max_wait: float) -> None:
+        last_at, gap = self._cadence.pop(thread_id, (None, None))
+        if last_at is not None and now - last_at <= max_wait:
+            sample = now - last_at
+            gap = sample if gap is None else _CADENCE_ALPHA * sample + (1 - _CADENCE_ALPHA) * gap
+        self._cadence[thread_id] = (now, gap)
+        while len(self._cadence) > self._max_threads:
+            self._cadence.popitem(last=False)
+
+    async def submit(
+        self,
+        graph: Any,
+        config: Dict[str, Any],
+        message: Any,
+        run: RunTurn,
+        window: float,
+        max_wait: float,
+        supersede: bool = True,
+    ) -> Tuple[Turn, bool]:
+        """
+        Add a message to the thread's burst and wait for the burst's turn to start.
+
+        The turn is run with the ``run`` of the last message of the burst.
+
+        Args:
+            graph: Compiled chatbot graph
+            config: Runnable config with the thread id
+            message: Customer message
+            run: Coroutine function running the graph with (input, config)
+            window: Configured debounce window in seconds
+            max_wait: Maximum seconds a burst is held after its first message
+            supersede: Passed on to ``TurnRegistry.start``
+
+        Returns:
+            Tuple of (turn, last) where ``last`` is True for the message whose
+            ``run`` executes the turn
+        """
+        thread_id = config["configurable"]["thread_id"]
+        now = time.monotonic()
+        self._observe(thread_id, now, max_wait)
+
+        batch = self._batches.get(thread_id)
+        if batch is None:
+            batch = self._batches[thread_id] = _Batch(now)
+        else:
+            MERGED_MESSAGES.inc()
+            batch.timer.cancel()
+        batch.messages.append(message)
+        batch.run = run
+        batch.last_at = now
+        position = len(batch.messages)
+
+        delay = min(self.window(thread_id, window, max_wait), batch.first_at + max_wait - now)
+        batch.timer = asyncio.ensure_future(self._flush(graph, config, batch, max(0.0, delay), supersede))
+
+        turn = await asyncio.shield(batch.turn)
+        return turn, position == len(batch.messages)
+
+    async def _flush(self, graph: Any, config: Dict[str, Any], batch: _Batch, delay: float, supersede: bool) -> None:
+        await asyncio.sleep(delay)
+        thread_id = config["configurable"]["thread_id"]
+        # From here on the burst is closed; new messages start the next one
+        del self._batches[thread_id]
+        DEBOUNCE_DELAY.observe(time.monotonic() - batch.last_at)
+        BATCH_MESSAGES.observe(len(batch.messages))
+        if len(batch.messages) > 1:
+            log_agent_action("Debounce", "Merged message burst", {
+                "thread_id": thread_id,
+                "messages": len(batch.messages),
+                "burst_ms": round((batch.last_at - batch.first_at) * 1000, 1),
+            })
+        try:
+            turn = await self._registry.start(graph, config, batch.messages, batch.run, supersede=supersede)
+        except asyncio.CancelledError:
+            batch.turn.cancel()
+            raise
+        except Exception as e:
+            batch.turn.set_exception(e)
+            return
+        batch.turn.set_result(turn)
+
+
+# Process-wide debouncer of this worker
+message_debouncer = MessageDebouncer()
@@ -0,0 +1,155 @@
+"""On-disk store of precomputed FAQ answers, consulted before the live fan-out."""
+
+import asyncio
+import gzip
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from src.api_support_chatbot.singleflight import normalize_text, request_fingerprint
+from src.api_support_chatbot.state import RequestItem, ResponseItem
+from src.api_support_chatbot.telemetry import REGISTRY
+
+STORE_VERSION = 1
+
+FAQ_LOOKUPS = REGISTRY.counter(
+    "chatbot_faq_lookups_total", "FAQ store lookups of request items, by outcome", ["outcome"]
+)
+
+_SLUG_INVALID = re.compile(r"[^a-z0-9]+")
+
+
+class FAQEntry(BaseModel):
+    """A vetted precomputed answer and where it came from."""
+
+    request_text: str = Field(description="Representative request of the cluster")
+    response_text: str = Field(description="Answer of the response agent")
+    confidence: float = Field(description="Confidence reported by the response agent")
+    cluster_size: int = Field(description="Historical requests in the cluster")
+    source_ids: List[str] = Field(default_factory=list, description="Sample of historical request ids in the cluster")
+    deployment: str = Field(description="Deployment that produced the answer")
+    computed_at: float = Field(description="Unix time the answer was computed")
+
+    def to_response_item(self, request_item: RequestItem) -> ResponseItem:
+        return ResponseItem(
+            request_id=request_item.id,
+            request_text=request_item.request_text,
+            product_id=request_item.product_id,
+            response_text=self.response_text,
+            response_found=True,
+            confidence=self.confidence,
+        )
+
+
+def _slug(value: Optional[str]) -> str:
+    return _SLUG_INVALID.sub("-", normalize_text(value)).strip("-") or "_"
+
+
+class FAQStore:
+    """
+    Precomputed answers keyed by product and category.
+
+    Each (product, category) pair is one gzip-compressed JSON file mapping
+    request fingerprints to entries, so a lookup only loads the file it
+    needs. Loaded files are cached and reloaded when the offline pipeline
+    rewrites them (checked at most every ``reload_interval`` seconds). On
+    the event loop use ``alookup``, which reads files in a worker thread.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 30.0, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.reload_interval = reload_interval
+        self._clock = clock
+        # file -> (checked_at, mtime, entries)
+        self._files: Dict[str, Tuple[float, float, Dict[str, FAQEntry]]] = {}
+
+    def file_for(self, product_id: Optional[str], category: Optional[str]) -> str:
+        return os.path.join(self.path, _slug(product_id), f"{_slug(category)}.json.gz")
+
+    def load(self, product_id: Optional[str], category: Optional[str]) -> Dict[str, FAQEntry]:
+        """Entries of a product and category (empty if there are none)."""
+        file = self.file_for(product_id, category)
+        now = self._clock()
+        cached = self._files.get(file)
+        if cached is not None and now - cached[0] < self.reload_interval:
+            return cached[2]
+        try:
+            mtime = os.stat(file).st_mtime
+        except FileNotFoundError:
+            self._files[file] = (now, 0.0, {})
+            return {}
+        if cached is not None and cached[1] == mtime:
+            self._files[file] = (now, mtime, cached[2])
+            return cached[2]
+        with gzip.open(file, "rt", encoding="utf-8") as f:
+            document = json.load(f)
+        entries = {key: FAQEntry(**entry) for key, entry in document.get("entries", {}).items()}
+        self._files[file] = (now, mtime, entries)
+        return entries
+
+    async def aload(self, product_id: Optional[str], category: Optional[str]) -> Dict[str, FAQEntry]:
+        """Like ``load``, but checks and reads the file in a worker thread unless the cache is fresh."""
+        cached = self._files.get(self.file_for(product_id, category))
+        if cached is not None and self._clock() - cached[0] < self.reload_interval:
+            return cached[2]
+        return await asyncio.to_thread(self.load, product_id, category)
+
+    def lookup(self, request_item: RequestItem, ttl: float) -> Optional[FAQEntry]:
+        """Entry for a request item if there is one younger than ``ttl`` seconds."""
+        return self._match(request_item, self.load(request_item.product_id, request_item.category), ttl)
+
+    async def alookup(self, request_item: RequestItem, ttl: float) -> Optional[FAQEntry]:
+        """Like ``lookup``, without blocking the event loop on file reads."""
+        return self._match(request_item, await self.aload(request_item.product_id, request_item.category), ttl)
+
+    def _match(self, request_item: RequestItem, entries: Dict[str, FAQEntry], ttl: float) -> Optional[FAQEntry]:
+        entry = entries.get(
+            request_fingerprint(request_item.product_id, request_item.category, request_item.request_text)
+        )
+        if entry is None:
+            FAQ_LOOKUPS.inc(outcome="miss")
+            return None
+        if self._clock() - entry.computed_at > ttl:
+            FAQ_LOOKUPS.inc(outcome="stale")
+            return None
+        FAQ_LOOKUPS.inc(outcome="hit")
+        return entry
+
+    def write(self, product_id: Optional[str], category: Optional[str], entries: Dict[str, FAQEntry]) -> None:
+        """Replace the entries of a product and category atomically."""
+        file = self.file_for(product_id, category)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        document = {
+            "version": STORE_VERSION,
+            "product_id": product_id,
+            "category": category,
+            "entries": {key: entry.model_dump() for key, entry in entries.items()},
+        }
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(file), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                f.write(json.dumps(document, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp, file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._files.pop(file, None)
+
+
+# Stores in use by path
+_stores: Dict[str, FAQStore] = {}
+
+
+def get_faq_store(path: str) -> Optional[FAQStore]:
+    """Shared store for a path, or None if no path is configured."""
+    if not path:
+        return None
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = FAQStore(path)
+    return store
@@ -0,0 +1,238 @@
+"""
+Offline FAQ answer precomputation.
+
+Usage:
+    python -m src.api_support_chatbot.faq_pipeline history.jsonl --store faq_store --concurrency 4
+
+Each input line is a historical request with ``product_id``, ``category`` and
+``request_text`` (or ``message``), and optionally an ``id``. The pipeline:
+
+1. clusters the requests per product and category by normalized text
+2. keeps clusters with at least ``--min-count`` requests, the ``--top``
+   largest per product
+3. answers each cluster's most frequent wording once with the real response
+   agent, with bounded concurrency
+4. stores answers found with at least ``--min-confidence`` in the FAQ store,
+   with the cluster size, sample request ids, deployment and time
+
+Refresh policy: answers younger than ``FAQ_REFRESH_AFTER`` are kept as they
+are (``--force`` recomputes them), and a failed or rejected recomputation
+keeps the previous answer. Answers older than ``FAQ_TTL`` are not served and
+are dropped when their product and category are next refreshed. Running the
+pipeline on a schedule shorter than the TTL keeps the store fresh; serving
+workers pick up rewritten files without a restart.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiofiles
+from dotenv import load_dotenv
+
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.faq import FAQEntry, FAQStore
+from src.api_support_chatbot.singleflight import request_fingerprint
+from src.api_support_chatbot.state import RequestItem, ResponseItem
+from src.api_support_chatbot.utils import create_error_message, log_agent_action
+
+# Request ids kept per cluster as source metadata
+MAX_SOURCE_IDS = 5
+
+AnswerFn = Callable[[RequestItem, Configuration], Awaitable[Tuple[ResponseItem, int]]]
+
+
+class Cluster:
+    """Historical requests of one product and category with the same normalized text."""
+
+    __slots__ = ("key", "product_id", "category", "wordings", "source_ids", "count")
+
+    def __init__(self, key: str, product_id: Optional[str], category: Optional[str]) -> None:
+        self.key = key
+        self.product_id = product_id
+        self.category = category
+        self.wordings: Counter = Counter()
+        self.source_ids: List[str] = []
+        self.count = 0
+
+    def add(self, text: str, record_id: str) -> None:
+        self.count += 1
+        self.wordings[text.strip()] += 1
+        if len(self.source_ids) < MAX_SOURCE_IDS:
+            self.source_ids.append(record_id)
+
+    @property
+    def representative(self) -> str:
+        return self.wordings.most_common(1)[0][0]
+
+
+async def cluster_requests(input_path: str) -> Dict[str, Cluster]:
+    """Stream a JSONL file of historical requests into clusters by fingerprint."""
+    clusters: Dict[str, Cluster] = {}
+    async with aiofiles.open(input_path, "r") as f:
+        line_number = 0
+        async for line in f:
+            line_number += 1
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get("request_text") or record.get("message")
+            if not text:
+                continue
+            product_id, category = record.get("product_id"), record.get("category")
+            key = request_fingerprint(product_id, category, text)
+            cluster = clusters.get(key)
+            if cluster is None:
+                cluster = clusters[key] = Cluster(key, product_id, category)
+            cluster.add(str(text), str(record.get("id", line_number)))
+    return clusters
+
+
+def select_clusters(clusters: Dict[str, Cluster], min_count: int, top: int) -> List[Cluster]:
+    """The ``top`` largest clusters per product with at least ``min_count`` requests."""
+    by_product: Dict[Optional[str], List[Cluster]] = {}
+    for cluster in clusters.values():
+        if cluster.count >= min_count:
+            by_product.setdefault(cluster.product_id, []).append(cluster)
+    selected = []
+    for product_clusters in by_product.values():
+        product_clusters.sort(key=lambda c: c.count, reverse=True)
+        selected.extend(product_clusters[:top])
+    return selected
+
+
+async def precompute(
+    input_path: str,
+    store_path: str,
+    concurrency: int = 4,
+    min_count: int = 3,
+    top: int = 300,
+    min_confidence: float = 0.7,
+    force: bool = False,
+    configuration: Optional[Configuration] = None,
+    answer: Optional[AnswerFn] = None,
+) -> Dict[str, Any]:
+    """
+    Build or refresh the FAQ store from historical requests.
+
+    Args:
+        input_path: JSONL file of historical requests
+        store_path: FAQ store directory
+        concurrency: Response agents running at the same time
+        min_count: Minimum requests in a cluster
+        top: Maximum clusters per product
+        min_confidence: Minimum confidence of a stored answer
+        force: Recompute answers younger than ``faq_refresh_after``
+        configuration: Configuration for the response agent (default: from environment)
+        answer: Response agent (default: ``run_response_agent``)
+
+    Returns:
+        Statistics of the run
+    """
+    if answer is None:
+        from src.api_support_chatbot.chatbot import run_response_agent
+        answer = run_response_agent
+    configuration = configuration or Configuration.from_runnable_config()
+    store = FAQStore(store_path, reload_interval=0)
+    started = time.perf_counter()
+    now = time.time()
+
+    clusters = select_clusters(await cluster_requests(input_path), min_count, top)
+    groups: Dict[Tuple[Optional[str], Optional[str]], List[Cluster]] = {}
+    for cluster in clusters:
+        groups.setdefault((cluster.product_id, cluster.category), []).append(cluster)
+
+    stats = {"clusters": len(clusters), "computed": 0, "fresh": 0, "stored": 0, "rejected": 0, "failed": 0, "expired": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def compute(cluster: Cluster) -> Optional[FAQEntry]:
+        request_item = RequestItem(
+            id=cluster.key[:8],
+            request_text=cluster.representative,
+            category=cluster.category or "",
+            product_id=cluster.product_id,
+        )
+        async with semaphore:
+            try:
+                response_item, _ = await answer(request_item, configuration)
+            except Exception as e:
+                stats["failed"] += 1
+                log_agent_action("FAQPipeline", "Response agent failed", {
+                    "request_text": cluster.representative, "error": create_error_message(e, "faq_pipeline"),
+                })
+                return None
+        stats["computed"] += 1
+        if response_item.error or not response_item.response_found or response_item.confidence < min_confidence:
+            stats["rejected"] += 1
+            return None
+        return FAQEntry(
+            request_text=cluster.representative,
+            response_text=response_item.response_text,
+            confidence=response_item.confidence,
+            cluster_size=cluster.count,
+            source_ids=cluster.source_ids,
+            deployment=configuration.azure_openai_deployment_name,
+            computed_at=time.time(),
+        )
+
+    async def refresh(product_id: Optional[str], category: Optional[str], group: List[Cluster]) -> None:
+        existing = store.load(product_id, category)
+        entries = {
+            key: entry for key, entry in existing.items() if now - entry.computed_at <= configuration.faq_ttl
+        }
+        stats["expired"] += len(existing) - len(entries)
+
+        stale = []
+        for cluster in group:
+            entry = entries.get(cluster.key)
+            if entry is not None and not force and now - entry.computed_at < configuration.faq_refresh_after:
+                stats["fresh"] += 1
+                entries[cluster.key] = entry.model_copy(update={"cluster_size": cluster.count})
+            else:
+                stale.append(cluster)
+
+        for cluster, entry in zip(stale, await asyncio.gather(*(compute(c) for c in stale))):
+            if entry is not None:
+                entries[cluster.key] = entry
+
+        stats["stored"] += len(entries)
+        store.write(product_id, category, entries)
+
+    await asyncio.gather(*(refresh(product_id, category, group) for (product_id, category), group in groups.items()))
+
+    stats["elapsed_s"] = round(time.perf_counter() - started, 1)
+    log_agent_action("FAQPipeline", "Finished", stats)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute FAQ answers from historical requests")
+    parser.add_argument("input", help="JSONL file of historical requests")
+    parser.add_argument("--store", default=None, help="FAQ store directory (default: FAQ_STORE_PATH or faq_store)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--min-count", type=int, default=3, help="Minimum requests per cluster")
+    parser.add_argument("--top", type=int, default=300, help="Maximum clusters per product")
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    parser.add_argument("--force", action="store_true", help="Recompute answers that are still fresh")
+    args = parser.parse_args()
+
+    load_dotenv()
+    configuration = Configuration.from_runnable_config()
+    stats = asyncio.run(precompute(
+        args.input,
+        args.store or configuration.faq_store_path or "faq_store",
+        concurrency=args.concurrency,
+        min_count=args.min_count,
+        top=args.top,
+        min_confidence=args.min_confidence,
+        force=args.force,
+        configuration=configuration,
+    ))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Fan-out stragglers: late response items delivered as follow-up messages."""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+
+from src.api_support_chatbot.prompts import FOLLOW_UP_MESSAGE_TEMPLATE
+from src.api_support_chatbot.state import ResponseItem
+from src.api_support_chatbot.telemetry import REGISTRY
+from src.api_support_chatbot.utils import create_error_message, log_agent_action
+
+if TYPE_CHECKING:
+    from src.api_support_chatbot.turns import TurnRegistry
+
+
+LATE_ITEMS = REGISTRY.counter(
+    "chatbot_fan_out_late_items_total",
+    "Response items that missed the fan-out deadline, by outcome",
+    ["outcome"],
+)
+
+
+class FollowUps:
+    """
+    Straggler response agents that keep running after the fan-out deadline.
+
+    Tasks are tracked per thread, with the id of the turn that adopted them,
+    until they finish or ``timeout`` expires; whoever owns the graph collects
+    finished items with ``drain`` and adds them to the thread (see
+    ``deliver_follow_ups``). A finished task is dropped right away and its
+    item kept for ``timeout`` seconds, so nothing accumulates when no one
+    drains (batch runs, LangGraph server).
+    """
+
+    def __init__(self) -> None:
+        # Running stragglers by thread, with the turn that adopted each
+        self._tasks: Dict[str, Dict[asyncio.Task, str]] = {}
+        # Finished items waiting for ``drain``, by thread: (expires at, [(turn id, item)])
+        self._ready: Dict[str, Tuple[float, List[Tuple[str, ResponseItem]]]] = {}
+
+    def adopt(self, thread_id: str, work: Awaitable[ResponseItem], timeout: float, turn_id: str = "") -> None:
+        """Keep a straggler of turn ``turn_id`` running in the background for at most ``timeout`` seconds."""
+        async def bounded() -> Optional[ResponseItem]:
+            try:
+                result = await asyncio.wait_for(work, timeout=timeout)
+            except asyncio.TimeoutError:
+                LATE_ITEMS.inc(outcome="follow_up_timeout")
+                return None
+            except Exception as e:
+                LATE_ITEMS.inc(outcome="follow_up_error")
+                log_agent_action("FollowUps", "Late response failed", {
+                    "thread_id": thread_id, "error": create_error_message(e, "follow_up"),
+                })
+                return None
+            return result
+
+        tracked = asyncio.ensure_future(bounded())
+        self._tasks.setdefault(thread_id, {})[tracked] = turn_id
+        tracked.add_done_callback(lambda task: self._finished(thread_id, task, timeout))
+
+    def _finished(self, thread_id: str, task: asyncio.Task, keep_for: float) -> None:
+        tasks = self._tasks.get(thread_id)
+        if tasks is None or task not in tasks:
+            # Claimed by drain or cancel, which take the result themselves
+            return
+        turn_id = tasks.pop(task)
+        if not tasks:
+            del self._tasks[thread_id]
+        now = time.monotonic()
+        for expired in [key for key, (expires_at, _) in self._ready.items() if expires_at <= now]:
+            del self._ready[expired]
+        item = None if task.cancelled() else task.result()
+        if isinstance(item, ResponseItem) and not item.error:
+            _, items = self._ready.pop(thread_id, (0.0, []))
+            self._ready[thread_id] = (now + keep_for, items + [(turn_id, item)])
+
+    def pending(self, thread_id: str) -> int:
+        """Number of stragglers still running or waiting to be drained for a thread."""
+        ready = self._ready.get(thread_id)
+        return len(self._tasks.get(thread_id, ())) + (len(ready[1]) if ready else 0)
+
+    async def drain(self, thread_id: str) -> List[ResponseItem]:
+        """Wait for the thread's stragglers and return the items that completed."""
+        _, ready = self._ready.pop(thread_id, (0.0, []))
+        items = [item for _, item in ready]
+        tasks = self._tasks.pop(thread_id, {})
+        if tasks:
+            items += await asyncio.gather(*tasks)
+        return [item for item in items if isinstance(item, ResponseItem) and not item.error]
+
+    async def cancel(self, thread_id: str, turn_id: str) -> None:
+        """Cancel the stragglers adopted by a turn (it was superseded), keeping those of earlier turns."""
+        expires_at, ready = self._ready.pop(thread_id, (0.0, []))
+        ready = [(turn, item) for turn, item in ready if turn != turn_id]
+        if ready:
+            self._ready[thread_id] = (expires_at, ready)
+        tasks = self._tasks.get(thread_id, {})
+        cancelled = [task for task, turn in tasks.items() if turn == turn_id]
+        for task in cancelled:
+            del tasks[task]
+            task.cancel()
+        if not tasks:
+            self._tasks.pop(thread_id, None)
+        await asyncio.gather(*cancelled, return_exceptions=True)
+
+    async def cancel_all(self) -> None:
+        """Cancel every tracked straggler (on shutdown)."""
+        tasks = [task for group in self._tasks.values() for task in group]
+        self._tasks.clear()
+        self._ready.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Process-wide straggler registry
+follow_ups = FollowUps()
+
+
+def format_follow_up(items: List[ResponseItem]) -> AIMessage:
+    """Build the follow-up message for late response items."""
+    content = "\n\n".join(
+        FOLLOW_UP_MESSAGE_TEMPLATE.format(request_text=item.request_text, response_text=item.response_text)
+        for item in items
+    )
+    message = AIMessage(content=content)
+    message.additional_kwargs = {"artifact": {"final_response": True, "follow_up": True}}
+    return message
+
+
+async def deliver_follow_ups(
+    graph: Any,
+    thread_id: str,
+    registry: Optional[FollowUps] = None,
+    turns: Optional["TurnRegistry"] = None,
+) -> int:
+    """
+    Wait for a thread's stragglers and append their answers to the thread.
+
+    The message is added to the checkpoint as if the assembler had written it,
+    so it shows up in the thread history without running another turn. It is
+    written between turns: a turn running on the thread is waited for, and a
+    new one waits until the message is in.
+
+    Returns:
+        Number of late items delivered
+    """
+    items = await (registry or follow_ups).drain(thread_id)
+    if not items:
+        return 0
+    if turns is None:
+        # Imported here: the turn registry uses this module
+        from src.api_support_chatbot.turns import turn_registry as turns
+    async with turns.exclusive(thread_id):
+        await graph.aupdate_state(
+            {"configurable": {"thread_id": thread_id}},
+            {"messages": [format_follow_up(items)]},
+            as_node="assemble_final_response",
+        )
+    LATE_ITEMS.inc(len(items), outcome="follow_up_delivered")
+    log_agent_action("FollowUps", "Delivered late responses", {"thread_id": thread_id, "count": len(items)})
+    return len(items)
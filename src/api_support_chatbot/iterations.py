@@ -0,0 +1,108 @@
+"""Iteration budget of the response agent tool loop, per request category."""
+
+import re
+import time
+from typing import Iterable, List, Optional
+
+from src.api_support_chatbot.configuration import Configuration, DegradationMode
+from src.api_support_chatbot.singleflight import normalize_text
+from src.api_support_chatbot.telemetry import REGISTRY
+
+# Category label of items whose category has no configured budget
+OTHER_CATEGORY = "other"
+# Share of the remaining deadline an extra tool round may use, the rest is left for the final answer
+EXTENSION_DEADLINE_SHARE = 0.5
+
+ITERATIONS = REGISTRY.histogram(
+    "chatbot_response_agent_iterations",
+    "Tool loop iterations of a response agent, by request category",
+    ["category"],
+    buckets=(1, 2, 3, 4, 5, 6, 8),
+)
+BUDGET_EVENTS = REGISTRY.counter(
+    "chatbot_response_agent_budget_events_total",
+    "Tool loops stopped early on sufficient context, extended, or cut off at their budget",
+    ["category", "event"],
+)
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9_\-.]+")
+_STOP_WORDS = frozenset(
+    "an as at be by do if in is it me my no of on or so to up we "
+    "the and for with how can does what when where which why this that from into your you are not "
+    "use using there have has was were will would should could about after before our any all get".split()
+)
+
+
+def terms(text: str) -> set:
+    """Significant words of a text, for context coverage."""
+    return {word for word in _WORD.findall(normalize_text(text)) if word not in _STOP_WORDS}
+
+
+def context_coverage(request_text: str, context: Iterable[str]) -> float:
+    """Share of the request's significant words found in the retrieved context (1.0 without any)."""
+    wanted = terms(request_text)
+    if not wanted:
+        return 1.0
+    found = set()
+    for text in context:
+        found |= wanted & terms(text)
+    return len(found) / len(wanted)
+
+
+class IterationBudget:
+    """
+    Tool rounds allowed to one response agent.
+
+    The budget is ``iteration_budgets[category]`` (matched case-insensitively)
+    or ``response_agent_max_iterations``, and one round in the
+    ``reduced_iterations`` degradation mode. At run time the loop stops
+    early once the retrieved context covers at least
+    ``context_sufficiency_threshold`` of the request's significant words,
+    and goes past the budget by up to ``iteration_extensions`` rounds only
+    when the fan-out deadline leaves room for another round and the final
+    answer (judged from the rounds so far).
+    """
+
+    def __init__(self, configuration: Configuration, category: Optional[str], deadline: Optional[float] = None) -> None:
+        budgets = {normalize_text(name): (name, limit) for name, limit in configuration.iteration_budgets.items()}
+        name, limit = budgets.get(normalize_text(category), (OTHER_CATEGORY, configuration.response_agent_max_iterations))
+        self.category = name
+        self.threshold = configuration.context_sufficiency_threshold
+        self.deadline = deadline
+        if configuration.degraded(DegradationMode.REDUCED_ITERATIONS):
+            self.limit, self.extensions = 1, 0
+        else:
+            self.limit, self.extensions = max(1, limit), configuration.iteration_extensions
+        self._round_times: List[float] = []
+
+    def record_round(self, duration: float) -> None:
+        self._round_times.append(duration)
+
+    def sufficient(self, request_text: str, context: List[str]) -> bool:
+        """Whether the retrieved context already answers the request."""
+        if self.threshold <= 0 or not context:
+            return False
+        if context_coverage(request_text, context) >= self.threshold:
+            BUDGET_EVENTS.inc(category=self.category, event="early_stop")
+            return True
+        return False
+
+    def next_round(self, iteration: int) -> bool:
+        """Whether another tool round may follow round ``iteration``."""
+        if iteration < self.limit:
+            return True
+        if iteration < self.limit + self.extensions and self._deadline_allows():
+            BUDGET_EVENTS.inc(category=self.category, event="extended")
+            return True
+        BUDGET_EVENTS.inc(category=self.category, event="exhausted")
+        return False
+
+    def _deadline_allows(self) -> bool:
+        if self.deadline is None or not self._round_times:
+            return False
+        round_time = sum(self._round_times) / len(self._round_times)
+        return round_time <= (self.deadline - time.time()) * EXTENSION_DEADLINE_SHARE
+
+    def finish(self, iterations: int) -> None:
+        ITERATIONS.observe(iterations, category=self.category)
+
@@ -0,0 +1,159 @@
+"""Non-blocking structured logging for the API Support Chatbot."""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TextIO
+
+LOGGER_NAME = "api_support_chatbot"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def truncate_value(value: Any, max_length: int) -> Any:
+    """Truncate long strings (and the string form of other objects) in log payloads."""
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {k: truncate_value(v, max_length) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate_value(v, max_length) for v in value]
+    text = value if isinstance(value, str) else str(value)
+    if max_length > 0 and len(text) > max_length:
+        return text[:max_length - 3] + "..."
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human readable format matching the original console output."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.fromtimestamp(record.created).isoformat()
+        lines = [f"[{timestamp}] {record.getMessage()}"]
+        for key, value in (getattr(record, "details", None) or {}).items():
+            lines.append(f"  {key}: {value}")
+        if record.exc_info:
+            lines.append(self.formatException(record.exc_info))
+        return "\n".join(lines)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Records are formatted by the listener thread, off the event loop
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogSettings:
+    """Logging settings resolved from the environment."""
+
+    def __init__(self) -> None:
+        self.level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+        if not isinstance(self.level, int):
+            self.level = logging.INFO
+        self.format = os.getenv("LOG_FORMAT", "text").lower()
+        self.max_field_length = int(os.getenv("LOG_MAX_FIELD_LENGTH", "500"))
+        self.sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+        self.queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+
+_settings: Optional[LogSettings] = None
+_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(stream: Optional[TextIO] = None, settings: Optional[LogSettings] = None) -> logging.Logger:
+    """
+    Configure the package logger with a queue and a background writer thread.
+
+    Log calls only enqueue the record; formatting and writing to ``stream``
+    (stdout by default) happen on the listener thread, so slow output never
+    stalls the event loop. Calling this again replaces the previous setup.
+    """
+    global _settings, _handler, _listener
+    shutdown_logging()
+
+    _settings = settings or LogSettings()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if _settings.format == "json" else TextFormatter())
+
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=_settings.queue_size))
+    _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=False)
+    _listener.start()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = [_handler]
+    logger.setLevel(_settings.level)
+    logger.propagate = False
+    return logger
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger() -> logging.Logger:
+    """Get the package logger, configuring it on first use."""
+    if _listener is None:
+        configure_logging()
+    return logging.getLogger(LOGGER_NAME)
+
+
+def get_log_settings() -> LogSettings:
+    """Get the active logging settings."""
+    get_logger()
+    return _settings
+
+
+def dropped_records() -> int:
+    """Number of records dropped because the log queue was full."""
+    return _handler.dropped if _handler else 0
+
+
+def should_sample(sample_rate: Optional[float] = None) -> bool:
+    """Decide whether a sampled event is emitted."""
+    rate = get_log_settings().sample_rate if sample_rate is None else sample_rate
+    return rate >= 1.0 or random.random() < rate
+
+
+atexit.register(shutdown_logging)
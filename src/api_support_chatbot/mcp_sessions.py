@@ -0,0 +1,197 @@
+"""
+Persistent MCP sessions for the WebSocket and SSE transports.
+
+``langchain_mcp_adapters`` opens a new session (connection and MCP
+handshake) for every tool call made without one. Over WebSocket and SSE a
+session is a long-lived connection that carries any number of concurrent
+requests, so each replica gets one session that is opened on first use,
+kept alive with MCP pings and reopened after it drops.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.api_support_chatbot.telemetry import REGISTRY
+from src.api_support_chatbot.utils import create_error_message, log_agent_action
+
+SESSION_EVENTS = REGISTRY.counter(
+    "chatbot_mcp_session_events_total",
+    "Persistent MCP session connects, failed connects, keep-alive failures and closes, by transport",
+    ["transport", "event"],
+)
+KEEPALIVE_LATENCY = REGISTRY.histogram(
+    "chatbot_mcp_keepalive_seconds",
+    "Round trip of the keep-alive ping of persistent MCP sessions",
+    ["transport"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+class SessionUnavailable(ConnectionError):
+    """The session is disconnected and waits for its reconnect backoff."""
+
+
+class PersistentSession:
+    """
+    One long-lived MCP session to a server endpoint, shared by all tool calls.
+
+    The connection is owned by a background task (the MCP client context
+    managers must be entered and exited by the same task), which opens it,
+    lists the tools and then pings the server every ``keepalive_interval``
+    seconds. A failed ping, a dropped connection or ``verify`` failing after
+    a call error closes the session; the next call reconnects. After a
+    failed connect, calls fail fast with ``SessionUnavailable`` until the
+    backoff expires, so the balancer fails over to another replica; the
+    backoff doubles with every failure, up to ``max_backoff``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connection: Dict[str, Any],
+        keepalive_interval: float = 15.0,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.connection = connection
+        self.transport = connection["transport"]
+        self.keepalive_interval = keepalive_interval
+        self.initial_backoff = backoff
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session: Optional[Any] = None
+        self._tools: Optional[Dict[str, Any]] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._lock = asyncio.Lock()
+        self._retry_at = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._tools is not None and self._runner is not None and not self._runner.done()
+
+    async def tools(self) -> Dict[str, Any]:
+        """Tools bound to the open session, connecting first if needed."""
+        if self._runner is not None and self._runner.get_loop() is not asyncio.get_running_loop():
+            # The session belongs to a loop that is gone (e.g. a previous asyncio.run)
+            self._runner, self._tools, self._lock = None, None, asyncio.Lock()
+        if not self.connected:
+            async with self._lock:
+                if not self.connected:
+                    await self._connect()
+        return self._tools
+
+    async def _connect(self) -> None:
+        if time.monotonic() < self._retry_at:
+            raise SessionUnavailable(f"MCP session {self.name} ({self.transport}) is reconnecting")
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._runner = asyncio.create_task(self._run(ready, self._closing), name=f"mcp-session-{self.name}")
+        try:
+            await ready
+        except Exception:
+            SESSION_EVENTS.inc(transport=self.transport, event="connect_failed")
+            self._retry_at = time.monotonic() + self.backoff
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            raise
+        SESSION_EVENTS.inc(transport=self.transport, event="connected")
+        self.backoff = self.initial_backoff
+
+    async def _run(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        from langchain_mcp_adapters.sessions import create_session
+        from langchain_mcp_adapters.tools import load_mcp_tools
+
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                tools = await load_mcp_tools(session, server_name=self.name)
+                self.session = session
+                self._tools = {tool.name: tool for tool in tools}
+                ready.set_result(None)
+                await self._keepalive(session, closing)
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                log_agent_action("MCPSession", "Session dropped", {
+                    "server": self.name, "transport": self.transport, "error": create_error_message(e, "mcp_session"),
+                })
+        finally:
+            self.session = None
+            self._tools = None
+
+    async def _keepalive(self, session: Any, closing: asyncio.Event) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(closing.wait(), timeout=self.keepalive_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            if not await self._ping(session):
+                SESSION_EVENTS.inc(transport=self.transport, event="keepalive_failed")
+                return
+
+    async def _ping(self, session: Any) -> bool:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=max(1.0, self.keepalive_interval))
+        except Exception:
+            return False
+        KEEPALIVE_LATENCY.observe(time.perf_counter() - started, transport=self.transport)
+        return True
+
+    async def verify(self) -> None:
+        """Ping the session after a failed call and close it if the server does not answer."""
+        session = self.session
+        if session is not None and not await self._ping(session):
+            SESSION_EVENTS.inc(transport=self.transport, event="keepalive_failed")
+            await self.close()
+
+    async def close(self) -> None:
+        runner, self._runner = self._runner, None
+        if runner is None:
+            return
+        self._closing.set()
+        try:
+            await asyncio.wait_for(runner, timeout=5.0)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            runner.cancel()
+        except Exception:
+            pass
+        self._tools = None
+        SESSION_EVENTS.inc(transport=self.transport, event="closed")
+
+
+# Open sessions keyed by server name and connection
+_sessions: Dict[Tuple[str, str], PersistentSession] = {}
+
+
+def get_session(name: str, connection: Dict[str, Any], **settings: Any) -> PersistentSession:
+    """Get the persistent session of a server endpoint, created on first use."""
+    key = (name, repr(sorted(connection.items())))
+    session = _sessions.get(key)
+    if session is None:
+        session = PersistentSession(name, connection, **settings)
+        _sessions[key] = session
+    return session
+
+
+async def close_sessions() -> None:
+    """Close all persistent sessions."""
+    sessions = list(_sessions.values())
+    _sessions.clear()
+    for session in sessions:
+        await session.close()
+
+
+REGISTRY.gauge(
+    "chatbot_mcp_sessions_open",
+    "Persistent MCP sessions currently connected, by transport",
+    ["transport"],
+    callback=lambda: {
+        (transport,): sum(1 for s in _sessions.values() if s.transport == transport and s.connected)
+        for transport in {s.transport for s in _sessions.values()}
+    },
+)
@@ -0,0 +1,256 @@
+"""Event loop lag monitoring and a sampling profiler of graph nodes."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.api_support_chatbot.telemetry import NODE_CODES, REGISTRY, current_node
+from src.api_support_chatbot.utils import log_agent_action
+
+# Loop callbacks blocked for this long or more are usually CPU work on the loop
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Frames of a blocked stack included in the log record
+BLOCKED_STACK_DEPTH = 8
+# Attribution of loop time not spent in a graph node
+NO_NODE = "none"
+
+LOOP_LAG = REGISTRY.histogram(
+    "chatbot_event_loop_lag_seconds", "Delay of a callback scheduled on the event loop", buckets=LOOP_LAG_BUCKETS
+)
+LOOP_BLOCKS = REGISTRY.counter(
+    "chatbot_event_loop_blocks_total", "Event loop stalls over the lag threshold, by running node", ["node"]
+)
+LOOP_BLOCKED_SECONDS = REGISTRY.counter(
+    "chatbot_event_loop_blocked_seconds_total", "Time the event loop was stalled, by running node", ["node"]
+)
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})"
+
+
+# Tasks created inside a graph node -> node name
+_task_nodes: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+def track_task_nodes(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Record the graph node each new task of ``loop`` is created in.
+
+    Work a node hands to another task (the fan-out deadline of
+    ``generate_response``, a coalescing leader) runs without the node's
+    frames on its stack; the ``current_node`` captured when the task is
+    created attributes it to the node instead. Wraps the loop's task
+    factory once.
+    """
+    previous = loop.get_task_factory()
+    if getattr(previous, "tracks_nodes", False):
+        return
+
+    def factory(loop: asyncio.AbstractEventLoop, coro: Any, **kwargs: Any) -> asyncio.Future:
+        if previous is not None:
+            task = previous(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        node = context.run(current_node) if context is not None else current_node()
+        if node is not None:
+            _task_nodes[task] = node
+        return task
+
+    factory.tracks_nodes = True
+    loop.set_task_factory(factory)
+
+
+def task_node(loop: Optional[asyncio.AbstractEventLoop]) -> str:
+    """Node the task running on ``loop`` was created in (``NO_NODE`` if none)."""
+    task = asyncio.current_task(loop) if loop is not None else None
+    return _task_nodes.get(task, NO_NODE) if task is not None else NO_NODE
+
+
+def node_stack(frame: Optional[FrameType], fallback: str = NO_NODE) -> Tuple[str, List[FrameType]]:
+    """
+    Find the graph node a thread's stack is running.
+
+    Args:
+        frame: Innermost frame of the thread
+        fallback: Node of the running task (see ``task_node``), used when no
+            node function is on the stack
+
+    Returns:
+        Tuple of (node, frames) with the frames from the node function to the
+        innermost one, or (``fallback``, all frames) outside of a node
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        node = NODE_CODES.get(frame.f_code)
+        if node is not None:
+            return node, frames[::-1]
+        frame = frame.f_back
+    return fallback, frames[::-1]
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop runs callbacks and attributes stalls.
+
+    A watchdog thread schedules a callback on the loop every ``interval``
+    seconds and measures how late it runs. While the callback is late by
+    more than ``threshold`` the thread samples the loop thread's stack, so a
+    stall is attributed to the graph node (``traced_node``) whose
+    synchronous code was running, or whose task created the running task,
+    and logged with the innermost frames.
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.last_lag = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start monitoring the running event loop (call from the loop)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        track_task_nodes(self._loop)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.interval * 2))
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stopped.is_set():
+            answered = threading.Event()
+            sent = time.monotonic()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                # The loop was closed
+                return
+            samples: Counter = Counter()
+            first_stack: List[FrameType] = []
+            while not answered.wait(self.threshold):
+                if self._stopped.is_set():
+                    return
+                node, frames = node_stack(sys._current_frames().get(self._loop_thread), task_node(self._loop))
+                samples[node] += 1
+                first_stack = first_stack or frames
+            lag = time.monotonic() - sent
+            self.last_lag = lag
+            LOOP_LAG.observe(lag)
+            if samples:
+                self._report(lag, samples, first_stack)
+            self._stopped.wait(self.interval)
+
+    def _report(self, lag: float, samples: Counter, stack: List[FrameType]) -> None:
+        node = samples.most_common(1)[0][0]
+        LOOP_BLOCKS.inc(node=node)
+        LOOP_BLOCKED_SECONDS.inc(lag, node=node)
+        log_agent_action("LoopMonitor", "Event loop blocked", {
+            "lag_ms": round(lag * 1000, 1),
+            "node": node,
+            "samples": dict(samples),
+            "stack": [f"{_frame_label(f)}:{f.f_lineno}" for f in stack[-BLOCKED_STACK_DEPTH:]],
+        })
+
+
+class NodeProfiler:
+    """
+    Sampling profiler of the synchronous work of graph nodes.
+
+    While enabled, a thread samples the event loop thread's stack every
+    ``interval`` seconds. Samples taken inside a node are aggregated as
+    collapsed stacks (``node:<name>;outer (file);...;inner (file) count``),
+    the input format of ``flamegraph.pl`` and speedscope. Time the loop
+    spends waiting for I/O is not sampled. It can be enabled and disabled at
+    run time; disabling keeps the samples until the next ``start``.
+    """
+
+    def __init__(self) -> None:
+        self.interval = 0.005
+        self.stacks: Counter = Counter()
+        self.node_samples: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.005) -> None:
+        """Clear the samples and start sampling the running loop (call from the loop)."""
+        self.stop()
+        self.interval = interval
+        self.stacks = Counter()
+        self.node_samples = Counter()
+        self.started_at = time.time()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        track_task_nodes(self._loop)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample, name="node-profiler", daemon=True)
+        self._thread.start()
+        log_agent_action("NodeProfiler", "Started", {"interval_s": interval})
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        log_agent_action("NodeProfiler", "Stopped", {"samples": sum(self.node_samples.values())})
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            node, frames = node_stack(sys._current_frames().get(self._loop_thread), task_node(self._loop))
+            if node == NO_NODE:
+                continue
+            self.node_samples[node] += 1
+            self.stacks[";".join([f"node:{node}"] + [_frame_label(f) for f in frames])] += 1
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed stack format, one stack per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "interval_s": self.interval,
+            "started_at": self.started_at,
+            "samples": dict(self.node_samples),
+        }
+
+
+# Monitor and profiler of this worker's event loop
+loop_monitor = LoopLagMonitor()
+node_profiler = NodeProfiler()
+
+REGISTRY.gauge(
+    "chatbot_event_loop_last_lag_seconds",
+    "Most recent event loop lag measured by the monitor",
+    callback=lambda: {(): loop_monitor.last_lag},
+)
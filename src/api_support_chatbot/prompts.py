@@ -1,9 +1,22 @@
 """Prompts and prompt templates for the API Support Chatbot."""
 
+from functools import lru_cache
 from typing import Dict, Any
 
 GREETING_MESSAGE = """Hello! I'm an AI assistant here to help you with any Lightspeed API questions or issues. How can I assist you today?"""
 GENERIC_ERROR_MSG = "Apologies, I couldn't process your request."
+PENDING_RESPONSE_MSG = "PENDING: The answer to this request is taking longer than expected."
+PENDING_FOLLOW_UP_MSG = "PENDING: The answer to this request is taking longer than expected and will be sent as a follow-up message in this conversation."
+FAILED_ITEM_MSG = "ERROR: We could not look into this request because of a technical problem. Please ask about it again."
+DEGRADED_RESPONSE_MSG = "PENDING: We are experiencing high demand and could not look into this request right now. Please ask again in a few minutes."
+RECALLED_CONTEXT_TEMPLATE = """Context retrieved with the support tools earlier in this conversation:
+
+{context}
+
+Answer the request from this context."""
+FOLLOW_UP_MESSAGE_TEMPLATE = """Here is the answer to your earlier question "{request_text}":
+
+{response_text}"""
 
 API_SCOPE_CATEGORIES = """
 
@@ -291,6 +304,12 @@ Next-Step Suggestions
     “Would you like me to share best practices for handling webhooks with this API?”
     “I can also provide examples of request payloads if that would be useful.”
 
+Pending Requests
+
+  A generated response starting with "PENDING:" means the answer to that request is not ready yet.
+  Do not answer that request yourself. Tell the customer it is still being looked into, and
+  mention that the answer will follow in this conversation only if the generated response says so.
+
 Compliance
 
   Do not invent product or API features or policies if missing.
@@ -301,6 +320,7 @@ Compliance
 
 
 # Prompt formatting functions
+@lru_cache(maxsize=None)
 def format_request_details_prompt() -> str:
     """Format the request details system prompt"""
     return REQUEST_DETAILS_SYSTEM_PROMPT.format(
@@ -309,6 +329,7 @@ def format_request_details_prompt() -> str:
         )
 
 
+@lru_cache(maxsize=None)
 def format_coordinator_prompt() -> str:
     """Format the response coordinator system prompt"""
     return RESPONSE_COORDINATOR_SYSTEM_PROMPT.format(
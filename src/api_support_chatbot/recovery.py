@@ -0,0 +1,66 @@
+"""Recovery of turns whose response agents partly failed."""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.api_support_chatbot.state import RequestItem, ResponseItem
+from src.api_support_chatbot.telemetry import REGISTRY
+
+ITEM_RETRIES = REGISTRY.counter(
+    "chatbot_response_item_retries_total",
+    "Failed response items re-run on their own, recovered by a re-run, or given up after the last one",
+    ["outcome"],
+)
+KEPT_ITEMS = REGISTRY.counter(
+    "chatbot_response_items_kept_total",
+    "Answered response items kept, instead of redone, while failed items of their turn were re-run",
+)
+PARTIAL_TURNS = REGISTRY.counter(
+    "chatbot_partial_failure_turns_total",
+    "Turns with failed response items, by outcome (recovered, partial, failed)",
+    ["outcome"],
+)
+
+
+def plan_recovery(
+    response_items: Dict[str, ResponseItem],
+    request_items: Dict[str, RequestItem],
+    max_retries: int,
+    deadline: Optional[float] = None,
+) -> Tuple[List[RequestItem], List[ResponseItem]]:
+    """
+    Split the failed response items of a turn.
+
+    Returns:
+        Tuple of (request items to re-run, failed items given up), the
+        latter once an item failed ``max_retries`` re-runs, its request
+        item is gone or the turn's fan-out ``deadline`` (wall clock) passed
+    """
+    expired = deadline is not None and time.time() >= deadline
+    retry, given_up = [], []
+    for item in response_items.values():
+        if not item.error:
+            continue
+        request_item = request_items.get(item.request_id)
+        if request_item is not None and item.attempts <= max_retries and not expired:
+            retry.append(request_item)
+        else:
+            given_up.append(item)
+    return retry, given_up
+
+
+def record_recovery(response_items: Dict[str, ResponseItem], retried: int, given_up: int) -> None:
+    """Count the outcome of a turn assembled after failures or re-runs."""
+    recovered = sum(1 for item in response_items.values() if item.attempts > 1 and not item.error)
+    if retried:
+        ITEM_RETRIES.inc(retried, outcome="retried")
+        KEPT_ITEMS.inc(sum(1 for item in response_items.values() if not item.error))
+        return
+    if recovered:
+        ITEM_RETRIES.inc(recovered, outcome="recovered")
+    if given_up:
+        ITEM_RETRIES.inc(given_up, outcome="exhausted")
+        answered = len(response_items) - given_up
+        PARTIAL_TURNS.inc(outcome="partial" if answered else "failed")
+    elif recovered:
+        PARTIAL_TURNS.inc(outcome="recovered")
@@ -0,0 +1,282 @@
+"""Per-thread memory of retrieved passages, reused by the response agent on follow-up turns."""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from langgraph.channels.base import BaseChannel
+from pydantic import BaseModel, Field
+
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.iterations import terms
+from src.api_support_chatbot.telemetry import REGISTRY
+
+RECALLS = REGISTRY.counter(
+    "chatbot_retrieval_memory_recalls_total",
+    "Response agents that answered from the thread's retrieval memory or had to retrieve",
+    ["outcome"],
+)
+TOOL_RESULTS = REGISTRY.counter(
+    "chatbot_retrieval_memory_tool_results_total",
+    "Tool calls answered from the thread's retrieval memory or sent to the MCP server",
+    ["outcome"],
+)
+EVICTIONS = REGISTRY.counter(
+    "chatbot_retrieval_memory_evictions_total",
+    "Retrieved passages dropped from a thread's retrieval memory, by limit or expiry",
+    ["reason"],
+)
+
+
+class RetrievedContext(BaseModel):
+    """A tool result kept in a thread's retrieval memory."""
+
+    key: str = Field(description="Key of the tool call, see memory_key")
+    tool: str = Field(description="Name of the tool that returned the content")
+    args: Dict[str, Any] = Field(default_factory=dict, description="Arguments of the tool call")
+    product_id: Optional[str] = Field(default=None, description="Product of the request item the content was retrieved for")
+    content: str = Field(description="Text returned by the tool")
+    stored_at: float = Field(default=0.0, description="Wall clock time the content was retrieved")
+    last_used_at: float = Field(default=0.0, description="Wall clock time the content was last retrieved or reused")
+    uses: int = Field(default=0, description="Times the content was reused instead of calling the tool")
+
+
+class RetrievalMemoryUpdate(BaseModel):
+    """Write to the retrieval memory channel: new or reused entries and the limits to apply."""
+
+    entries: List[RetrievedContext]
+    max_entries: int
+    max_chars: int
+    ttl: float = 0.0
+
+
+def memory_key(tool: str, args: Dict[str, Any]) -> str:
+    """Key of a tool call: the tool name and its arguments."""
+    payload = json.dumps([tool, args], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def fresh(entries: Dict[str, RetrievedContext], ttl: float) -> Dict[str, RetrievedContext]:
+    """Entries retrieved less than ``ttl`` seconds ago (all of them for a ``ttl`` of 0)."""
+    if ttl <= 0:
+        return entries
+    oldest = time.time() - ttl
+    if all(entry.stored_at >= oldest for entry in entries.values()):
+        return entries
+    return {key: entry for key, entry in entries.items() if entry.stored_at >= oldest}
+
+
+def evict(
+    entries: Dict[str, RetrievedContext], max_entries: int, max_chars: int, ttl: float = 0.0
+) -> Dict[str, RetrievedContext]:
+    """Drop the expired entries, then the least recently used until the memory is within its limits."""
+    kept = fresh(entries, ttl)
+    if len(kept) < len(entries):
+        EVICTIONS.inc(len(entries) - len(kept), reason="expired")
+        entries = kept
+    size = sum(len(entry.content) for entry in entries.values())
+    if len(entries) <= max_entries and size <= max_chars:
+        return entries
+    kept = dict(entries)
+    for entry in sorted(entries.values(), key=lambda entry: entry.last_used_at):
+        if len(kept) <= max_entries and size <= max_chars:
+            break
+        EVICTIONS.inc(reason="entries" if len(kept) > max_entries else "size")
+        del kept[entry.key]
+        size -= len(entry.content)
+    return kept
+
+
+class RetrievalMemoryChannel(BaseChannel):
+    """
+    Channel holding a thread's retrieval memory, keyed by tool call.
+
+    Unlike the per-turn item channels it is kept when the turn commits.
+    Writes are ``RetrievalMemoryUpdate``: the entries of all writes of a
+    super-step are merged (an entry replaces the one with the same key),
+    entries older than the TTL of the last write are dropped and the least
+    recently used entries are evicted until the memory is within its limits. Writing an empty dict clears the
+    channel.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, typ: Any = dict, key: str = "") -> None:
+        super().__init__(typ, key)
+        self.value: Dict[str, RetrievedContext] = {}
+
+    @property
+    def ValueType(self) -> Any:
+        return dict
+
+    @property
+    def UpdateType(self) -> Any:
+        return Any
+
+    def copy(self) -> "RetrievalMemoryChannel":
+        # The mapping is never mutated in place, so sharing it is safe
+        empty = self.__class__(self.typ, self.key)
+        empty.value = self.value
+        return empty
+
+    def from_checkpoint(self, checkpoint: Any) -> "RetrievalMemoryChannel":
+        empty = self.__class__(self.typ, self.key)
+        if isinstance(checkpoint, dict):
+            empty.value = checkpoint
+        return empty
+
+    def update(self, values: Sequence[Any]) -> bool:
+        if not values:
+            return False
+        merged = dict(self.value)
+        limits = None
+        for value in values:
+            if isinstance(value, dict) and not value:
+                merged = {}
+                continue
+            if isinstance(value, RetrievalMemoryUpdate):
+                limits = (value.max_entries, value.max_chars, value.ttl)
+                entries = value.entries
+            else:
+                entries = value.values() if isinstance(value, dict) else value
+            for entry in entries:
+                merged[entry.key] = entry
+        if limits is not None:
+            merged = evict(merged, *limits)
+        self.value = merged
+        return True
+
+    def get(self) -> Dict[str, RetrievedContext]:
+        return self.value
+
+    def checkpoint(self) -> Dict[str, RetrievedContext]:
+        return self.value
+
+
+def for_product(memory: Dict[str, RetrievedContext], product_id: Optional[str]) -> Dict[str, RetrievedContext]:
+    """Entries retrieved for a product (and those without one), all of them without a product."""
+    if not product_id:
+        return memory
+    return {key: entry for key, entry in memory.items() if entry.product_id in (None, product_id)}
+
+
+# Retrieval memory of threads fanning out in this process, by thread id
+_MAX_SHARED_THREADS = 1024
+_shared: "OrderedDict[str, Dict[str, RetrievedContext]]" = OrderedDict()
+
+
+def share(thread_id: str, memory: Dict[str, RetrievedContext]) -> None:
+    """
+    Make a thread's retrieval memory readable by the response agents it fans out to.
+
+    ``Send`` payloads are checkpointed with every branch, so they carry only
+    the keys of the relevant entries and the agents look them up here. The
+    state's own mapping is kept (it is never mutated in place), not a copy.
+    """
+    _shared[thread_id] = memory
+    _shared.move_to_end(thread_id)
+    while len(_shared) > _MAX_SHARED_THREADS:
+        _shared.popitem(last=False)
+
+
+def forget(thread_id: str) -> None:
+    """Drop a thread's shared retrieval memory once its response agents are done."""
+    _shared.pop(thread_id, None)
+
+
+def shared(thread_id: str, keys: Sequence[str]) -> Dict[str, RetrievedContext]:
+    """
+    Entries of a thread's shared retrieval memory by key.
+
+    Empty when the fan-out ran in another process (e.g. a run resumed from
+    its checkpoint elsewhere): the agent then retrieves as without a memory.
+    """
+    memory = _shared.get(thread_id) or {}
+    return {key: memory[key] for key in keys if key in memory}
+
+
+class RetrievalMemory:
+    """
+    A response agent's view of its thread's retrieval memory.
+
+    ``recall`` returns the remembered passages that together cover at least
+    ``retrieval_memory_min_coverage`` of the request's significant words, in
+    which case the agent answers from them without calling tools.
+    ``tool_result`` answers a tool call already made on the thread. Entries
+    retrieved more than ``retrieval_memory_ttl`` seconds ago are not reused.
+    Retrieved and reused entries are collected, with their recency
+    refreshed, and written back to the state with ``update``.
+    """
+
+    def __init__(self, entries: Dict[str, RetrievedContext], configuration: Configuration) -> None:
+        self.ttl = configuration.retrieval_memory_ttl
+        self.entries = fresh(entries, self.ttl)
+        self.min_coverage = configuration.retrieval_memory_min_coverage
+        self.max_entries = configuration.retrieval_memory_max_entries
+        self.max_chars = configuration.retrieval_memory_max_chars
+        self.collected: Dict[str, RetrievedContext] = {}
+
+    def recall(self, request_text: str, product_id: Optional[str]) -> List[RetrievedContext]:
+        if not self.entries or self.min_coverage <= 0:
+            return []
+        wanted = terms(request_text)
+        relevant, found = [], set()
+        for entry in for_product(self.entries, product_id).values():
+            matched = wanted & terms(entry.content)
+            if matched:
+                relevant.append(entry)
+                found |= matched
+        if not wanted or len(found) / len(wanted) < self.min_coverage:
+            RECALLS.inc(outcome="retrieved")
+            return []
+        RECALLS.inc(outcome="answered")
+        for entry in relevant:
+            self._touch(entry)
+        return relevant
+
+    def tool_result(self, tool: str, args: Dict[str, Any]) -> Optional[str]:
+        entry = self.entries.get(memory_key(tool, args))
+        if entry is None:
+            TOOL_RESULTS.inc(outcome="called")
+            return None
+        TOOL_RESULTS.inc(outcome="reused")
+        self._touch(entry)
+        return entry.content
+
+    def store(self, tool: str, args: Dict[str, Any], product_id: Optional[str], content: str) -> None:
+        if len(content) > self.max_chars:
+            EVICTIONS.inc(reason="size")
+            return
+        now = time.time()
+        entry = RetrievedContext(
+            key=memory_key(tool, args), tool=tool, args=args, product_id=product_id,
+            content=content, stored_at=now, last_used_at=now,
+        )
+        self.collected[entry.key] = entry
+
+    def _touch(self, entry: RetrievedContext) -> None:
+        self.collected[entry.key] = entry.model_copy(update={"last_used_at": time.time(), "uses": entry.uses + 1})
+
+    def update(self) -> Optional[RetrievalMemoryUpdate]:
+        """State write of the collected entries, or None when there are none."""
+        if not self.collected:
+            return None
+        return RetrievalMemoryUpdate(
+            entries=list(self.collected.values()), max_entries=self.max_entries, max_chars=self.max_chars,
+            ttl=self.ttl,
+        )
+
+
+def _reuse_ratio() -> Dict[tuple, float]:
+    answered = RECALLS.value(outcome="answered")
+    total = answered + RECALLS.value(outcome="retrieved")
+    return {(): answered / total if total else 0.0}
+
+
+REGISTRY.gauge(
+    "chatbot_retrieval_memory_reuse_ratio",
+    "Share of response agents with a retrieval memory that answered from it without retrieving",
+    callback=_reuse_ratio,
+)
@@ -0,0 +1,218 @@
+"""Compact checkpoint serializer for the chatbot state."""
+
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import ormsgpack
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    ChatMessage,
+    ChatMessageChunk,
+    FunctionMessage,
+    FunctionMessageChunk,
+    HumanMessage,
+    HumanMessageChunk,
+    RemoveMessage,
+    SystemMessage,
+    SystemMessageChunk,
+    ToolMessage,
+    ToolMessageChunk,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.api_support_chatbot.configuration import CheckpointCompression
+from src.api_support_chatbot.state import (
+    AssembledResponse,
+    RequestDetails,
+    RequestItem,
+    ResponseItem,
+    RetrievedContext,
+)
+
+SCHEMA_VERSION = 1
+TYPE_TAG = "chatbot"
+
+# The position of a class in these tuples, and of a field in a model, is part of the format: only append
+MESSAGE_TYPES = (
+    HumanMessage, AIMessage, SystemMessage, ToolMessage, ChatMessage, FunctionMessage, RemoveMessage,
+    HumanMessageChunk, AIMessageChunk, SystemMessageChunk, ToolMessageChunk, ChatMessageChunk, FunctionMessageChunk,
+)
+MODEL_TYPES = (RequestDetails, RequestItem, ResponseItem, AssembledResponse, RetrievedContext)
+
+# Tags of encoded values
+_MESSAGE, _MODEL, _LIST, _DICT = range(4)
+# msgpack extension codes of compressed text
+_ZLIB_EXT, _ZSTD_EXT = 1, 2
+
+_MESSAGE_INDEX = {cls: i for i, cls in enumerate(MESSAGE_TYPES)}
+_MODEL_INDEX = {cls: i for i, cls in enumerate(MODEL_TYPES)}
+_MODEL_FIELDS = [tuple(cls.model_fields) for cls in MODEL_TYPES]
+
+
+def _field_defaults(cls: Any) -> Dict[str, Any]:
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in cls.model_fields.items()
+        if not field.is_required()
+    }
+
+
+# Field defaults of message classes, left out of the encoding
+_MESSAGE_DEFAULTS = [_field_defaults(cls) for cls in MESSAGE_TYPES]
+# Field defaults of models, for fields appended after a checkpoint was written
+_MODEL_DEFAULTS = [_field_defaults(cls) for cls in MODEL_TYPES]
+
+
+class _Unsupported(Exception):
+    """The value is not made of chatbot state types only."""
+
+
+def _construct(cls: Any, defaults: Dict[str, Any], fields: Dict[str, Any]) -> Any:
+    """
+    Build an instance from already validated fields, like ``model_construct``.
+
+    ``model_construct`` inspects the signature of every default factory on
+    each call, which dominates decoding; the defaults are precomputed here.
+    """
+    values = {
+        name: default.copy() if type(default) in (dict, list) else default
+        for name, default in defaults.items()
+        if name not in fields
+    }
+    extra: Optional[Dict[str, Any]] = None
+    for name, value in fields.items():
+        if name in cls.model_fields:
+            values[name] = value
+        else:
+            extra = extra or {}
+            extra[name] = value
+    instance = cls.__new__(cls)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", {name for name in fields if name in cls.model_fields})
+    object.__setattr__(instance, "__pydantic_extra__", extra if cls.model_config.get("extra") == "allow" else None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+def _zstd() -> Any:
+    import zstandard
+
+    return zstandard
+
+
+def _unpack_ext(code: int, data: bytes) -> str:
+    if code == _ZLIB_EXT:
+        return zlib.decompress(data).decode("utf-8")
+    if code == _ZSTD_EXT:
+        return _zstd().ZstdDecompressor().decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown extension code {code} in a chatbot checkpoint")
+
+
+class ChatbotSerializer(JsonPlusSerializer):
+    """
+    Checkpoint serializer with a compact encoding of the chatbot state.
+
+    LangChain messages, the state's pydantic models and lists and string-keyed
+    dicts of them (the ``messages``, ``request_items`` and ``response_items``
+    channels and the writes of the nodes) are encoded as msgpack arrays: a
+    class index and, for messages, only the fields that differ from their
+    defaults, for models the field values in declaration order. Text of at
+    least ``compression_threshold`` UTF-8 bytes is compressed with zlib or
+    zstd when that makes it smaller. Values are rebuilt without validation,
+    like ``model_construct``, so messages round-trip with their exact type
+    and fields. Everything else is handled by ``JsonPlusSerializer``.
+
+    The payload starts with ``SCHEMA_VERSION``; checkpoints written by a
+    newer schema are rejected instead of being misread.
+    """
+
+    def __init__(
+        self,
+        compression: CheckpointCompression = CheckpointCompression.ZLIB,
+        compression_threshold: int = 1024,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self._compress: Optional[Callable[[bytes], bytes]] = None
+        self._ext_code = 0
+        if compression == CheckpointCompression.ZLIB:
+            self._compress, self._ext_code = zlib.compress, _ZLIB_EXT
+        elif compression == CheckpointCompression.ZSTD:
+            self._compress, self._ext_code = _zstd().ZstdCompressor().compress, _ZSTD_EXT
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        try:
+            encoded = self._encode(obj)
+        except _Unsupported:
+            return super().dumps_typed(obj)
+        try:
+            return TYPE_TAG, ormsgpack.packb([SCHEMA_VERSION, encoded])
+        except (ormsgpack.MsgpackEncodeError, TypeError):
+            # e.g. an object in a message's response_metadata
+            return super().dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ != TYPE_TAG:
+            return super().loads_typed(data)
+        version, encoded = ormsgpack.unpackb(payload, ext_hook=_unpack_ext)
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Checkpoint schema version {version} is newer than {SCHEMA_VERSION}")
+        return self._decode(encoded)
+
+    def _text(self, value: Any) -> Any:
+        if self._compress is None or not isinstance(value, str) or len(value) < self.compression_threshold // 4:
+            return value
+        raw = value.encode("utf-8")
+        if len(raw) < self.compression_threshold:
+            return value
+        compressed = self._compress(raw)
+        return ormsgpack.Ext(self._ext_code, compressed) if len(compressed) < len(raw) else value
+
+    def _encode(self, value: Any) -> List[Any]:
+        cls = type(value)
+        index = _MESSAGE_INDEX.get(cls)
+        if index is not None:
+            defaults = _MESSAGE_DEFAULTS[index]
+            fields = {
+                name: field
+                for name, field in value.__dict__.items()
+                if name != "type" and not (name in defaults and field == defaults[name])
+            }
+            if value.__pydantic_extra__:
+                fields.update(value.__pydantic_extra__)
+            if "content" in fields:
+                fields["content"] = self._text(fields["content"])
+            return [_MESSAGE, index, fields]
+        index = _MODEL_INDEX.get(cls)
+        if index is not None:
+            return [_MODEL, index, [self._text(getattr(value, name)) for name in _MODEL_FIELDS[index]]]
+        if cls is list:
+            return [_LIST, [self._encode(item) for item in value]]
+        if cls is dict and all(type(key) is str for key in value):
+            return [_DICT, {key: self._encode(item) for key, item in value.items()}]
+        raise _Unsupported
+
+    def _decode(self, encoded: List[Any]) -> Any:
+        tag = encoded[0]
+        if tag == _MESSAGE:
+            return _construct(MESSAGE_TYPES[encoded[1]], _MESSAGE_DEFAULTS[encoded[1]], encoded[2])
+        if tag == _MODEL:
+            return _construct(
+                MODEL_TYPES[encoded[1]], _MODEL_DEFAULTS[encoded[1]], dict(zip(_MODEL_FIELDS[encoded[1]], encoded[2]))
+            )
+        if tag == _LIST:
+            return [self._decode(item) for item in encoded[1]]
+        if tag == _DICT:
+            return {key: self._decode(item) for key, item in encoded[1].items()}
+        raise ValueError(f"Unknown tag {tag} in a chatbot checkpoint")
+
+
+def create_serializer(configuration: Any) -> Optional[ChatbotSerializer]:
+    """Serializer for the graph's checkpointer, or None for the LangGraph default."""
+    if not configuration.enable_compact_checkpoints:
+        return None
+    return ChatbotSerializer(configuration.checkpoint_compression, configuration.checkpoint_compression_threshold)
@@ -0,0 +1,385 @@
+"""HTTP service exposing the chatbot graph with per-thread endpoints and SSE streaming."""
+
+import argparse
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
+
+from src.api_support_chatbot.accounting import usage_ledger
+from src.api_support_chatbot.admission import (
+    Admission,
+    Overloaded,
+    admission_controller,
+)
+from src.api_support_chatbot.chatbot import create_graph
+from src.api_support_chatbot.clients import close_clients
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.debounce import message_debouncer
+from src.api_support_chatbot.followups import deliver_follow_ups, follow_ups
+from src.api_support_chatbot.profiling import loop_monitor, node_profiler
+from src.api_support_chatbot.telemetry import REGISTRY
+from src.api_support_chatbot.turns import RunTurn, Superseded, Turn, turn_registry
+from src.api_support_chatbot.utils import (
+    create_error_message,
+    generate_conversation_id,
+    log_agent_action,
+)
+from src.api_support_chatbot.warmup import warm_up, warmup_state
+
+
+class MessageRequest(BaseModel):
+    """Customer message posted to a thread."""
+    message: str
+
+
+class MessageResponse(BaseModel):
+    """Chatbot reply for a thread."""
+    thread_id: str
+    response: str
+
+
+class ThreadResponse(BaseModel):
+    """Newly created thread."""
+    thread_id: str
+
+
+class ProfilerRequest(BaseModel):
+    """Enable or disable the node profiler of a worker."""
+    enabled: bool
+    interval: Optional[float] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Compile the graph once per worker, warm it up, and release pooled clients on shutdown.
+
+    Warm-up runs in the background: the worker answers liveness probes right
+    away and reports ready on ``/readyz`` once warm-up has finished.
+    """
+    load_dotenv()
+    configuration = Configuration.from_runnable_config()
+    app.state.graph = create_graph()
+    warmup_task = asyncio.create_task(warm_up())
+    if configuration.enable_loop_monitor:
+        loop_monitor.interval = configuration.loop_lag_interval
+        loop_monitor.threshold = configuration.loop_lag_threshold
+        loop_monitor.start()
+    if configuration.enable_node_profiler:
+        node_profiler.start(configuration.node_profiler_interval)
+    log_agent_action("Server", "Worker started", {"pid": os.getpid()})
+    yield
+    log_agent_action("Server", "Worker shutting down", {"pid": os.getpid()})
+    warmup_task.cancel()
+    loop_monitor.stop()
+    node_profiler.stop()
+    await follow_ups.cancel_all()
+    await close_clients()
+
+
+app = FastAPI(title="API Support Chatbot", lifespan=lifespan)
+
+
+# Follow-up deliveries in progress (referenced so they are not garbage collected)
+_deliveries: Set[asyncio.Task] = set()
+
+
+def _schedule_follow_ups(graph: Any, thread_id: str) -> None:
+    """Deliver late response items of the turn in the background, if any."""
+    if not follow_ups.pending(thread_id):
+        return
+    task = asyncio.create_task(deliver_follow_ups(graph, thread_id))
+    _deliveries.add(task)
+    task.add_done_callback(_deliveries.discard)
+
+
+def _thread_config(thread_id: str, admission: Optional[Admission] = None) -> Dict[str, Any]:
+    """Build the runnable config for a thread (and the degradation mode of an admitted turn)."""
+    configurable: Dict[str, Any] = {"thread_id": thread_id}
+    if admission is not None:
+        configurable["degradation_mode"] = admission.mode.value
+    return {"configurable": configurable}
+
+
+def _admit() -> Admission:
+    """Admit a turn or reject it with 503 and Retry-After."""
+    try:
+        return admission_controller.admit(Configuration.from_runnable_config())
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def _start_turn(
+    graph: Any, thread_id: str, message: str, run: RunTurn, admission: Admission
+) -> Tuple[Turn, bool]:
+    """
+    Start a turn on a thread, superseding its in-flight turn if enabled.
+
+    With a debounce window the message may be merged with the thread's next
+    messages into one turn, which is then run with the last message's ``run``.
+
+    Returns:
+        Tuple of (turn, last) where ``last`` is False if the message was merged
+        into a later message's turn
+    """
+    configuration = Configuration.from_runnable_config()
+    config = _thread_config(thread_id, admission)
+    human_message = HumanMessage(content=message)
+    supersede = configuration.enable_turn_supersession
+    if configuration.message_debounce_window > 0:
+        return await message_debouncer.submit(
+            graph,
+            config,
+            human_message,
+            run,
+            configuration.message_debounce_window,
+            configuration.message_debounce_max_wait,
+            supersede=supersede,
+        )
+    return await turn_registry.start(graph, config, [human_message], run, supersede=supersede), True
+
+
+def _message_to_dict(message: BaseMessage) -> Dict[str, Any]:
+    return {"type": message.type, "content": message.content}
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a single Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.get("/healthz")
+async def healthz() -> Dict[str, str]:
+    """Liveness probe."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz() -> JSONResponse:
+    """Readiness probe with the warm-up report; 503 until warm-up has finished."""
+    report = warmup_state.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    """Prometheus metrics of this worker."""
+    return REGISTRY.render()
+
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def get_profile() -> str:
+    """Node profiler samples of this worker as collapsed stacks (flamegraph input)."""
+    return node_profiler.collapsed()
+
+
+@app.post("/debug/profile")
+async def set_profile(body: ProfilerRequest) -> Dict[str, Any]:
+    """Start (clearing previous samples) or stop the node profiler of this worker."""
+    if body.enabled:
+        node_profiler.start(body.interval or Configuration.from_runnable_config().node_profiler_interval)
+    else:
+        node_profiler.stop()
+    return node_profiler.summary()
+
+
+@app.post("/threads", response_model=ThreadResponse)
+async def create_thread() -> ThreadResponse:
+    """Create a new conversation thread."""
+    return ThreadResponse(thread_id=generate_conversation_id())
+
+
+@app.get("/threads/{thread_id}/messages")
+async def get_messages(thread_id: str, request: Request) -> List[Dict[str, Any]]:
+    """Get the message history of a thread."""
+    snapshot = await request.app.state.graph.aget_state(_thread_config(thread_id))
+    messages = snapshot.values.get("messages", []) if snapshot else []
+    return [_message_to_dict(m) for m in messages]
+
+
+@app.get("/threads/{thread_id}/usage")
+async def get_thread_usage(thread_id: str) -> Dict[str, float]:
+    """Token and cost totals of a thread on this worker."""
+    return usage_ledger.thread_totals(thread_id)
+
+
+@app.get("/usage")
+async def get_usage(top: int = 10) -> Dict[str, Any]:
+    """Token and cost totals by node and deployment, and the most expensive threads."""
+    return {
+        "by_node": usage_ledger.by_node(),
+        "by_deployment": usage_ledger.by_deployment(),
+        "top_threads": [{"thread_id": t, **totals} for t, totals in usage_ledger.top_threads(top)],
+    }
+
+
+@app.post("/threads/{thread_id}/messages", response_model=MessageResponse)
+async def post_message(thread_id: str, body: MessageRequest, request: Request) -> MessageResponse:
+    """
+    Send a customer message and wait for the complete reply.
+
+    Answers 409 if a newer message on the thread superseded this turn, and
+    503 with Retry-After if admission control rejects it. A message merged
+    into a later message's turn gets that turn's reply.
+    """
+    graph = request.app.state.graph
+    admission = _admit()
+    try:
+        turn, last = await _start_turn(
+            graph, thread_id, body.message, lambda state, config: graph.ainvoke(state, config=config), admission
+        )
+        result = await turn.result()
+        if not last:
+            # The turn may have been run by a stream, which has no final state
+            result = (await graph.aget_state(_thread_config(thread_id))).values
+    except Superseded as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        error_msg = create_error_message(e, "post_message")
+        log_agent_action("Server", "Error occurred", {"error": error_msg, "thread_id": thread_id})
+        raise HTTPException(status_code=500, detail=error_msg)
+    finally:
+        admission_controller.release(admission)
+    _schedule_follow_ups(graph, thread_id)
+    return MessageResponse(thread_id=thread_id, response=result["messages"][-1].content)
+
+
+# Marks the end of a turn's stream updates
+_END_OF_TURN = object()
+
+
+async def _stream_turn(graph: Any, thread_id: str, message: str, admission: Admission) -> AsyncIterator[str]:
+    """Run one turn and yield SSE events for node progress and AI messages."""
+    updates: asyncio.Queue = asyncio.Queue()
+
+    async def run(state: Dict[str, Any], config: Dict[str, Any]) -> None:
+        try:
+            async for update in graph.astream(state, config=config, stream_mode="updates"):
+                updates.put_nowait(update)
+        finally:
+            updates.put_nowait(_END_OF_TURN)
+
+    turn, last = None, False
+    try:
+        turn, last = await _start_turn(graph, thread_id, message, run, admission)
+        if not last:
+            yield _sse_event("merged", {"thread_id": thread_id})
+            return
+        while (update := await updates.get()) is not _END_OF_TURN:
+            for node, node_update in update.items():
+                yield _sse_event("node", {"node": node})
+                if not isinstance(node_update, dict):
+                    continue
+                for msg in node_update.get("messages", []) or []:
+                    if isinstance(msg, AIMessage):
+                        final = msg.additional_kwargs.get("artifact", {}).get("final_response", False)
+                        yield _sse_event("message", {"content": msg.content, "final": final})
+        await turn.result()
+        _schedule_follow_ups(graph, thread_id)
+        yield _sse_event("end", {"thread_id": thread_id})
+    except Superseded as e:
+        yield _sse_event("superseded", {"thread_id": thread_id, "detail": str(e)})
+    except Exception as e:
+        error_msg = create_error_message(e, "stream_turn")
+        log_agent_action("Server", "Error occurred", {"error": error_msg, "thread_id": thread_id})
+        yield _sse_event("error", {"error": error_msg})
+    finally:
+        # Stop the run if the client disconnected mid-stream
+        if turn is not None and last and not turn.task.done():
+            turn.task.cancel()
+        admission_controller.release(admission)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response holding an admission slot until the response ends.
+
+    The stream releases the slot when the turn ends, but a client that
+    disconnects before the stream starts never runs it, so the slot is
+    also released (once) when the response itself is done.
+    """
+
+    def __init__(self, content: AsyncIterator[str], admission: Admission, **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.admission = admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            admission_controller.release(self.admission)
+
+
+@app.post("/threads/{thread_id}/stream")
+async def stream_message(thread_id: str, body: MessageRequest, request: Request) -> StreamingResponse:
+    """Send a customer message and stream progress over Server-Sent Events."""
+    admission = _admit()
+    return AdmittedStreamingResponse(
+        _stream_turn(request.app.state.graph, thread_id, body.message, admission),
+        admission,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def checkpoints_shared() -> bool:
+    """Whether the graph's checkpointer is shared between processes (not the in-memory one)."""
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    return not isinstance(create_graph().checkpointer, InMemorySaver)
+
+
+def main() -> None:
+    """
+    Run the service with uvicorn.
+
+    More than one worker is refused while checkpoints are kept in memory:
+    each process would have its own, and uvicorn does not route a thread's
+    next message to the worker holding it. ``--per-worker-checkpoints``
+    allows it anyway, for sticky routing in front of the service or
+    single-turn traffic such as load tests.
+    """
+    parser = argparse.ArgumentParser(description="API Support Chatbot HTTP service")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVER_WORKERS", "1")))
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+        help="Seconds to let in-flight turns finish on shutdown",
+    )
+    parser.add_argument(
+        "--per-worker-checkpoints",
+        action="store_true",
+        default=os.getenv("SERVER_PER_WORKER_CHECKPOINTS", "false").lower() == "true",
+        help="Allow --workers > 1 with in-memory checkpoints (threads must stick to one worker)",
+    )
+    args = parser.parse_args()
+    if args.workers > 1 and not args.per_worker_checkpoints and not checkpoints_shared():
+        parser.error(
+            "--workers > 1 needs a shared checkpointer: with in-memory checkpoints a thread's next "
+            "message may reach a worker without its history (see --per-worker-checkpoints)"
+        )
+
+    uvicorn.run(
+        "src.api_support_chatbot.server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Single-flight coalescing of identical in-flight request items."""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.api_support_chatbot.telemetry import REGISTRY
+
+_PUNCTUATION_EDGES = re.compile(r"^[\W_]+|[\W_]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+# Marker placed on the shared future when the leader fails, so that followers
+# can tell a failed computation apart from their own cancellation.
+_FAILED = object()
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalize free text for fingerprinting (case, whitespace, edge punctuation)."""
+    if not text:
+        return ""
+    text = _WHITESPACE.sub(" ", text.lower()).strip()
+    return _PUNCTUATION_EDGES.sub("", text)
+
+
+def request_fingerprint(
+    product_id: Optional[str], category: Optional[str], request_text: Optional[str], scope: str = ""
+) -> str:
+    """
+    Build a stable fingerprint for a (product_id, category, request_text) triple.
+
+    ``scope`` separates the same request asked under different settings,
+    e.g. ``Configuration.answer_fingerprint``.
+    """
+    parts = [normalize_text(product_id), normalize_text(category), normalize_text(request_text)]
+    if scope:
+        parts.append(scope)
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one computation.
+
+    The first caller for a key (the leader) runs the computation; callers that
+    arrive while it is in flight (followers) await the leader's result for at
+    most ``wait_timeout`` seconds. If the leader fails or the wait expires, the
+    follower falls back to running the computation itself.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, int] = {
+            "leaders": 0,
+            "coalesced": 0,
+            "fallback_timeout": 0,
+            "fallback_error": 0,
+        }
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        wait_timeout: float,
+    ) -> tuple[Any, bool]:
+        """
+        Run ``fn`` once per key among concurrent callers.
+
+        Args:
+            key: Coalescing key (see ``request_fingerprint``)
+            fn: Zero-argument coroutine factory producing the result
+            wait_timeout: Maximum seconds a follower waits for the leader
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True if the result
+            was produced by another caller.
+        """
+        loop = asyncio.get_running_loop()
+        future = self._calls.get(key)
+
+        if future is not None and future.get_loop() is loop:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), timeout=wait_timeout)
+            except asyncio.TimeoutError:
+                self._stats["fallback_timeout"] += 1
+            else:
+                if result is not _FAILED:
+                    self._stats["coalesced"] += 1
+                    return result, True
+                self._stats["fallback_error"] += 1
+            return await fn(), False
+
+        future = loop.create_future()
+        self._calls[key] = future
+        self._stats["leaders"] += 1
+        try:
+            result = await fn()
+        except BaseException:
+            future.set_result(_FAILED)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of coalescing counters."""
+        return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """Reset coalescing counters."""
+        for name in self._stats:
+            self._stats[name] = 0
+
+
+# Process-wide coalescer shared by all response agents
+response_singleflight = SingleFlight()
+
+
+class RecentResponses:
+    """
+    Bounded, time-limited memory of answered request items by fingerprint.
+
+    Consulted only in the ``cache_only`` degradation mode, so a worker under
+    overload can still answer questions it answered recently.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Recently answered request items, for the cache_only degradation mode
+recent_responses = RecentResponses()
+
+REGISTRY.gauge(
+    "chatbot_response_coalescing_events",
+    "Single-flight outcomes of response agent calls since start",
+    ["outcome"],
+    callback=lambda: {(name,): value for name, value in response_singleflight.stats().items()},
+)
+REGISTRY.gauge(
+    "chatbot_response_coalescing_in_flight",
+    "Single-flight computations of response items in flight",
+    callback=lambda: {(): response_singleflight.in_flight()},
+)
@@ -1,12 +1,14 @@
 """State definitions for the API Support Chatbot graph."""
 
-import operator
-from typing import Annotated, List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any, Sequence
 
 from langchain_core.messages import BaseMessage
+from langgraph.channels.base import BaseChannel
 from langgraph.graph import MessagesState
 from pydantic import BaseModel, Field
 
+from src.api_support_chatbot.retrieval_memory import RetrievalMemoryChannel, RetrievedContext
+
 
 # Structured Output Models
 class RequestDetails(BaseModel):
@@ -66,6 +68,14 @@ class ResponseItem(BaseModel):
         default=False,
         description="Whether there was an error processing this request"
     )
+    pending: bool = Field(
+        default=False,
+        description="Whether the response missed the fan-out deadline and is still pending"
+    )
+    attempts: int = Field(
+        default=1,
+        description="Runs of the response agent for this request item, failed ones included"
+    )
 
 
 class AssembledResponse(BaseModel):
@@ -79,17 +89,95 @@ class AssembledResponse(BaseModel):
     )
 
 
-def items_reducer(current_value, new_value):
-    """Reducer function that handles both individual items and lists, and allows clearing."""
-    if isinstance(new_value, list) and new_value == []:
-        # Clear the list
-        return []
-    elif isinstance(new_value, list):
-        # Add list to current list
-        return operator.add(current_value, new_value)
+def item_key(item: Any) -> str:
+    """Key of a request or response item in the id-keyed containers."""
+    if isinstance(item, ResponseItem):
+        key = item.request_id
     else:
-        # Add individual item to current list
-        return current_value + [new_value]
+        key = getattr(item, "id", None)
+    if key is None:
+        # Items without an id still need a stable, unique slot
+        key = f"_{id(item)}"
+    return key
+
+
+class KeyedItemsChannel(BaseChannel):
+    """
+    Channel holding items keyed by id.
+
+    All writes of a super-step are merged with a single copy of the current
+    mapping, so N fan-out results cost O(N) instead of the O(N^2) of a
+    list-concatenating reducer. Writing an empty list or dict clears the
+    channel; writing an item whose id is already present replaces it.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, typ: Any = dict, key: str = "") -> None:
+        super().__init__(typ, key)
+        self.value: Dict[str, Any] = {}
+
+    @property
+    def ValueType(self) -> Any:
+        return dict
+
+    @property
+    def UpdateType(self) -> Any:
+        return Any
+
+    def copy(self) -> "KeyedItemsChannel":
+        # The mapping is never mutated in place, so sharing it is safe
+        empty = self.__class__(self.typ, self.key)
+        empty.value = self.value
+        return empty
+
+    def from_checkpoint(self, checkpoint: Any) -> "KeyedItemsChannel":
+        empty = self.__class__(self.typ, self.key)
+        if isinstance(checkpoint, dict):
+            empty.value = checkpoint
+        elif isinstance(checkpoint, list):
+            # Checkpoints written by the former list-based reducer
+            empty.value = {item_key(item): item for item in checkpoint}
+        return empty
+
+    def update(self, values: Sequence[Any]) -> bool:
+        if not values:
+            return False
+        merged: Optional[Dict[str, Any]] = None
+        for value in values:
+            if isinstance(value, (list, tuple, dict)):
+                if not value:
+                    merged = {}
+                    continue
+                items = value.values() if isinstance(value, dict) else value
+            else:
+                items = (value,)
+            if merged is None:
+                merged = dict(self.value)
+            for item in items:
+                merged[item_key(item)] = item
+        self.value = merged
+        return True
+
+    def get(self) -> Dict[str, Any]:
+        return self.value
+
+    def checkpoint(self) -> Dict[str, Any]:
+        return self.value
+
+
+TRANSIENT_ARTIFACT = "transient"
+
+
+def mark_transient(message: BaseMessage) -> BaseMessage:
+    """Flag a status message so it is removed from history when the turn commits."""
+    message.additional_kwargs = {"artifact": {TRANSIENT_ARTIFACT: True}}
+    return message
+
+
+def is_transient(message: BaseMessage) -> bool:
+    """Whether a message is a transient status message."""
+    return bool(message.additional_kwargs.get("artifact", {}).get(TRANSIENT_ARTIFACT))
 
 
 class ChatbotState(MessagesState):
@@ -99,6 +187,11 @@ class ChatbotState(MessagesState):
     max_clarification_attempts: int
 
     request_details: Optional[RequestDetails] = None
-    request_items: Annotated[list[RequestItem], items_reducer] = []
-    response_items: Annotated[list[ResponseItem], items_reducer] = []
+    # Per-turn scratch fields, keyed by item id and pruned once the turn commits
+    request_items: Annotated[Dict[str, RequestItem], KeyedItemsChannel()] = {}
+    response_items: Annotated[Dict[str, ResponseItem], KeyedItemsChannel()] = {}
+    # Wall-clock fan-out deadline of the turn, shared by its first run and re-runs
+    fan_out_deadline: Optional[float] = None
     assembled_response: Optional[AssembledResponse] = None
+    # Tool results kept across turns for follow-up questions, keyed by tool call
+    retrieval_memory: Annotated[Dict[str, RetrievedContext], RetrievalMemoryChannel()] = {}
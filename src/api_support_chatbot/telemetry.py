@@ -0,0 +1,432 @@
+"""Tracing spans, latency histograms and Prometheus text export."""
+
+import asyncio
+import contextvars
+import functools
+import math
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+# Metrics
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labels), 0.0)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Gauge with labels, either set directly or computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self._callback = callback
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            self._values = {tuple(str(v) for v in k): float(v) for k, v in self._callback().items()}
+        return super().render()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[LabelValues, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(tuple(str(labels.get(n, "")) for n in self.labels))
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = []
+        inf = 'le="+Inf"'
+        for key, (counts, total, count) in sorted(self._series.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, inf)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Any) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, help_text, labels, callback))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def get(self, name: str) -> Any:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+REGISTRY = MetricsRegistry()
+
+NODE_DURATION = REGISTRY.histogram(
+    "chatbot_node_duration_seconds", "Graph node execution time", ["node"]
+)
+NODE_ERRORS = REGISTRY.counter(
+    "chatbot_node_errors_total", "Graph node executions that raised", ["node"]
+)
+NODE_CANCELLATIONS = REGISTRY.counter(
+    "chatbot_node_cancellations_total", "Graph node executions cancelled in flight", ["node"]
+)
+MODEL_CALL_DURATION = REGISTRY.histogram(
+    "chatbot_model_call_duration_seconds", "Chat model call latency", ["node", "deployment"]
+)
+TOOL_CALL_DURATION = REGISTRY.histogram(
+    "chatbot_tool_call_duration_seconds", "MCP tool call latency", ["tool", "status"]
+)
+
+
+# Tracing
+
+class SpanExportResult(Enum):
+    """Result of exporting spans (mirrors the OpenTelemetry SDK enum)."""
+    SUCCESS = 0
+    FAILURE = 1
+
+
+class Span:
+    """A timed operation with attributes, linked to its parent by ids."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "status", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "OK"
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (0 while the span is open)."""
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns else 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SpanExporter:
+    """
+    Exporter interface for finished spans.
+
+    Matches the OpenTelemetry SDK ``SpanExporter`` method names so adapters
+    can be thin.
+    """
+
+    def export(self, spans: Sequence[Span]) -> SpanExportResult:
+        raise NotImplementedError
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in memory (for tests and debugging)."""
+
+    def __init__(self) -> None:
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> SpanExportResult:
+        with self._lock:
+            self._spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class OpenTelemetrySpanExporter(SpanExporter):
+    """
+    Re-emits spans through the OpenTelemetry API.
+
+    Requires ``opentelemetry-api``; with an OpenTelemetry SDK configured the
+    spans flow to whatever processors and exporters the SDK uses.
+    """
+
+    def __init__(self, tracer_name: str = "api_support_chatbot") -> None:
+        from opentelemetry import trace
+
+        self._tracer = trace.get_tracer(tracer_name)
+
+    def export(self, spans: Sequence[Span]) -> SpanExportResult:
+        for span in spans:
+            otel_span = self._tracer.start_span(span.name, start_time=span.start_ns, attributes={
+                k: v if isinstance(v, (str, int, float, bool)) else str(v) for k, v in span.attributes.items()
+            })
+            if span.error:
+                otel_span.set_attribute("error.message", span.error)
+            otel_span.end(end_time=span.end_ns)
+        return SpanExportResult.SUCCESS
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+# Graph node of the current task; tasks created inside a node inherit it
+_current_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_node", default=None)
+_exporters: List[SpanExporter] = []
+
+
+def add_span_exporter(exporter: SpanExporter) -> None:
+    """Register an exporter for finished spans."""
+    _exporters.append(exporter)
+
+
+def remove_span_exporter(exporter: SpanExporter) -> None:
+    """Unregister a previously added exporter."""
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the current task, if any."""
+    return _current_span.get()
+
+
+def current_node() -> Optional[str]:
+    """The graph node the current task runs in or was created by, if any."""
+    return _current_node.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Open a span as a child of the current span.
+
+    Attributes of the parent (thread id, item id) are inherited so every
+    span of a turn can be filtered by them.
+    """
+    parent = _current_span.get()
+    inherited = {k: v for k, v in (parent.attributes.items() if parent else ()) if k in ("thread_id", "request_item_id")}
+    inherited.update(attributes)
+    current = Span(name, parent.trace_id if parent else secrets.token_hex(16), parent.span_id if parent else None, inherited)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "ERROR"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        for exporter in list(_exporters):
+            try:
+                exporter.export([current])
+            except Exception:
+                pass
+
+
+def thread_id_from_config(config: Optional[Dict[str, Any]]) -> str:
+    """Get the thread id from a runnable config."""
+    if not config:
+        return ""
+    return str((config.get("configurable") or {}).get("thread_id", ""))
+
+
+# Code objects of traced node functions -> node name, for attributing stack samples
+NODE_CODES: Dict[Any, str] = {}
+
+
+def traced_node(name: str) -> Callable:
+    """
+    Decorate a graph node with a span and a duration histogram.
+
+    The wrapped function keeps its signature so LangGraph still passes
+    ``config`` to nodes that declare it. While it runs, ``current_node`` is
+    the node's name, also in tasks the node creates.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        NODE_CODES[fn.__code__] = name
+
+        @functools.wraps(fn)
+        async def wrapper(state: Any, *args: Any, **kwargs: Any) -> Any:
+            config = kwargs.get("config", args[0] if args else None)
+            attributes: Dict[str, Any] = {"node": name, "thread_id": thread_id_from_config(config)}
+            request_item = state.get("request_item") if isinstance(state, dict) else None
+            if request_item is not None:
+                attributes["request_item_id"] = request_item.id
+            started = time.perf_counter()
+            node_token = _current_node.set(name)
+            try:
+                with span(f"node.{name}", **attributes):
+                    return await fn(state, *args, **kwargs)
+            except asyncio.CancelledError:
+                NODE_CANCELLATIONS.inc(node=name)
+                raise
+            except BaseException:
+                NODE_ERRORS.inc(node=name)
+                raise
+            finally:
+                _current_node.reset(node_token)
+                NODE_DURATION.observe(time.perf_counter() - started, node=name)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def model_call_span(node: str, deployment: str, **attributes: Any) -> Iterator[Span]:
+    """Span and latency histogram for a chat model call."""
+    started = time.perf_counter()
+    try:
+        with span("model_call", node=node, deployment=deployment, **attributes) as current:
+            yield current
+    finally:
+        MODEL_CALL_DURATION.observe(time.perf_counter() - started, node=node, deployment=deployment)
+
+
+@contextmanager
+def tool_call_span(tool: str, **attributes: Any) -> Iterator[Span]:
+    """Span and latency histogram for an MCP tool call."""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        with span("tool_call", tool=tool, **attributes) as current:
+            yield current
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        TOOL_CALL_DURATION.observe(time.perf_counter() - started, tool=tool, status=status)
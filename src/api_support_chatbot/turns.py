@@ -0,0 +1,197 @@
+"""Per-thread turn supersession: a new customer message cancels the thread's in-flight turn."""
+
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from src.api_support_chatbot.followups import follow_ups
+from src.api_support_chatbot.retrieval_memory import forget
+from src.api_support_chatbot.telemetry import REGISTRY
+from src.api_support_chatbot.utils import log_agent_action
+
+SUPERSEDED_TURNS = REGISTRY.counter(
+    "chatbot_turns_superseded_total", "Turns cancelled in flight by a newer message on the same thread"
+)
+SUPERSEDED_TURN_DURATION = REGISTRY.histogram(
+    "chatbot_superseded_turn_seconds", "How long a turn had been running when it was superseded"
+)
+
+RunTurn = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+
+class Superseded(Exception):
+    """The turn was cancelled by a newer message on the same thread."""
+
+
+class Turn:
+    """One graph run on a thread, started by one or more customer messages."""
+
+    __slots__ = ("turn_id", "thread_id", "messages", "base_config", "task", "started_at", "superseded")
+
+    def __init__(self, thread_id: str, messages: List[Any], base_config: Optional[Dict[str, Any]]) -> None:
+        # Passed to the run as `turn_id`, so the turn's stragglers can be told apart
+        self.turn_id = uuid.uuid4().hex
+        self.thread_id = thread_id
+        self.messages = messages
+        # Config of the last committed checkpoint the turn started from (None: empty thread)
+        self.base_config = base_config
+        self.task: Optional[asyncio.Task] = None
+        self.started_at = time.perf_counter()
+        self.superseded = False
+
+    async def result(self) -> Any:
+        """
+        Wait for the turn and return the graph result.
+
+        Raises:
+            Superseded: If a newer message on the thread cancelled the turn
+        """
+        try:
+            await asyncio.wait([self.task])
+        except asyncio.CancelledError:
+            # The caller went away (e.g. the client disconnected): stop the run too
+            self.task.cancel()
+            raise
+        if self.task.cancelled():
+            raise Superseded(f"Turn on thread {self.thread_id} was superseded by a newer message")
+        return self.task.result()
+
+
+class _ThreadLock:
+    """A thread's lock and the number of callers holding or waiting for it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class TurnRegistry:
+    """
+    In-flight turns by thread.
+
+    Starting a turn on a thread whose previous turn is still running cancels
+    that run: the cancellation reaches the pending model calls, tool calls and
+    ``Send`` branches at their next await. The new turn then starts from the
+    checkpoint the cancelled turn started from, so nothing the cancelled run
+    wrote survives, and it carries the cancelled turn's messages along with
+    the new one, so a correction is answered together with what it corrects.
+    """
+
+    def __init__(self) -> None:
+        self._turns: Dict[str, Turn] = {}
+        self._locks: Dict[str, _ThreadLock] = {}
+
+    def in_flight(self) -> int:
+        """Number of threads with a turn running."""
+        return len(self._turns)
+
+    async def start(
+        self,
+        graph: Any,
+        config: Dict[str, Any],
+        messages: List[Any],
+        run: RunTurn,
+        supersede: bool = True,
+    ) -> Turn:
+        """
+        Start a turn on the thread of ``config``.
+
+        Args:
+            graph: Compiled chatbot graph (for its checkpoints)
+            config: Runnable config with the thread id
+            messages: Customer messages of the turn
+            run: Coroutine function running the graph with (input, config)
+            supersede: Cancel the thread's in-flight turn; otherwise wait for it
+
+        Returns:
+            The running turn
+        """
+        thread_id = config["configurable"]["thread_id"]
+        async with self._locked(thread_id):
+            previous = self._turns.get(thread_id)
+            if previous is not None and not previous.task.done():
+                if supersede:
+                    previous.task.cancel()
+                await asyncio.wait([previous.task])
+
+            if previous is not None and previous.task.cancelled():
+                previous.superseded = True
+                turn = Turn(thread_id, previous.messages + messages, previous.base_config)
+                await self._discard(graph, previous)
+            else:
+                snapshot = await graph.aget_state(config)
+                committed = snapshot is not None and bool(snapshot.values)
+                turn = Turn(thread_id, messages, snapshot.config if committed else None)
+
+            run_config = dict(config, configurable=dict(config["configurable"], turn_id=turn.turn_id))
+            if turn.base_config is not None:
+                run_config["configurable"].update(
+                    checkpoint_ns="", checkpoint_id=turn.base_config["configurable"]["checkpoint_id"]
+                )
+            turn.task = asyncio.ensure_future(run({"messages": turn.messages}, run_config))
+            turn.task.add_done_callback(lambda _: self._finish(turn))
+            self._turns[thread_id] = turn
+            return turn
+
+    @asynccontextmanager
+    async def exclusive(self, thread_id: str) -> AsyncIterator[None]:
+        """
+        Hold a thread between turns, e.g. to write to its checkpoint from outside a run.
+
+        Waits for the thread's in-flight turn to finish; turns started
+        meanwhile wait until the context exits.
+        """
+        async with self._locked(thread_id):
+            running = self._turns.get(thread_id)
+            if running is not None and not running.task.done():
+                await asyncio.wait([running.task])
+            yield
+
+    @asynccontextmanager
+    async def _locked(self, thread_id: str) -> AsyncIterator[None]:
+        # Dropped once no caller holds or waits for it: an unlocked lock may
+        # still have a woken waiter that has not re-acquired it yet
+        thread_lock = self._locks.get(thread_id)
+        if thread_lock is None:
+            thread_lock = self._locks[thread_id] = _ThreadLock()
+        thread_lock.users += 1
+        try:
+            async with thread_lock.lock:
+                yield
+        finally:
+            thread_lock.users -= 1
+            if not thread_lock.users:
+                del self._locks[thread_id]
+
+    async def _discard(self, graph: Any, turn: Turn) -> None:
+        """Drop the work of a superseded turn."""
+        elapsed = time.perf_counter() - turn.started_at
+        SUPERSEDED_TURNS.inc()
+        SUPERSEDED_TURN_DURATION.observe(elapsed)
+        await follow_ups.cancel(turn.thread_id, turn.turn_id)
+        if turn.base_config is None:
+            # Nothing was committed before the superseded turn
+            await graph.checkpointer.adelete_thread(turn.thread_id)
+        log_agent_action("Turns", "Superseded in-flight turn", {
+            "thread_id": turn.thread_id,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "messages": len(turn.messages),
+        })
+
+    def _finish(self, turn: Turn) -> None:
+        # A cancelled or failed turn may not have reached the assembler
+        forget(turn.thread_id)
+        if self._turns.get(turn.thread_id) is turn:
+            del self._turns[turn.thread_id]
+
+
+# Process-wide turn registry of this worker
+turn_registry = TurnRegistry()
+
+REGISTRY.gauge(
+    "chatbot_turns_in_flight", "Threads with a turn running", callback=lambda: {(): turn_registry.in_flight()}
+)
@@ -1,11 +1,20 @@
 """Utility functions for the API Support Chatbot."""
 
 import asyncio
+import logging
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from src.api_support_chatbot.logger import (
+    get_log_settings,
+    get_logger,
+    should_sample,
+    truncate_value,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
 
 
 def get_today_str() -> str:
@@ -18,15 +27,23 @@ def generate_request_id() -> str:
     return str(uuid.uuid4())[:8]
 
 
-def extract_human_messages(messages: List[BaseMessage]) -> List[str]:
+def generate_conversation_id() -> str:
+    """Generate a unique conversation (thread) ID."""
+    return str(uuid.uuid4())
+
+
+def extract_human_messages(messages: List["BaseMessage"]) -> List[str]:
     """Extract text content from human messages."""
+    # Imported here so that importing utils stays cheap
+    from langchain_core.messages import HumanMessage
+
     return [
         msg.content for msg in messages 
         if isinstance(msg, HumanMessage) and isinstance(msg.content, str)
     ]
 
 
-def extract_last_human_message(messages: List[BaseMessage]) -> Optional[str]:
+def extract_last_human_message(messages: List["BaseMessage"]) -> Optional[str]:
     """Extract the last human message content."""
     human_messages = extract_human_messages(messages)
     return human_messages[-1] if human_messages else None
@@ -39,6 +56,15 @@ def truncate_text(text: str, max_length: int = 500) -> str:
     return text[:max_length - 3] + "..."
 
 
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
 def validate_mcp_connection_config(config: Dict[str, Any]) -> bool:
     """Validate MCP connection configuration."""
     required_fields = ["transport"]
@@ -87,22 +113,28 @@ def create_error_message(error: Exception, context: str = "") -> str:
         return f"{error_type}: {error_msg}"
 
 
-def log_agent_action(agent_name: str, action: str, details: Dict[str, Any] = None) -> None:
-    """Log agent actions for debugging and monitoring."""
-
-    # TODO add logs using logging module
-
-    timestamp = datetime.now().isoformat()
-    log_entry = {
-        "timestamp": timestamp,
-        "agent": agent_name,
-        "action": action
-    }
-    
-    if details:
-        log_entry.update(details)
-    # In a production environment, this would log to a proper logging system
-    print(f"[{timestamp}] {agent_name}: {action}", flush=True)
+def log_agent_action(
+    agent_name: str,
+    action: str,
+    details: Dict[str, Any] = None,
+    level: int = logging.INFO,
+    sampled: bool = False,
+) -> None:
+    """
+    Log agent actions for debugging and monitoring.
+
+    The record is only enqueued here; a background thread formats and writes it
+    (see ``logger.configure_logging``). Detail values are truncated to
+    ``LOG_MAX_FIELD_LENGTH`` and ``sampled`` events are kept with probability
+    ``LOG_SAMPLE_RATE``.
+    """
+    logger = get_logger()
+    if not logger.isEnabledFor(level):
+        return
+    if sampled and not should_sample():
+        return
+
+    extra = {"agent": agent_name, "action": action}
     if details:
-        for key, value in details.items():
-            print(f"  {key}: {value}", flush=True)
+        extra["details"] = truncate_value(details, get_log_settings().max_field_length)
+    logger.log(level, "%s: %s", agent_name, action, extra=extra)
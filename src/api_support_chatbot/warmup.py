@@ -0,0 +1,178 @@
+"""Worker warm-up: open connections and build runnables before serving traffic."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.api_support_chatbot.clients import (
+    get_chat_model,
+    get_mcp_tools,
+    get_model_with_tools,
+    get_structured_model,
+)
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.prompts import (
+    format_assembler_prompt,
+    format_coordinator_prompt,
+    format_request_details_prompt,
+    format_response_agent_prompt,
+)
+from src.api_support_chatbot.state import (
+    AssembledResponse,
+    ExtractedRequests,
+    RequestDetails,
+)
+from src.api_support_chatbot.telemetry import REGISTRY, model_call_span
+from src.api_support_chatbot.utils import create_error_message, log_agent_action
+
+# Schemas the graph nodes request as structured output
+STRUCTURED_SCHEMAS = (RequestDetails, ExtractedRequests, AssembledResponse)
+
+
+class WarmupStep:
+    """Outcome of a single warm-up step."""
+
+    __slots__ = ("name", "duration_ms", "ok", "error")
+
+    def __init__(self, name: str, duration_ms: float, ok: bool, error: Optional[str] = None) -> None:
+        self.name = name
+        self.duration_ms = duration_ms
+        self.ok = ok
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "duration_ms": self.duration_ms, "ok": self.ok, "error": self.error}
+
+
+class WarmupState:
+    """
+    Readiness of this worker.
+
+    The worker is ready once warm-up has finished (or was disabled). Failed
+    steps do not block readiness, since the graph can still serve requests
+    and reports such failures per request; they are listed in the report.
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: List[WarmupStep] = []
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def report(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration = round((self.finished_at - self.started_at) * 1000, 1)
+        return {
+            "ready": self.ready,
+            "duration_ms": duration,
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+
+# Process-wide readiness
+warmup_state = WarmupState()
+
+REGISTRY.gauge(
+    "chatbot_ready", "1 once the worker finished warming up", callback=lambda: {(): int(warmup_state.ready)}
+)
+REGISTRY.gauge(
+    "chatbot_warmup_step_seconds",
+    "Duration of the last warm-up steps",
+    ["step"],
+    callback=lambda: {(step.name,): step.duration_ms / 1000 for step in warmup_state.steps},
+)
+
+
+async def _open_connections(configuration: Configuration) -> None:
+    """Open the model client's connection pool (DNS, TCP and TLS) with a cheap request."""
+    from openai import APIStatusError
+
+    model = get_chat_model(configuration, configuration.azure_openai_deployment_name)
+    client = model.root_async_client.with_options(max_retries=0, timeout=configuration.warmup_timeout)
+    try:
+        await client.models.list()
+    except APIStatusError:
+        # Any HTTP response means the connection is established
+        pass
+
+
+async def _load_mcp_tools(configuration: Configuration) -> None:
+    """Connect to the MCP servers, list the tools and bind them to the model."""
+    tools = await get_mcp_tools(configuration)
+    get_model_with_tools(get_chat_model(configuration, configuration.azure_openai_deployment_name), tools)
+
+
+async def _build_runnables(configuration: Configuration) -> None:
+    """Build the structured-output runnables and format the system prompts."""
+    model = get_chat_model(configuration, configuration.azure_openai_deployment_name)
+    for schema in STRUCTURED_SCHEMAS:
+        get_structured_model(model, schema)
+    format_request_details_prompt()
+    format_coordinator_prompt()
+    format_response_agent_prompt()
+    format_assembler_prompt()
+
+
+async def _probe_completion(configuration: Configuration) -> None:
+    """Issue a one-token completion so the first request hits a warm deployment."""
+    deployment = configuration.azure_openai_deployment_name
+    model = get_chat_model(configuration, deployment)
+    with model_call_span("warmup", deployment):
+        await model.bind(max_tokens=1).ainvoke("ping")
+
+
+async def _run_step(name: str, fn: Callable[[], Awaitable[None]], timeout: float) -> WarmupStep:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(fn(), timeout=timeout)
+    except Exception as e:
+        step = WarmupStep(name, round((time.perf_counter() - started) * 1000, 1), False, create_error_message(e, name))
+    else:
+        step = WarmupStep(name, round((time.perf_counter() - started) * 1000, 1), True)
+    log_agent_action("Warmup", f"Step {name} {'completed' if step.ok else 'failed'}", step.to_dict())
+    return step
+
+
+async def warm_up(configuration: Optional[Configuration] = None, state: Optional[WarmupState] = None) -> Dict[str, Any]:
+    """
+    Warm up this worker and mark it ready.
+
+    Steps, each timed and bounded by ``warmup_timeout``:
+
+    - ``runnables``: build pooled models, structured-output runnables and prompts
+    - ``connections``: open the Azure OpenAI connection pool
+    - ``mcp_tools``: MCP handshake, tool listing and tool binding
+    - ``probe``: one-token completion (only with ``warmup_probe``)
+
+    Args:
+        configuration: Configuration to warm up for (default: from environment)
+        state: Readiness to update (default: the process-wide ``warmup_state``)
+
+    Returns:
+        The warm-up report
+    """
+    configuration = configuration or Configuration.from_runnable_config()
+    state = state or warmup_state
+    state.reset()
+    state.started_at = time.perf_counter()
+
+    if configuration.enable_warmup:
+        steps = [
+            ("runnables", _build_runnables),
+            ("connections", _open_connections),
+            ("mcp_tools", _load_mcp_tools),
+        ]
+        if configuration.warmup_probe:
+            steps.append(("probe", _probe_completion))
+        for name, fn in steps:
+            state.steps.append(await _run_step(name, lambda fn=fn: fn(configuration), configuration.warmup_timeout))
+
+    state.finished_at = time.perf_counter()
+    state.ready = True
+    report = state.report()
+    log_agent_action("Warmup", "Worker warmed up", {"duration_ms": report["duration_ms"]})
+    return report
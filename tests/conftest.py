@@ -1,9 +1,17 @@
 """Test configuration and fixtures."""
 
+import asyncio
+import json
+from collections import Counter
+
 import pytest
 from unittest.mock import Mock
+from langchain_core.messages import AIMessage
 from api_support_chatbot.configuration import Configuration, MCPServerConfig, MCPTransport
 
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.state import AssembledResponse, ExtractedRequests, RequestDetails, RequestItem
+
 
 @pytest.fixture
 def mock_configuration():
@@ -44,4 +52,142 @@ def sample_messages():
         HumanMessage(content="How do I authenticate with your API?"),
         AIMessage(content="I'll help you with API authentication. Let me gather some information."),
         HumanMessage(content="I'm specifically interested in OAuth2 implementation.")
-    ]
\ No newline at end of file
+    ]
+
+
+def request_text(messages):
+    """Request text of a response agent prompt ("" for other prompts)."""
+    for message in messages:
+        content = message["content"] if isinstance(message, dict) else message.content
+        if "Request Text: " in content:
+            return content.split("Request Text: ")[1].splitlines()[0].strip()
+    return ""
+
+
+def _tool_result(messages):
+    last = messages[-1]
+    return last["content"] if isinstance(last, dict) and last.get("role") == "tool" else None
+
+
+class FakeStructured:
+    def __init__(self, model, schema):
+        self.model = model
+        self.schema = schema
+
+    def with_config(self, *args, **kwargs):
+        return self
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        if self.schema is RequestDetails:
+            return RequestDetails(valid_request_received=True, produtct_id="X-Series")
+        if self.schema is ExtractedRequests:
+            return ExtractedRequests(item_list=[
+                RequestItem(id="", request_text=text, category="How-To", product_id="X-Series")
+                for text in self.model.items
+            ])
+        self.model.assembled.append(messages)
+        assembled = self.model.assembled_text
+        return AssembledResponse(
+            response_text=assembled(messages) if callable(assembled) else assembled,
+            follow_up_question=self.model.follow_up_question,
+        )
+
+
+class FakeToolsBound:
+    def __init__(self, model):
+        self.model = model
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        model = self.model
+        if model.tool_calls == "once" and _tool_result(messages) is not None:
+            return await model.ainvoke(messages)
+        model.tool_rounds += 1
+        args = model.tool_args(request_text(messages)) if callable(model.tool_args) else dict(model.tool_args)
+        return AIMessage(content="", tool_calls=[{"name": "search", "args": args, "id": f"call-{model.tool_rounds}"}])
+
+
+class FakeChatModel:
+    """
+    Stand-in for the chat model of every graph node.
+
+    Structured output finds a valid X-Series request, extracts ``items``
+    (request texts) as How-To items and assembles ``assembled_text`` (text
+    or a function of the assembler messages). Response agents answer with
+    ``answer`` (text or a function of the request text and the last tool
+    result) after ``delay`` seconds (number or a function of the request
+    text); calls for which ``fail(request_text, calls)`` is true raise.
+    With ``tool_calls`` set, agents with tools first ask for the ``search``
+    tool with ``tool_args``: "once" until it answered, "always" every round.
+
+    Records the agent calls by request text (``calls``), the last message of
+    their prompts (``prompts``), tool requests (``tool_rounds``) and the
+    assembler inputs (``assembled``).
+    """
+
+    def __init__(
+        self,
+        items=("question",),
+        answer="ok",
+        delay=0.0,
+        fail=None,
+        tool_calls=None,
+        tool_args=None,
+        assembled_text="final answer",
+        follow_up_question=None,
+    ):
+        self.items = list(items)
+        self.answer = answer
+        self.delay = delay
+        self.fail = fail
+        self.tool_calls = tool_calls
+        self.tool_args = tool_args or {}
+        self.assembled_text = assembled_text
+        self.follow_up_question = follow_up_question
+        self.calls = Counter()
+        self.prompts = []
+        self.tool_rounds = 0
+        self.assembled = []
+
+    @property
+    def agent_calls(self):
+        return sum(self.calls.values())
+
+    def with_structured_output(self, schema, **kwargs):
+        return FakeStructured(self, schema)
+
+    def bind_tools(self, tools):
+        return FakeToolsBound(self) if self.tool_calls else self
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        text = request_text(messages)
+        self.calls[text] += 1
+        self.prompts.append(messages[-1])
+        delay = self.delay(text) if callable(self.delay) else self.delay
+        if delay:
+            await asyncio.sleep(delay)
+        if self.fail is not None and self.fail(text, self.calls[text]):
+            raise RuntimeError("model unavailable")
+        answer = self.answer(text, _tool_result(messages)) if callable(self.answer) else self.answer
+        return AIMessage(content=json.dumps({"response_text": answer, "response_found": True, "confidence": 0.9}))
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """
+    Install a ``FakeChatModel`` for the graph nodes.
+
+    Call it with the model options and the MCP ``tools`` to serve; returns
+    the model.
+    """
+
+    def install(tools=(), **options):
+        model = FakeChatModel(**options)
+
+        async def get_tools(configuration):
+            return list(tools)
+
+        monkeypatch.setattr(chatbot, "_get_azure_chat_model", lambda *args, **kwargs: model)
+        monkeypatch.setattr(chatbot, "get_mcp_tools", get_tools)
+        return model
+
+    return install
@@ -0,0 +1,64 @@
+"""Tests for token and cost accounting."""
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from src.api_support_chatbot.accounting import (
+    TOKENS,
+    UsageCallbackHandler,
+    UsageLedger,
+    compute_cost,
+    extract_usage,
+)
+from src.api_support_chatbot.telemetry import span
+
+
+def llm_result(input_tokens, output_tokens, cached=0):
+    message = AIMessage(content="ok", usage_metadata={
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "input_token_details": {"cache_read": cached},
+    })
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+
+class TestAccounting:
+    """Tests for usage extraction, pricing and the ledger."""
+
+    def test_extract_usage(self):
+        """Test prompt, completion and cached token extraction."""
+        assert extract_usage(llm_result(100, 20, cached=40)) == {"prompt": 100, "completion": 20, "cached": 40}
+
+    def test_compute_cost(self):
+        """Test cached tokens are billed at the cached price."""
+        prices = {"prompt": 1.0, "completion": 2.0, "cached": 0.5}
+        usage = {"prompt": 1000, "completion": 500, "cached": 400}
+        assert compute_cost(usage, prices) == (600 * 1.0 + 400 * 0.5 + 500 * 2.0) / 1000
+        assert compute_cost(usage, None) == 0.0
+
+    def test_ledger_bounds_threads(self):
+        """Test least recently updated threads are evicted."""
+        ledger = UsageLedger(max_threads=2)
+        for thread in ("a", "b", "a", "c"):
+            ledger.record({"prompt": 10, "completion": 1, "cached": 0}, 0.1, thread_id=thread)
+
+        assert ledger.thread_totals("b")["calls"] == 0
+        assert ledger.thread_totals("a")["calls"] == 2
+        assert [t for t, _ in ledger.top_threads(2)] == ["a", "c"]
+
+    def test_handler_attributes_to_current_span(self):
+        """Test usage is attributed to the node, thread and item of the open span."""
+        ledger = UsageLedger()
+        handler = UsageCallbackHandler("test-deployment", {"prompt": 1.0, "completion": 1.0}, ledger=ledger)
+        before = TOKENS.value(node="generate_response", deployment="test-deployment", type="prompt")
+
+        with span("node.generate_response", thread_id="t1", request_item_id="item-1"):
+            with span("model_call", node="generate_response", deployment="test-deployment"):
+                handler.on_llm_end(llm_result(200, 50))
+
+        assert ledger.thread_totals("t1") == {"prompt": 200, "completion": 50, "cached": 0, "calls": 1, "cost": 0.25}
+        assert ledger.item_totals("item-1")["prompt"] == 200
+        assert ledger.by_node()["generate_response"]["completion"] == 50
+        assert ledger.by_deployment()["test-deployment"]["calls"] == 1
+        assert TOKENS.value(node="generate_response", deployment="test-deployment", type="prompt") == before + 200
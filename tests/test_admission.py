@@ -0,0 +1,165 @@
+"""Tests for admission control and the degradation ladder."""
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.admission import (
+    DEGRADED_ACTIONS,
+    MODE_TRANSITIONS,
+    AdmissionController,
+    Overloaded,
+)
+from src.api_support_chatbot.configuration import Configuration, DegradationMode
+from src.api_support_chatbot.singleflight import recent_responses
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def settings(**overrides):
+    values = dict(
+        enable_admission_control=True,
+        admission_max_in_flight=10,
+        admission_latency_target=10.0,
+        admission_retry_after=7,
+    )
+    values.update(overrides)
+    return Configuration(**values)
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    def test_climbs_ladder_with_queue_depth(self):
+        """Test that the mode follows the turns in flight up to rejection."""
+        controller = AdmissionController(FakeClock())
+        configuration = settings()
+        modes = [controller.admit(configuration).mode for _ in range(10)]
+
+        assert modes[0] == DegradationMode.NORMAL
+        assert modes[5] == DegradationMode.SKIP_ASSEMBLER
+        assert modes[9] == DegradationMode.CACHE_ONLY
+        with pytest.raises(Overloaded) as rejected:
+            controller.admit(configuration)
+        assert rejected.value.retry_after == 7
+        assert controller.in_flight == 10
+
+    def test_hysteresis_when_pressure_drops(self):
+        """Test that a mode is left only well below its threshold."""
+        controller = AdmissionController(FakeClock())
+        configuration = settings(admission_max_in_flight=20)
+        admissions = [controller.admit(configuration) for _ in range(14)]
+        assert controller.update(configuration) == DegradationMode.MINI_ONLY
+
+        controller.release(admissions.pop())
+        assert controller.update(configuration) == DegradationMode.MINI_ONLY
+        for _ in range(2):
+            controller.release(admissions.pop())
+        assert controller.update(configuration) == DegradationMode.CAP_FAN_OUT
+
+    def test_latency_degrades_and_decays(self):
+        """Test that slow turns raise the mode and that the signal decays without traffic."""
+        clock = FakeClock()
+        controller = AdmissionController(clock)
+        configuration = settings()
+        transitions = MODE_TRANSITIONS.value(from_mode="normal", to_mode="reject")
+
+        admission = controller.admit(configuration)
+        clock.now = 12.0
+        controller.release(admission)
+        with pytest.raises(Overloaded):
+            controller.admit(configuration)
+        assert MODE_TRANSITIONS.value(from_mode="normal", to_mode="reject") == transitions + 1
+
+        clock.now = 12.0 + 120
+        assert controller.admit(configuration).mode == DegradationMode.NORMAL
+
+    def test_release_is_idempotent(self):
+        """Test that releasing a turn twice counts once."""
+        controller = AdmissionController(FakeClock())
+        admission = controller.admit(settings())
+        controller.release(admission)
+        controller.release(admission)
+        assert controller.in_flight == 0
+
+    def test_forced_and_disabled(self):
+        """Test that a configured mode is forced and that disabled control stays normal."""
+        controller = AdmissionController(FakeClock())
+        forced = settings(degradation_mode=DegradationMode.CACHE_ONLY)
+        assert controller.admit(forced).mode == DegradationMode.CACHE_ONLY
+
+        disabled = settings(enable_admission_control=False, admission_max_in_flight=1)
+        assert [controller.admit(disabled).mode for _ in range(3)] == [DegradationMode.NORMAL] * 3
+
+
+def questions(count):
+    return [f"question {i}" for i in range(count)]
+
+
+@pytest.fixture
+def model(fake_model):
+    recent_responses.clear()
+    return fake_model(items=questions(1), answer=lambda text, _: f"answer to {text}", assembled_text="assembled")
+
+
+async def run_turn(mode, thread_id, **configurable):
+    graph = chatbot.create_chatbot_graph()
+    config = {"configurable": {
+        "thread_id": thread_id,
+        "enable_request_coalescing": False,
+        "degradation_mode": mode.value,
+        **configurable,
+    }}
+    result = await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config=config)
+    return result["messages"][-1].content
+
+
+class TestDegradationModes:
+    """Tests for the graph under each degradation mode."""
+
+    @pytest.mark.asyncio
+    async def test_skip_assembler_for_single_item(self, model):
+        """Test that a single-item turn returns the item's answer without the assembler."""
+        answer = await run_turn(DegradationMode.SKIP_ASSEMBLER, "skip")
+        assert answer == "answer to question 0"
+        assert len(model.assembled) == 0
+
+    @pytest.mark.asyncio
+    async def test_cap_fan_out(self, model):
+        """Test that items beyond the cap are not researched."""
+        model.items = questions(4)
+        capped = DEGRADED_ACTIONS.value(action="fan_out_capped")
+        await run_turn(DegradationMode.CAP_FAN_OUT, "cap", degraded_max_fan_out=2)
+        assert model.agent_calls == 2
+        assert len(model.assembled) == 1
+        assert DEGRADED_ACTIONS.value(action="fan_out_capped") == capped + 1
+
+    @pytest.mark.asyncio
+    async def test_cache_only(self, model):
+        """Test that cache-only turns answer from recent answers without model calls."""
+        model.items = questions(2)
+        await run_turn(DegradationMode.NORMAL, "warm")
+        agent_calls = model.agent_calls
+
+        model.items = questions(3)
+        answer = await run_turn(DegradationMode.CACHE_ONLY, "cached")
+        assert model.agent_calls == agent_calls
+        assert "answer to question 0" in answer
+        assert "answer to question 1" in answer
+        assert "high demand" in answer
+
+    @pytest.mark.asyncio
+    async def test_cache_only_is_scoped_to_settings(self, model):
+        """Test that cache-only turns do not serve answers computed under other settings."""
+        await run_turn(DegradationMode.NORMAL, "warm-a", azure_openai_deployment_name="tenant-a")
+        hits = DEGRADED_ACTIONS.value(action="cache_hit")
+
+        answer = await run_turn(DegradationMode.CACHE_ONLY, "cached-b", azure_openai_deployment_name="tenant-b")
+        assert "answer to question 0" not in answer
+        assert DEGRADED_ACTIONS.value(action="cache_hit") == hits
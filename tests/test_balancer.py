@@ -0,0 +1,160 @@
+"""Tests for MCP replica balancing and circuit breakers."""
+
+import asyncio
+import os
+import random
+from unittest.mock import patch
+
+import pytest
+
+from src.api_support_chatbot.balancer import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    NoReplicaAvailable,
+    ReplicaSet,
+)
+from src.api_support_chatbot.clients import ReplicaTools
+from src.api_support_chatbot.configuration import Configuration, MCPServerConfig
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_threshold_and_probes(self):
+        """Test closed -> open -> half-open (single probe) -> closed."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5, clock=clock)
+
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN and not breaker.allow()
+
+        clock.now = 5
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed half-open probe opens the breaker again."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+        clock.now = 5
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+
+class TestReplicaSet:
+    """Tests for ReplicaSet."""
+
+    def test_prefers_lower_latency(self):
+        """Test that power of two choices picks the faster of two replicas."""
+        replicas = ReplicaSet("s", ["fast", "slow"], rng=random.Random(0))
+        fast, slow = replicas.replicas
+        fast.observe(0.05)
+        slow.observe(0.5)
+
+        assert all(replicas.choose() is fast for _ in range(10))
+
+    def test_skips_open_breakers(self):
+        """Test that replicas with open breakers are not chosen, and all-open fails fast."""
+        replicas = ReplicaSet("s", ["a", "b"], failure_threshold=1)
+        a, b = replicas.replicas
+        replicas.end(a, replicas.begin(a), ok=False)
+
+        assert replicas.choose() is b
+        replicas.end(b, replicas.begin(b), ok=False)
+        with pytest.raises(NoReplicaAvailable):
+            replicas.choose()
+
+
+class TestReplicaTools:
+    """Tests for replica failover of tool calls."""
+
+    @pytest.mark.asyncio
+    async def test_fails_over_to_another_replica(self):
+        """Test that a transport failure is retried once on another replica."""
+        server = MCPServerConfig(replicas=["down", "up"])
+        replica_set = ReplicaSet("s", server.endpoints(), failure_threshold=1, rng=random.Random(1))
+        replica_tools = ReplicaTools("s", server, replica_set)
+        calls = []
+
+        async def fake_tools(replica):
+            calls.append(replica.url)
+            if replica.url == "down":
+                raise ConnectionError("refused")
+            return {"readme": "tool"}
+
+        replica_tools._replica_tools = fake_tools
+
+        async def use(tools):
+            return tools["readme"]
+
+        for _ in range(3):
+            assert await replica_tools.call(use) == "tool"
+        assert calls.count("down") == 1
+        assert calls.count("up") == 3
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_replica(self):
+        """Test that cancelling a half-open probe call frees the probe and the in-flight slot."""
+        clock = FakeClock()
+        server = MCPServerConfig(replicas=["only"])
+        replica_set = ReplicaSet("s", server.endpoints(), failure_threshold=1, reset_timeout=5, clock=clock)
+        replica = replica_set.replicas[0]
+        replica_set.end(replica, replica_set.begin(replica), ok=False)
+        clock.now = 5
+        replica_tools = ReplicaTools("s", server, replica_set)
+
+        async def fake_tools(replica):
+            return {"readme": "tool"}
+
+        replica_tools._replica_tools = fake_tools
+        started = asyncio.Event()
+
+        async def hang(tools):
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(replica_tools.call(hang))
+        await started.wait()
+        assert replica.breaker.state == HALF_OPEN and not replica.breaker.available()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert replica.in_flight == 0
+        assert replica.breaker.available()
+
+        async def use(tools):
+            return tools["readme"]
+
+        assert await replica_tools.call(use) == "tool"
+        assert replica.breaker.state == CLOSED
+
+
+class TestReplicaConfiguration:
+    """Tests for replica configuration."""
+
+    def test_comma_separated_urls_become_replicas(self):
+        """Test that MCP_API_SUPPORT_SERVER_URL accepts several replicas."""
+        with patch.dict(os.environ, {"MCP_API_SUPPORT_SERVER_URL": "http://a/mcp, http://b/mcp"}):
+            server = Configuration().mcp_servers["api_support"]
+
+        assert server.url == "http://a/mcp"
+        assert server.endpoints() == ["http://a/mcp", "http://b/mcp"]
+        assert server.to_connection_dict("http://b/mcp")["url"] == "http://b/mcp"
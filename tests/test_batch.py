@@ -0,0 +1,107 @@
+"""Tests for the JSONL batch runner."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.api_support_chatbot.batch import load_completed_ids, record_messages, run_batch
+from src.api_support_chatbot.prompts import GENERIC_ERROR_MSG
+
+
+class FakeCheckpointer:
+    def __init__(self):
+        self.deleted = []
+
+    async def adelete_thread(self, thread_id):
+        self.deleted.append(thread_id)
+
+
+class FakeGraph:
+    """Echoing stand-in for the compiled chatbot graph."""
+
+    def __init__(self):
+        self.checkpointer = FakeCheckpointer()
+        self.calls = []
+
+    async def ainvoke(self, state, config):
+        text = state["messages"][0].content
+        self.calls.append((config["configurable"]["thread_id"], text))
+        if text == "fail":
+            raise RuntimeError("boom")
+        if text == "broken":
+            return {"messages": [AIMessage(content=GENERIC_ERROR_MSG)]}
+        return {"messages": [AIMessage(content=f"re: {text}")]}
+
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows))
+
+
+class TestBatchRunner:
+    """Tests for run_batch."""
+
+    def test_record_messages(self):
+        """Test single and multi-message records."""
+        assert record_messages({"message": "hi"}) == ["hi"]
+        assert record_messages({"messages": ["a", "b"]}) == ["a", "b"]
+        with pytest.raises(ValueError):
+            record_messages({"id": 1})
+
+    @pytest.mark.asyncio
+    async def test_run_batch_writes_results(self, tmp_path):
+        """Test that every record is answered on its own thread."""
+        source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_jsonl(source, [
+            {"id": "a", "message": "one"},
+            {"id": "b", "messages": ["two", "three"]},
+            {"id": "c", "message": "fail"},
+        ])
+        graph = FakeGraph()
+
+        stats = await run_batch(str(source), str(output), concurrency=2, graph=graph)
+
+        results = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+        assert results["a"]["responses"] == ["re: one"]
+        assert results["b"]["responses"] == ["re: two", "re: three"]
+        assert results["c"]["error"]
+        assert stats["completed"] == 2 and stats["failed"] == 1
+        assert sorted(graph.checkpointer.deleted) == ["batch-a", "batch-b", "batch-c"]
+
+    @pytest.mark.asyncio
+    async def test_run_batch_resumes(self, tmp_path):
+        """Test that completed records are skipped and failed ones retried."""
+        source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_jsonl(source, [{"id": "a", "message": "one"}, {"id": "b", "message": "two"}])
+        write_jsonl(output, [
+            {"id": "a", "responses": ["done"], "error": None},
+            {"id": "b", "responses": [], "error": "timeout"},
+        ])
+        graph = FakeGraph()
+
+        assert await load_completed_ids(str(output)) == {"a"}
+        stats = await run_batch(str(source), str(output), concurrency=2, graph=graph)
+
+        assert stats["skipped"] == 1
+        assert [thread for thread, _ in graph.calls] == ["batch-b"]
+
+    @pytest.mark.asyncio
+    async def test_graph_errors_and_malformed_lines_are_failures(self, tmp_path):
+        """Test that generic error answers and malformed lines are written as errors and retried."""
+        source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        source.write_text(
+            json.dumps({"id": "a", "messages": ["broken", "never sent"]}) + "\n"
+            + "{not json\n"
+            + json.dumps({"id": "c", "message": "one"}) + "\n"
+        )
+        graph = FakeGraph()
+
+        stats = await run_batch(str(source), str(output), concurrency=2, graph=graph)
+
+        results = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+        assert results["a"]["error"] and results["a"]["responses"] == [GENERIC_ERROR_MSG]
+        assert "line 2" in results["2"]["error"]
+        assert results["c"]["error"] is None
+        assert stats["completed"] == 1 and stats["failed"] == 2
+        assert await load_completed_ids(str(output)) == {"c"}
+        assert ("batch-a", "never sent") not in graph.calls
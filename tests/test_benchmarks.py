@@ -0,0 +1,234 @@
+"""Tests for the benchmark stand-ins and reporting."""
+
+import json
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+import src.api_support_chatbot.chatbot as chatbot
+from benchmarks.cassette import Cassette, CassetteMiss, recording, replaying
+from benchmarks.eval_bench import (
+    choose,
+    evaluate_variant,
+    load_variants,
+    regressions,
+    score,
+)
+from benchmarks.graph_bench import compare
+from benchmarks.mock_llm import MockSettings, build_completion, completion_delay
+from benchmarks.replay_bench import regression, run_conversations
+from benchmarks.state_bench import time_reducers
+
+
+def structured_request(schema_name):
+    return {
+        "messages": [{"role": "user", "content": "hi"}],
+        "response_format": {"type": "json_schema", "json_schema": {"name": schema_name, "schema": {}}},
+    }
+
+
+class TestMockLLM:
+    """Tests for the scripted mock chat completions."""
+
+    def test_structured_output_uses_fan_out(self):
+        """Test ExtractedRequests returns fan_out items."""
+        completion, kind = build_completion(structured_request("ExtractedRequests"), MockSettings(fan_out=3))
+        content = json.loads(completion["choices"][0]["message"]["content"])
+        assert kind == "ExtractedRequests"
+        assert len(content["item_list"]) == 3
+
+    def test_tool_call_rounds_then_final(self):
+        """Test scripted tool-call rounds precede the final answer."""
+        settings = MockSettings()
+        body = {"messages": [{"role": "user", "content": "auth?"}], "tools": [{"type": "function"}]}
+
+        first, kind = build_completion(body, settings)
+        assert kind == "tool_calls"
+        call = first["choices"][0]["message"]["tool_calls"][0]
+        assert call["function"]["name"] == "retrieve_support_context"
+        assert json.loads(call["function"]["arguments"]) == {"query": "auth?"}
+
+        body["messages"] += [first["choices"][0]["message"], {"role": "tool", "content": "ctx"}]
+        second, kind = build_completion(body, settings)
+        assert kind == "final"
+        assert json.loads(second["choices"][0]["message"]["content"])["response_found"] is True
+
+    def test_completion_cut_off_at_max_tokens(self):
+        """Test a completion longer than max_completion_tokens is truncated with finish_reason length."""
+        body = dict(structured_request("ExtractedRequests"), max_completion_tokens=10)
+        completion, _ = build_completion(body, MockSettings(fan_out=3))
+
+        assert completion["choices"][0]["finish_reason"] == "length"
+        assert completion["usage"]["completion_tokens"] == 10
+        assert len(completion["choices"][0]["message"]["content"]) == 40
+
+    def test_completion_delay_includes_token_rate(self):
+        """Test latency grows with completion tokens at a finite token rate."""
+        completion = {"usage": {"completion_tokens": 50}}
+        assert completion_delay(completion, MockSettings(latency=0.1, token_rate=100)) == 0.6
+
+
+class TestCompare:
+    """Tests for baseline comparison."""
+
+    def test_compare_reports_deltas(self):
+        """Test p95 and throughput deltas are reported per scenario."""
+        baseline = {"scenarios": [{"concurrency": 8, "fan_out": 2, "p95_ms": 100.0, "rps": 10.0}]}
+        current = {"scenarios": [{"concurrency": 8, "fan_out": 2, "p95_ms": 120.0, "rps": 9.0}]}
+
+        lines = compare(current, baseline)
+
+        assert len(lines) == 1
+        assert "+20.0%" in lines[0]
+        assert "-10.0%" in lines[0]
+
+
+class TestStateBench:
+    """Tests for the state benchmark."""
+
+    def test_time_reducers_reports_both_channels(self):
+        """Test both reducer implementations are timed for the given width."""
+        row = time_reducers(20, repeat=1)
+
+        assert row["items"] == 20
+        assert row["legacy_ms"] >= 0
+        assert row["keyed_ms"] >= 0
+
+
+@pytest.fixture
+def recorded_clients(fake_model):
+    """A model that calls the search tool once, then answers with what it returned."""
+
+    async def search(query: str) -> str:
+        """Search the support docs."""
+        return f"docs for {query}"
+
+    return fake_model(
+        tools=[StructuredTool.from_function(coroutine=search, name="search")],
+        items=["question 0", "question 1"],
+        answer=lambda text, result: f"found {result or text}",
+        tool_calls="once",
+        tool_args=lambda text: {"query": text.split()[0]},
+        assembled_text=lambda messages: f"assembled from {len(messages)} messages",
+        follow_up_question="more?",
+    )
+
+
+class TestCassette:
+    """Tests for recording and replaying model and tool calls."""
+
+    def test_take_falls_back_to_channel_order(self):
+        """Test an unrecorded request gets the next unused interaction of its channel."""
+        cassette = Cassette()
+        cassette.record("tool:search", {"query": "a"}, {"value": "A"})
+        cassette.record("tool:search", {"query": "b"}, {"value": "B"})
+        cassette.rewind()
+
+        assert cassette.take("tool:search", {"query": "b"})["response"] == {"value": "B"}
+        assert cassette.take("tool:search", {"query": "c"})["response"] == {"value": "A"}
+        assert cassette.stats["fallbacks"] == 1
+        with pytest.raises(CassetteMiss):
+            cassette.take("tool:search", {"query": "a"})
+
+    @pytest.mark.asyncio
+    async def test_replay_reproduces_recording(self, recorded_clients, tmp_path):
+        """Test replaying a recorded conversation gives the same answers without the clients."""
+        conversations = tmp_path / "conversations.jsonl"
+        conversations.write_text(json.dumps({"id": "c1", "messages": ["rotate my key", "and the staging key?"]}) + "\n")
+        path = str(tmp_path / "cassette.jsonl")
+
+        cassette = Cassette()
+        with recording(chatbot, cassette):
+            recorded = await run_conversations(str(conversations))
+        cassette.metadata["answers"] = recorded["answers"]
+        cassette.save(path)
+        calls = (recorded_clients.agent_calls, recorded_clients.tool_rounds)
+        channels = {i["channel"] for i in cassette.interactions}
+
+        replayed_cassette = Cassette.load(path)
+        with replaying(chatbot, replayed_cassette, latency_scale=0):
+            replayed = await run_conversations(str(conversations), replayed_cassette)
+
+        assert {"tool:search", "model_with_tools", "structured:ExtractedRequests", "structured:AssembledResponse"} <= channels
+        assert recorded["errors"] == replayed["errors"] == 0
+        assert replayed["answers"] == recorded["answers"]
+        assert replayed["answers"]["c1"][0].startswith("assembled from 2 messages")
+        assert [i["response"] for i in cassette.interactions if i["channel"] == "tool:search"][0] == {"value": "docs for question"}
+        assert replayed_cassette.stats["served"] == len(cassette.interactions)
+        assert len(replayed["overheads"]) == 2
+        assert (recorded_clients.agent_calls, recorded_clients.tool_rounds) == calls
+
+    def test_regression_compares_same_scale_only(self):
+        """Test the p95 overhead delta is only computed against a run with the same latency scale."""
+        current = {"latency_scale": 0.0, "overhead_p95_ms": 12.0}
+
+        assert regression(current, {"latency_scale": 0.0, "overhead_p95_ms": 10.0}) == pytest.approx(20.0)
+        assert regression(current, {"latency_scale": 1.0, "overhead_p95_ms": 10.0}) is None
+
+
+def eval_result(name, p95_ms, errors=0, **accuracy):
+    return {
+        "name": name,
+        "p50_ms": p95_ms / 2,
+        "p95_ms": p95_ms,
+        "errors": errors,
+        "accuracy": dict({"valid_request_received": 1.0, "product_id": 1.0, "items": 1.0}, **accuracy),
+    }
+
+
+class TestEvalBench:
+    """Tests for the configuration sweep evaluation."""
+
+    def test_score_checks_product_and_items_of_valid_requests_only(self):
+        """Test product id and item count are only scored for requests labelled valid."""
+        prediction = {"valid_request_received": True, "product_id": "x-series", "items": 1}
+
+        assert score({"valid_request_received": True, "product_id": "X-Series", "items": 2}, prediction) == {
+            "valid_request_received": True, "product_id": True, "items": False,
+        }
+        assert score({"valid_request_received": False}, prediction) == {
+            "valid_request_received": False, "product_id": None, "items": None,
+        }
+
+    def test_choose_fastest_without_regression(self):
+        """Test the fastest variant is chosen among those matching the baseline quality."""
+        results = [
+            eval_result("baseline", 100.0),
+            eval_result("fast-but-wrong", 50.0, items=0.8),
+            eval_result("fast-with-errors", 60.0, errors=1),
+            eval_result("faster", 80.0, product_id=0.95),
+        ]
+
+        assert regressions(results[1], results[0], tolerance=0.0) == ["items"]
+        assert regressions(results[2], results[0], tolerance=0.0) == ["errors"]
+        assert choose(results, "baseline", tolerance=0.0) == "baseline"
+        assert choose(results, "baseline", tolerance=0.05) == "faster"
+
+    def test_load_variants_rejects_unknown_fields(self, tmp_path):
+        """Test a misspelled configuration field fails before anything runs."""
+        path = tmp_path / "variants.json"
+        path.write_text(json.dumps([{"name": "typo", "configurable": {"max_token": 100}}]))
+
+        with pytest.raises(ValueError, match="max_token"):
+            load_variants(str(path))
+
+    @pytest.mark.asyncio
+    async def test_evaluate_variant_scores_graph_output(self, recorded_clients):
+        """Test the extracted request details and items of each conversation are scored against its labels."""
+        graph = chatbot.create_chatbot_graph()
+        records = [
+            {"id": "ok", "messages": ["rotate my key"], "expected": {"valid_request_received": True, "product_id": "x-series", "items": 2}},
+            {"id": "miss", "message": "three things", "expected": {"valid_request_received": True, "product_id": "c-series", "items": 3}},
+        ]
+        seen = []
+
+        async def before_conversation(record):
+            seen.append(record["id"])
+
+        result = await evaluate_variant(graph, records, {"name": "v", "configurable": {"max_tokens": 100}}, before_conversation)
+
+        assert seen == ["ok", "miss"]
+        assert result["turns"] == 2 and result["errors"] == 0
+        assert result["accuracy"] == {"valid_request_received": 1.0, "product_id": 0.5, "items": 0.5}
+        assert [m["id"] for m in result["mismatches"]] == ["miss"]
+        assert result["mismatches"][0]["predicted"] == {"valid_request_received": True, "product_id": "x-series", "items": 2}
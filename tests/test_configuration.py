@@ -4,7 +4,16 @@ import os
 import pytest
 from unittest.mock import patch
 
-from api_support_chatbot.configuration import Configuration, MCPServerConfig, MCPTransport
+from pydantic import ValidationError
+
+import api_support_chatbot.configuration as configuration_module
+from api_support_chatbot.configuration import (
+    Configuration,
+    MCPServerConfig,
+    MCPTransport,
+    clear_configuration_cache,
+    set_secret_provider,
+)
 
 
 class TestConfiguration:
@@ -48,6 +57,52 @@ class TestConfiguration:
         assert connections['test_server']['url'] == 'http://localhost:8000/mcp/'
 
 
+class TestConfigurationResolution:
+    """Tests for cached resolution from runnable config."""
+
+    def setup_method(self):
+        clear_configuration_cache()
+
+    def teardown_method(self):
+        set_secret_provider(None)
+
+    def test_resolution_is_cached(self):
+        """Test that the same overrides resolve to the same instance."""
+        first = Configuration.from_runnable_config({"configurable": {"thread_id": "a", "max_retries": 7}})
+        second = Configuration.from_runnable_config({"configurable": {"thread_id": "b", "max_retries": 7}})
+        other = Configuration.from_runnable_config({"configurable": {"thread_id": "a", "max_retries": 1}})
+
+        assert first is second
+        assert first.max_retries == 7
+        assert other.max_retries == 1
+
+    def test_eviction_keeps_recently_used(self, monkeypatch):
+        """Test that the cache evicts the least recently used resolution."""
+        monkeypatch.setattr(configuration_module, "_MAX_RESOLVED_CONFIGURATIONS", 2)
+        hot = Configuration.from_runnable_config({"configurable": {"max_retries": 1}})
+        Configuration.from_runnable_config({"configurable": {"max_retries": 2}})
+        Configuration.from_runnable_config({"configurable": {"max_retries": 1}})
+        cold = Configuration.from_runnable_config({"configurable": {"max_retries": 3}})
+
+        assert Configuration.from_runnable_config({"configurable": {"max_retries": 1}}) is hot
+        assert Configuration.from_runnable_config({"configurable": {"max_retries": 3}}) is cold
+
+    def test_configuration_is_immutable(self):
+        """Test that a shared configuration cannot be modified."""
+        config = Configuration.from_runnable_config({"configurable": {}})
+        with pytest.raises(ValidationError):
+            config.max_retries = 10
+
+    def test_secrets_not_taken_from_configurable(self):
+        """Test that the API key comes from the secret provider only."""
+        set_secret_provider(lambda name: "provided-key" if name == "AZURE_OPENAI_API_KEY" else None)
+        config = Configuration.from_runnable_config({"configurable": {"azure_openai_api_key": "leaked"}})
+
+        assert config.azure_openai_api_key == "provided-key"
+        assert "azure_openai_api_key" not in config.to_configurable()
+        assert "provided-key" not in repr(config)
+
+
 class TestMCPServerConfig:
     """Tests for MCPServerConfig class."""
     
@@ -78,9 +133,25 @@ class TestMCPServerConfig:
         assert connection_dict['args'] == ["server.py"]
         assert connection_dict['transport'] == 'stdio'
     
-    def test_unsupported_transport(self):
-        """Test unsupported transport raises error."""
-        config = MCPServerConfig(transport=MCPTransport.WEBSOCKET)
+    def test_websocket_connection(self):
+        """Test WebSocket connection configuration, optionally for one replica."""
+        config = MCPServerConfig(
+            url="ws://localhost:9000/ws",
+            transport=MCPTransport.WEBSOCKET
+        )
+        
+        assert config.to_connection_dict() == {"url": "ws://localhost:9000/ws", "transport": "websocket"}
+        assert config.to_connection_dict("ws://replica:9000/ws")["url"] == "ws://replica:9000/ws"
+    
+    def test_sse_connection(self):
+        """Test SSE connection configuration."""
+        config = MCPServerConfig(
+            url="http://localhost:9000/sse",
+            transport=MCPTransport.SSE
+        )
+        
+        connection_dict = config.to_connection_dict()
         
-        with pytest.raises(ValueError, match="Unsupported transport"):
-            config.to_connection_dict()
\ No newline at end of file
+        assert connection_dict['url'] == "http://localhost:9000/sse"
+        assert connection_dict['transport'] == 'sse'
+        assert connection_dict['timeout'] == 30
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""Tests for the per-thread message debounce window."""
+
+import asyncio
+
+import pytest
+
+from src.api_support_chatbot.debounce import MERGED_MESSAGES, MessageDebouncer
+from src.api_support_chatbot.turns import TurnRegistry
+
+
+class FakeGraph:
+    async def aget_state(self, config):
+        return None
+
+
+def recorder(runs, name):
+    async def run(state, config):
+        runs.append((name, [m for m in state["messages"]]))
+        return name
+    return run
+
+
+CONFIG = {"configurable": {"thread_id": "burst"}}
+
+
+class TestMessageDebouncer:
+    """Tests for MessageDebouncer."""
+
+    @pytest.mark.asyncio
+    async def test_merges_burst_into_one_turn(self):
+        """Test that messages within the window start one turn, run by the last message."""
+        debouncer = MessageDebouncer(TurnRegistry())
+        runs = []
+        merged = MERGED_MESSAGES.value()
+
+        async def send(text, delay):
+            await asyncio.sleep(delay)
+            return await debouncer.submit(FakeGraph(), CONFIG, text, recorder(runs, text), 0.2, 2.0)
+
+        results = await asyncio.gather(send("my key", 0), send("for staging", 0.05), send("expired", 0.1))
+
+        assert runs == [("expired", ["my key", "for staging", "expired"])]
+        assert [last for _, last in results] == [False, False, True]
+        assert len({id(turn) for turn, _ in results}) == 1
+        assert await results[0][0].result() == "expired"
+        assert MERGED_MESSAGES.value() == merged + 2
+
+    @pytest.mark.asyncio
+    async def test_separate_turns_after_window(self):
+        """Test that messages further apart than the window get their own turns."""
+        debouncer = MessageDebouncer(TurnRegistry())
+        runs = []
+
+        first, _ = await debouncer.submit(FakeGraph(), CONFIG, "one", recorder(runs, "one"), 0.05, 1.0)
+        await first.result()
+        second, _ = await debouncer.submit(FakeGraph(), CONFIG, "two", recorder(runs, "two"), 0.05, 1.0)
+        await second.result()
+
+        assert runs == [("one", ["one"]), ("two", ["two"])]
+
+    @pytest.mark.asyncio
+    async def test_max_wait_bounds_burst(self):
+        """Test that a continuous burst is flushed after max_wait."""
+        debouncer = MessageDebouncer(TurnRegistry())
+        runs = []
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        async def send(i):
+            await asyncio.sleep(i * 0.05)
+            return await debouncer.submit(FakeGraph(), CONFIG, str(i), recorder(runs, str(i)), 0.2, 0.15)
+
+        await asyncio.gather(*(send(i) for i in range(6)))
+
+        assert len(runs) >= 2
+        assert loop.time() - started < 0.6
+
+    def test_window_adapts_to_cadence(self):
+        """Test that the window follows the thread's gaps between messages."""
+        debouncer = MessageDebouncer(TurnRegistry())
+        assert debouncer.window("t", 1.0, 3.0) == 1.0
+
+        for now in (0.0, 0.4, 0.8):
+            debouncer._observe("t", now, 3.0)
+        assert debouncer.window("t", 1.0, 3.0) == pytest.approx(0.6)
+
+        for now in (10.0, 12.0, 14.0):
+            debouncer._observe("slow", now, 3.0)
+        assert debouncer.window("slow", 1.0, 3.0) == 3.0
+
+        # Gaps longer than max_wait are new conversations, not typing cadence
+        debouncer._observe("idle", 0.0, 3.0)
+        debouncer._observe("idle", 60.0, 3.0)
+        assert debouncer.window("idle", 1.0, 3.0) == 1.0
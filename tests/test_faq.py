@@ -0,0 +1,210 @@
+"""Tests for the FAQ store and the offline precomputation pipeline."""
+
+import json
+import os
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.api_support_chatbot.chatbot as chatbot
+import src.api_support_chatbot.faq as faq
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.faq import FAQ_LOOKUPS, FAQEntry, FAQStore
+from src.api_support_chatbot.faq_pipeline import (
+    cluster_requests,
+    precompute,
+    select_clusters,
+)
+from src.api_support_chatbot.singleflight import request_fingerprint
+from src.api_support_chatbot.state import RequestItem, ResponseItem
+
+
+def entry(text="Rotate keys in the console.", computed_at=1000.0):
+    return FAQEntry(
+        request_text="How do I rotate a key?",
+        response_text=text,
+        confidence=0.9,
+        cluster_size=12,
+        source_ids=["t1", "t2"],
+        deployment="gpt-4.1-mini",
+        computed_at=computed_at,
+    )
+
+
+def item(text="how do I rotate a key", product_id="X-Series", category="How-To"):
+    return RequestItem(id="r1", request_text=text, category=category, product_id=product_id)
+
+
+def write_history(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+class TestFAQStore:
+    """Tests for FAQStore."""
+
+    def test_lookup_by_normalized_text(self, tmp_path):
+        """Test that a stored answer is found for a differently formatted request."""
+        store = FAQStore(str(tmp_path), clock=lambda: 1500.0)
+        key = request_fingerprint("X-Series", "How-To", "How do I rotate a key?")
+        store.write("X-Series", "How-To", {key: entry()})
+
+        found = store.lookup(item(), ttl=3600)
+        assert found.response_text == "Rotate keys in the console."
+        response = found.to_response_item(item())
+        assert response.request_id == "r1" and response.response_found
+        assert store.lookup(item(product_id="Y-Series"), ttl=3600) is None
+
+    def test_stale_entries_are_not_served(self, tmp_path):
+        """Test that entries older than the TTL are skipped."""
+        store = FAQStore(str(tmp_path), clock=lambda: 10_000.0)
+        store.write("X-Series", "How-To", {request_fingerprint("X-Series", "How-To", "how do i rotate a key"): entry()})
+        stale = FAQ_LOOKUPS.value(outcome="stale")
+
+        assert store.lookup(item(), ttl=3600) is None
+        assert FAQ_LOOKUPS.value(outcome="stale") == stale + 1
+
+    def test_reloads_rewritten_files(self, tmp_path):
+        """Test that a reader picks up a file rewritten by the pipeline."""
+        key = request_fingerprint("X-Series", "How-To", "how do i rotate a key")
+        reader = FAQStore(str(tmp_path), reload_interval=0, clock=lambda: 1500.0)
+        writer = FAQStore(str(tmp_path))
+        writer.write("X-Series", "How-To", {key: entry("old")})
+        assert reader.lookup(item(), ttl=3600).response_text == "old"
+
+        writer.write("X-Series", "How-To", {key: entry("new")})
+        os.utime(writer.file_for("X-Series", "How-To"), (2000, 2000))
+        assert reader.lookup(item(), ttl=3600).response_text == "new"
+
+    @pytest.mark.asyncio
+    async def test_async_lookup_reads_in_worker_thread(self, tmp_path, monkeypatch):
+        """Test that alookup loads files off the event loop and serves fresh cache hits inline."""
+        store = FAQStore(str(tmp_path), clock=lambda: 1500.0)
+        store.write("X-Series", "How-To", {request_fingerprint("X-Series", "How-To", "how do i rotate a key"): entry()})
+        offloaded = []
+
+        async def to_thread(fn, *args):
+            offloaded.append(fn)
+            return fn(*args)
+
+        monkeypatch.setattr(faq.asyncio, "to_thread", to_thread)
+        assert (await store.alookup(item(), ttl=3600)).response_text == "Rotate keys in the console."
+        assert (await store.alookup(item(), ttl=3600)).response_text == "Rotate keys in the console."
+        assert offloaded == [store.load]
+
+
+class FakeAgent:
+    def __init__(self, confidence=0.9):
+        self.confidence = confidence
+        self.questions = []
+
+    async def __call__(self, request_item, configuration):
+        self.questions.append(request_item.request_text)
+        return ResponseItem(
+            request_id=request_item.id,
+            request_text=request_item.request_text,
+            response_text=f"answer to {request_item.request_text}",
+            response_found=True,
+            confidence=self.confidence,
+        ), 1
+
+
+HISTORY = [
+    {"id": "1", "product_id": "X-Series", "category": "How-To", "request_text": "How do I rotate a key?"},
+    {"id": "2", "product_id": "X-Series", "category": "How-To", "request_text": "how do i rotate a key"},
+    {"id": "3", "product_id": "X-Series", "category": "How-To", "request_text": "How do I rotate a key?"},
+    {"id": "4", "product_id": "X-Series", "category": "How-To", "request_text": "Where are the webhooks?"},
+    {"id": "5", "product_id": "X-Series", "category": "Technical", "message": "Webhooks not firing"},
+    {"id": "6", "product_id": "X-Series", "category": "Technical", "message": "webhooks not firing!"},
+]
+
+
+class TestFAQPipeline:
+    """Tests for the precomputation pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_clusters_by_normalized_text(self, tmp_path):
+        """Test clustering, thresholds and the representative wording."""
+        history = tmp_path / "history.jsonl"
+        write_history(history, HISTORY)
+
+        clusters = await cluster_requests(str(history))
+        selected = select_clusters(clusters, min_count=2, top=10)
+
+        assert sorted(c.count for c in selected) == [2, 3]
+        largest = max(selected, key=lambda c: c.count)
+        assert largest.representative == "How do I rotate a key?"
+        assert largest.source_ids == ["1", "2", "3"]
+        assert len(select_clusters(clusters, min_count=1, top=1)) == 1
+
+    @pytest.mark.asyncio
+    async def test_precompute_and_refresh_policy(self, tmp_path):
+        """Test that answers are stored, kept while fresh and recomputed when forced."""
+        history = tmp_path / "history.jsonl"
+        write_history(history, HISTORY)
+        configuration = Configuration(faq_refresh_after=3600, faq_ttl=7200)
+        agent = FakeAgent()
+
+        stats = await precompute(str(history), str(tmp_path / "store"), min_count=2, configuration=configuration, answer=agent)
+        assert stats["computed"] == 2 and stats["stored"] == 2
+        assert sorted(agent.questions) == ["How do I rotate a key?", "Webhooks not firing"]
+
+        stats = await precompute(str(history), str(tmp_path / "store"), min_count=2, configuration=configuration, answer=agent)
+        assert stats["computed"] == 0 and stats["fresh"] == 2
+
+        stats = await precompute(
+            str(history), str(tmp_path / "store"), min_count=2, force=True, configuration=configuration, answer=agent
+        )
+        assert stats["computed"] == 2
+
+        store = FAQStore(str(tmp_path / "store"))
+        found = store.lookup(item("webhooks not firing", category="Technical"), ttl=7200)
+        assert found.response_text == "answer to Webhooks not firing"
+        assert found.source_ids == ["5", "6"]
+
+    @pytest.mark.asyncio
+    async def test_low_confidence_answers_are_rejected(self, tmp_path):
+        """Test that answers below the confidence threshold are not stored."""
+        history = tmp_path / "history.jsonl"
+        write_history(history, HISTORY)
+
+        stats = await precompute(
+            str(history), str(tmp_path / "store"), min_count=2, min_confidence=0.7,
+            configuration=Configuration(), answer=FakeAgent(confidence=0.5),
+        )
+        assert stats["rejected"] == 2 and stats["stored"] == 0
+
+
+class TestFAQBeforeFanOut:
+    """Tests for FAQ lookups in the graph."""
+
+    @pytest.fixture
+    def store_path(self, tmp_path):
+        key = request_fingerprint("X-Series", "How-To", "how do i rotate a key")
+        FAQStore(str(tmp_path)).write("X-Series", "How-To", {key: entry("faq answer", computed_at=time.time())})
+        return str(tmp_path)
+
+    async def run(self, fake_model, store_path, items):
+        model = fake_model(items=items, answer="live answer", assembled_text=lambda messages: messages[-1].content)
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {
+            "thread_id": f"faq-{len(items)}", "enable_request_coalescing": False, "faq_store_path": store_path,
+        }}
+        result = await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config=config)
+        return model, result["messages"][-1].content
+
+    @pytest.mark.asyncio
+    async def test_faq_items_skip_response_agents(self, fake_model, store_path):
+        """Test that only items without a stored answer are fanned out."""
+        model, answer = await self.run(fake_model, store_path, ["How do I rotate a key?", "Where are the webhooks?"])
+        assert model.agent_calls == 1
+        assert "faq answer" in answer and "live answer" in answer
+
+    @pytest.mark.asyncio
+    async def test_all_items_answered_from_faq(self, fake_model, store_path):
+        """Test that a turn fully answered from the store still assembles a reply."""
+        model, answer = await self.run(fake_model, store_path, ["How do I rotate a key?"])
+        assert model.agent_calls == 0
+        assert "faq answer" in answer
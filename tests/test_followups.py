@@ -0,0 +1,181 @@
+"""Tests for the fan-out deadline and follow-up delivery of late items."""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.followups import FollowUps, deliver_follow_ups, follow_ups
+from src.api_support_chatbot.state import ResponseItem
+from src.api_support_chatbot.turns import TurnRegistry
+
+
+@pytest.fixture
+def assembler_inputs(fake_model):
+    # Answers immediately, except for the slow question
+    model = fake_model(
+        items=["fast question", "slow question"],
+        answer="late answer",
+        delay=lambda text: 0.5 if text == "slow question" else 0,
+        assembled_text="assembled",
+    )
+    return model.assembled
+
+
+def turn_config(thread_id, **overrides):
+    return {"configurable": {
+        "thread_id": thread_id,
+        "enable_request_coalescing": False,
+        "fan_out_deadline": 0.1,
+        **overrides,
+    }}
+
+
+class TestFanOutDeadline:
+    """Tests for the straggler deadline."""
+
+    @pytest.mark.asyncio
+    async def test_assembler_proceeds_at_deadline(self, assembler_inputs):
+        """Test that the turn completes at the deadline with the late item pending."""
+        graph = chatbot.create_chatbot_graph()
+
+        started = time.perf_counter()
+        result = await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config=turn_config("late-cancel"))
+
+        assert time.perf_counter() - started < 0.45
+        assert result["messages"][-1].content.startswith("assembled")
+        assert "PENDING:" in assembler_inputs[0][-1].content
+        assert follow_ups.pending("late-cancel") == 0
+
+    @pytest.mark.asyncio
+    async def test_late_item_delivered_as_follow_up(self, assembler_inputs):
+        """Test that a kept straggler is appended to the thread when it completes."""
+        graph = chatbot.create_chatbot_graph()
+        config = turn_config("late-follow-up", deliver_late_results=True)
+
+        await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config=config)
+        assert "follow-up message" in assembler_inputs[0][-1].content
+        assert follow_ups.pending("late-follow-up") == 1
+
+        assert await deliver_follow_ups(graph, "late-follow-up") == 1
+        last = (await graph.aget_state(config)).values["messages"][-1]
+        assert "slow question" in last.content and "late answer" in last.content
+        assert last.additional_kwargs["artifact"]["follow_up"] is True
+
+    @pytest.mark.asyncio
+    async def test_supersession_keeps_earlier_turns_stragglers(self, assembler_inputs):
+        """Test that superseding a turn does not cancel late items of a turn that completed before it."""
+        graph = chatbot.create_chatbot_graph()
+        thread_id = "late-then-supersede"
+        turns = TurnRegistry()
+
+        def run(state, config):
+            return graph.ainvoke(state, config=config)
+
+        first = await turns.start(graph, turn_config(thread_id, deliver_late_results=True), [HumanMessage(content="hi")], run)
+        await first.result()
+        assert set(follow_ups._tasks[thread_id].values()) == {first.turn_id}
+
+        second = await turns.start(graph, turn_config(thread_id, fan_out_deadline=0), [HumanMessage(content="again")], run)
+        await asyncio.sleep(0.1)
+        await turns.start(graph, turn_config(thread_id, fan_out_deadline=0), [HumanMessage(content="correction")], run)
+
+        assert second.superseded
+        assert follow_ups.pending(thread_id) == 1
+        assert [item.request_text for item in await follow_ups.drain(thread_id)] == ["slow question"]
+
+    @pytest.mark.asyncio
+    async def test_follow_up_waits_for_running_turn(self, assembler_inputs):
+        """Test that a late item is appended after a turn running on the thread instead of into it."""
+        graph = chatbot.create_chatbot_graph()
+        thread_id = "late-during-turn"
+        await graph.ainvoke(
+            {"messages": [HumanMessage(content="hi")]}, config=turn_config(thread_id, deliver_late_results=True)
+        )
+        turns = TurnRegistry()
+        # Without a deadline the next turn waits for its slow item
+        turn = await turns.start(
+            graph,
+            turn_config(thread_id, fan_out_deadline=0),
+            [HumanMessage(content="again")],
+            lambda state, config: graph.ainvoke(state, config=config),
+        )
+        await asyncio.sleep(0.1)
+
+        assert await deliver_follow_ups(graph, thread_id, turns=turns) == 1
+        assert turn.task.done()
+        snapshot = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+        contents = [m.content for m in snapshot.values["messages"]]
+        assert contents[:4] == ["hi", "assembled", "again", "assembled"]
+        assert "late answer" in contents[4] and len(contents) == 5
+        assert snapshot.next == ()
+
+
+class TestFollowUps:
+    """Tests for the straggler registry."""
+
+    @pytest.mark.asyncio
+    async def test_timed_out_straggler_is_dropped(self):
+        """Test that stragglers exceeding the follow-up timeout yield nothing."""
+        registry = FollowUps()
+
+        async def never():
+            await asyncio.sleep(10)
+
+        async def quick():
+            return ResponseItem(request_id="a", response_text="done")
+
+        registry.adopt("t", never(), timeout=0.05)
+        registry.adopt("t", quick(), timeout=1)
+
+        items = await registry.drain("t")
+        assert [item.request_id for item in items] == ["a"]
+        assert registry.pending("t") == 0
+
+    @pytest.mark.asyncio
+    async def test_finished_stragglers_are_released(self):
+        """Test that finished tasks are dropped at once and their items only kept until they expire."""
+        registry = FollowUps()
+
+        async def quick(request_id):
+            return ResponseItem(request_id=request_id, response_text="done")
+
+        registry.adopt("kept", quick("a"), timeout=10)
+        registry.adopt("expired", quick("b"), timeout=0.05)
+        await asyncio.sleep(0.01)
+
+        assert registry._tasks == {}
+        assert registry.pending("kept") == 1 and registry.pending("expired") == 1
+
+        await asyncio.sleep(0.1)
+        registry.adopt("other", quick("c"), timeout=10)
+        await asyncio.sleep(0.01)
+
+        assert registry.pending("expired") == 0
+        assert [item.request_id for item in await registry.drain("kept")] == ["a"]
+        assert registry.pending("kept") == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_only_hits_the_superseded_turn(self):
+        """Test that cancelling a turn's stragglers leaves running and finished ones of other turns."""
+        registry = FollowUps()
+
+        async def slow(request_id):
+            await asyncio.sleep(0.1)
+            return ResponseItem(request_id=request_id, response_text="done")
+
+        async def quick(request_id):
+            return ResponseItem(request_id=request_id, response_text="done")
+
+        registry.adopt("t", slow("earlier-running"), timeout=1, turn_id="earlier")
+        registry.adopt("t", quick("earlier-finished"), timeout=1, turn_id="earlier")
+        registry.adopt("t", slow("superseded-running"), timeout=1, turn_id="superseded")
+        registry.adopt("t", quick("superseded-finished"), timeout=1, turn_id="superseded")
+        await asyncio.sleep(0.01)
+
+        await registry.cancel("t", "superseded")
+
+        assert registry.pending("t") == 2
+        assert sorted(item.request_id for item in await registry.drain("t")) == ["earlier-finished", "earlier-running"]
@@ -0,0 +1,44 @@
+"""Cold start tests: lazy imports and import time budgets."""
+
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_bench import (
+    FRAMEWORK_MODULES,
+    HEAVY_MODULES,
+    IMPORT_BUDGETS_MS,
+    loaded_packages,
+    measure_import,
+)
+
+
+class TestImportTime:
+    """Tests for import side effects and budgets."""
+
+    @pytest.mark.parametrize("module", ["src.api_support_chatbot.configuration", "src.api_support_chatbot.prompts"])
+    def test_light_modules_skip_frameworks(self, module):
+        """Test that configuration and prompts load neither LangGraph nor LangChain."""
+        assert loaded_packages(module, FRAMEWORK_MODULES + HEAVY_MODULES) == []
+
+    def test_chatbot_defers_clients_and_compilation(self):
+        """Test that importing the graph module loads no client library and compiles nothing."""
+        assert loaded_packages("src.api_support_chatbot.chatbot", HEAVY_MODULES) == []
+
+        code = "import src.api_support_chatbot.chatbot as c; print(c._graph is None)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "True"
+
+    def test_create_graph_compiles_once(self):
+        """Test that create_graph and the module attribute share one compiled graph."""
+        from src.api_support_chatbot import chatbot
+
+        assert chatbot.create_graph() is chatbot.create_graph()
+        assert chatbot.graph is chatbot.create_graph()
+
+    @pytest.mark.parametrize("module", list(IMPORT_BUDGETS_MS))
+    def test_import_within_budget(self, module):
+        """Test cold import time against the budget."""
+        row = measure_import(module, runs=2, top=0)
+        assert row["cumulative_ms"] <= row["budget_ms"], row
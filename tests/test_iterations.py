@@ -0,0 +1,127 @@
+"""Tests for the response agent iteration budget."""
+
+import time
+
+import pytest
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.configuration import Configuration, DegradationMode
+from src.api_support_chatbot.iterations import (
+    BUDGET_EVENTS,
+    ITERATIONS,
+    IterationBudget,
+    context_coverage,
+)
+from src.api_support_chatbot.state import RequestItem
+
+HOW_TO = "How-To on API Usage & Functionality"
+
+
+class SearchTool:
+    name = "search"
+
+    def __init__(self, result):
+        self.result = result
+
+    async def ainvoke(self, args):
+        return self.result
+
+
+@pytest.fixture
+def searching(fake_model):
+    """A model that asks for the search tool until it is called without tools."""
+    tool = SearchTool("unrelated text")
+    return fake_model(tools=[tool], answer="answer", tool_calls="always"), tool
+
+
+def item(category=HOW_TO, text="How do I rotate the staging API key?"):
+    return RequestItem(id="i1", request_text=text, category=category, product_id="X-Series")
+
+
+class TestIterationBudget:
+    """Tests for IterationBudget and context coverage."""
+
+    def test_budget_by_category(self):
+        """Test budgets are looked up by category, case-insensitively, with a default."""
+        configuration = Configuration(iteration_budgets={HOW_TO: 1, "Technical Troubleshooting & Bug Reports": 4}, response_agent_max_iterations=2)
+
+        assert IterationBudget(configuration, HOW_TO.lower()).limit == 1
+        assert IterationBudget(configuration, "technical troubleshooting & bug reports").limit == 4
+        other = IterationBudget(configuration, "Something new")
+        assert (other.category, other.limit) == ("other", 2)
+
+    def test_reduced_iterations_mode(self):
+        """Test the reduced_iterations degradation mode allows one round and no extension."""
+        configuration = Configuration(
+            iteration_budgets={HOW_TO: 3}, degradation_mode=DegradationMode.REDUCED_ITERATIONS
+        )
+        budget = IterationBudget(configuration, HOW_TO, deadline=time.time() + 60)
+        budget.record_round(0.01)
+
+        assert (budget.limit, budget.extensions) == (1, 0)
+        assert not budget.next_round(1)
+
+    def test_extension_needs_deadline_room(self):
+        """Test the budget is extended only when the deadline leaves room for another round."""
+        configuration = Configuration(response_agent_max_iterations=1, iteration_extensions=1)
+        roomy = IterationBudget(configuration, "x", deadline=time.time() + 10)
+        tight = IterationBudget(configuration, "x", deadline=time.time() + 0.5)
+        unbounded = IterationBudget(configuration, "x")
+        for budget in (roomy, tight, unbounded):
+            budget.record_round(1.0)
+
+        assert roomy.next_round(1)
+        assert not roomy.next_round(2)
+        assert not tight.next_round(1)
+        assert not unbounded.next_round(1)
+
+    def test_context_coverage(self):
+        """Test coverage counts the request's significant words found in the context."""
+        request = "How do I rotate the staging API key?"
+
+        assert context_coverage(request, ["To rotate a staging key, open the API console"]) == 1.0
+        assert context_coverage(request, ["Rotate keys in the console"]) == 0.25
+        assert context_coverage("How do I?", []) == 1.0
+
+
+class TestResponseAgentLoop:
+    """Tests for the budgeted tool loop of run_response_agent."""
+
+    @pytest.mark.asyncio
+    async def test_category_budget_limits_tool_rounds(self, searching):
+        """Test a how-to item gets one tool round, then the final answer."""
+        model, _ = searching
+        configuration = Configuration(iteration_budgets={HOW_TO: 1}, iteration_extensions=0)
+        observed = ITERATIONS.count(category=HOW_TO)
+
+        response_item, iterations = await chatbot.run_response_agent(item(), configuration)
+
+        assert iterations == 1
+        assert (model.tool_rounds, model.agent_calls) == (1, 1)
+        assert response_item.response_found
+        assert ITERATIONS.count(category=HOW_TO) == observed + 1
+
+    @pytest.mark.asyncio
+    async def test_sufficient_context_stops_early(self, searching):
+        """Test the loop answers as soon as the retrieved context covers the request."""
+        model, tool = searching
+        tool.result = "To rotate the staging API key, open the console and create a new key."
+        configuration = Configuration(iteration_budgets={HOW_TO: 3}, context_sufficiency_threshold=0.8)
+        early_stops = BUDGET_EVENTS.value(category=HOW_TO, event="early_stop")
+
+        _, iterations = await chatbot.run_response_agent(item(), configuration)
+
+        assert iterations == 1
+        assert model.tool_rounds == 1
+        assert BUDGET_EVENTS.value(category=HOW_TO, event="early_stop") == early_stops + 1
+
+    @pytest.mark.asyncio
+    async def test_insufficient_context_uses_full_budget(self, searching):
+        """Test unrelated context does not stop the loop before its budget."""
+        model, _ = searching
+        configuration = Configuration(iteration_budgets={HOW_TO: 3}, iteration_extensions=0)
+
+        _, iterations = await chatbot.run_response_agent(item(), configuration)
+
+        assert iterations == 3
+        assert (model.tool_rounds, model.agent_calls) == (3, 1)
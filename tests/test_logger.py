@@ -0,0 +1,69 @@
+"""Tests for non-blocking structured logging."""
+
+import io
+import json
+import logging
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.api_support_chatbot.logger import (
+    LogSettings,
+    configure_logging,
+    shutdown_logging,
+    truncate_value,
+)
+from src.api_support_chatbot.utils import log_agent_action
+
+
+@pytest.fixture
+def json_stream():
+    """Route package logs to an in-memory stream as JSON lines."""
+    stream = io.StringIO()
+    with patch.dict(os.environ, {"LOG_FORMAT": "json", "LOG_LEVEL": "INFO", "LOG_MAX_FIELD_LENGTH": "20"}):
+        configure_logging(stream=stream, settings=LogSettings())
+    yield stream
+    shutdown_logging()
+
+
+def read_lines(stream):
+    shutdown_logging()  # flush the background writer
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestLogger:
+    """Tests for the logging pipeline."""
+
+    def test_truncate_value(self):
+        """Test nested payload truncation."""
+        payload = {"text": "x" * 50, "items": ["y" * 50], "count": 3}
+        truncated = truncate_value(payload, 10)
+        assert truncated == {"text": "xxxxxxx...", "items": ["yyyyyyy..."], "count": 3}
+
+    def test_json_lines_output(self, json_stream):
+        """Test that agent actions are written as JSON lines with details."""
+        log_agent_action("ResponseAgent", "Generated response", {"Response Text": "z" * 100})
+
+        (entry,) = read_lines(json_stream)
+        assert entry["message"] == "ResponseAgent: Generated response"
+        assert entry["agent"] == "ResponseAgent"
+        assert entry["level"] == "INFO"
+        assert entry["details"]["Response Text"] == "z" * 17 + "..."
+
+    def test_level_filtering(self, json_stream):
+        """Test that records below LOG_LEVEL are discarded."""
+        log_agent_action("ResponseCoordinator", "Extracted request item", level=logging.DEBUG)
+        log_agent_action("ResponseCoordinator", "Delegating", level=logging.WARNING)
+
+        assert [e["action"] for e in read_lines(json_stream)] == ["Delegating"]
+
+    def test_sampling(self):
+        """Test that sampled events honour LOG_SAMPLE_RATE."""
+        stream = io.StringIO()
+        with patch.dict(os.environ, {"LOG_FORMAT": "json", "LOG_SAMPLE_RATE": "0"}):
+            configure_logging(stream=stream, settings=LogSettings())
+        log_agent_action("ResponseAgent", "sampled", sampled=True)
+        log_agent_action("ResponseAgent", "always")
+
+        assert [e["action"] for e in read_lines(stream)] == ["always"]
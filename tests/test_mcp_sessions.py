@@ -0,0 +1,152 @@
+"""Tests for persistent MCP sessions."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import langchain_mcp_adapters.sessions as adapter_sessions
+import langchain_mcp_adapters.tools as adapter_tools
+import pytest
+
+from src.api_support_chatbot.mcp_sessions import (
+    SESSION_EVENTS,
+    PersistentSession,
+    SessionUnavailable,
+    close_sessions,
+    get_session,
+)
+
+CONNECTION = {"url": "ws://localhost:9000/ws", "transport": "websocket"}
+
+
+class FakeTool:
+    def __init__(self, name, session):
+        self.name = name
+        self.session = session
+
+
+class FakeServer:
+    """Counts connections and answers pings until told to go down."""
+
+    def __init__(self):
+        self.connects = 0
+        self.pings = 0
+        self.up = True
+        self.sessions = []
+
+    @asynccontextmanager
+    async def create_session(self, connection, **kwargs):
+        if not self.up:
+            raise ConnectionRefusedError("refused")
+        self.connects += 1
+        session = FakeSession(self)
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            session.closed = True
+
+
+class FakeSession:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+
+    async def initialize(self):
+        pass
+
+    async def send_ping(self):
+        if not self.server.up:
+            raise ConnectionError("connection lost")
+        self.server.pings += 1
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeServer()
+
+    async def load_tools(session, **kwargs):
+        return [FakeTool("readme", session)]
+
+    monkeypatch.setattr(adapter_sessions, "create_session", fake.create_session)
+    monkeypatch.setattr(adapter_tools, "load_mcp_tools", load_tools)
+    return fake
+
+
+class TestPersistentSession:
+    """Tests for PersistentSession."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_connection(self, server):
+        """Test that concurrent callers wait on a single connect and reuse it."""
+        session = PersistentSession("s", CONNECTION)
+
+        results = await asyncio.gather(*(session.tools() for _ in range(10)))
+
+        assert server.connects == 1
+        assert all(tools["readme"].session is server.sessions[0] for tools in results)
+        await session.close()
+        assert server.sessions[0].closed
+
+    @pytest.mark.asyncio
+    async def test_keepalive_failure_reconnects(self, server):
+        """Test that a failed keep-alive ping closes the session and the next call reconnects."""
+        session = PersistentSession("s", CONNECTION, keepalive_interval=0.01)
+        failed = SESSION_EVENTS.value(transport="websocket", event="keepalive_failed")
+        await session.tools()
+        await asyncio.sleep(0.05)
+        assert server.pings > 0
+
+        server.up = False
+        await asyncio.sleep(0.05)
+        assert not session.connected
+        assert SESSION_EVENTS.value(transport="websocket", event="keepalive_failed") == failed + 1
+
+        server.up = True
+        tools = await session.tools()
+        assert server.connects == 2
+        assert tools["readme"].session is server.sessions[1]
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_backs_off(self, server):
+        """Test that calls fail fast until the reconnect backoff expires, which doubles."""
+        server.up = False
+        session = PersistentSession("s", CONNECTION, backoff=0.05, max_backoff=0.08)
+
+        with pytest.raises(ConnectionRefusedError):
+            await session.tools()
+        with pytest.raises(SessionUnavailable):
+            await session.tools()
+        assert session.backoff == 0.08
+
+        server.up = True
+        await asyncio.sleep(0.06)
+        await session.tools()
+        assert session.connected and session.backoff == 0.05
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_verify_closes_dead_session(self, server):
+        """Test that a call error closes the session when the server stopped answering."""
+        session = PersistentSession("s", CONNECTION)
+        await session.tools()
+
+        await session.verify()
+        assert session.connected
+
+        server.up = False
+        await session.verify()
+        assert not session.connected
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_shared_per_endpoint(self, server):
+        """Test that each server endpoint gets one session until they are closed."""
+        first = get_session("s", CONNECTION)
+        assert get_session("s", dict(CONNECTION)) is first
+        assert get_session("s", {**CONNECTION, "url": "ws://replica/ws"}) is not first
+
+        await first.tools()
+        await close_sessions()
+        assert not first.connected
+        assert get_session("s", CONNECTION) is not first
+        await close_sessions()
@@ -0,0 +1,112 @@
+"""Tests for the event loop lag monitor and the node profiler."""
+
+import asyncio
+import time
+
+import pytest
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.profiling import (
+    LOOP_BLOCKED_SECONDS,
+    LOOP_BLOCKS,
+    LoopLagMonitor,
+    NodeProfiler,
+)
+from src.api_support_chatbot.state import RequestItem
+from src.api_support_chatbot.telemetry import traced_node
+
+
+@traced_node("blocking_node")
+async def blocking_node(state):
+    # Synchronous work on the loop, like a large json.loads
+    time.sleep(0.3)
+    return {}
+
+
+@traced_node("busy_node")
+async def busy_node(state):
+    deadline = time.perf_counter() + 0.2
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return {}
+
+
+class TestLoopLagMonitor:
+    """Tests for LoopLagMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_attributes_stall_to_running_node(self):
+        """Test a blocking node is reported as the cause of the stall."""
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        blocks = LOOP_BLOCKS.value(node="blocking_node")
+        blocked = LOOP_BLOCKED_SECONDS.value(node="blocking_node")
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            await blocking_node({})
+            await asyncio.sleep(0.1)
+        finally:
+            monitor.stop()
+
+        assert LOOP_BLOCKS.value(node="blocking_node") == blocks + 1
+        assert LOOP_BLOCKED_SECONDS.value(node="blocking_node") - blocked >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_idle_loop_is_not_reported(self):
+        """Test an idle loop records lag samples without stalls."""
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        blocks = LOOP_BLOCKS.value(node="none")
+        monitor.start()
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            monitor.stop()
+
+        assert LOOP_BLOCKS.value(node="none") == blocks
+        assert monitor.last_lag < 0.05
+
+
+class TestNodeProfiler:
+    """Tests for NodeProfiler."""
+
+    @pytest.mark.asyncio
+    async def test_collapsed_stacks_start_at_node(self):
+        """Test samples are grouped under the node whose code was running."""
+        profiler = NodeProfiler()
+        profiler.start(interval=0.002)
+        try:
+            await busy_node({})
+            await asyncio.sleep(0.05)
+        finally:
+            profiler.stop()
+
+        lines = profiler.collapsed().splitlines()
+        assert profiler.node_samples["busy_node"] > 0
+        assert lines and all(line.startswith("node:busy_node;busy_node (test_profiling.py)") for line in lines)
+        assert not profiler.enabled
+
+
+class TestTaskAttribution:
+    """Tests for attributing work in tasks created by a node."""
+
+    @pytest.mark.asyncio
+    async def test_deadline_task_is_attributed_to_node(self, fake_model):
+        """Test a stall in the task running an item under the fan-out deadline counts for generate_response."""
+        # Blocks the loop inside the task generate_response hands the item to
+        fake_model(answer=lambda text, _: time.sleep(0.3) or "answer")
+        request_item = RequestItem(id="i1", request_text="question", category="How-To", product_id="X-Series")
+        config = {"configurable": {"thread_id": "profiled", "enable_request_coalescing": False}}
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        blocks = LOOP_BLOCKS.value(node="generate_response")
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            update = await chatbot.generate_response(
+                {"request_item": request_item, "deadline": time.time() + 5}, config=config
+            )
+            await asyncio.sleep(0.1)
+        finally:
+            monitor.stop()
+
+        assert update["response_items"].response_text == "answer"
+        assert LOOP_BLOCKS.value(node="generate_response") == blocks + 1
@@ -0,0 +1,136 @@
+"""Tests for the re-run of failed response items."""
+
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.prompts import FAILED_ITEM_MSG, GENERIC_ERROR_MSG
+from src.api_support_chatbot.recovery import (
+    ITEM_RETRIES,
+    KEPT_ITEMS,
+    PARTIAL_TURNS,
+    plan_recovery,
+)
+from src.api_support_chatbot.state import RequestItem, ResponseItem
+
+
+@pytest.fixture
+def flaky(fake_model):
+    """Install a model that fails the first ``failures`` answers to "question 1"."""
+
+    def install(failures):
+        return fake_model(
+            items=[f"question {i}" for i in range(3)],
+            answer=lambda text, _: f"answer to {text}",
+            fail=lambda text, calls: text == "question 1" and calls <= failures,
+        )
+
+    return install
+
+
+async def run_turn(thread_id, **configurable):
+    graph = chatbot.create_chatbot_graph()
+    config = {"configurable": {"thread_id": thread_id, "enable_request_coalescing": False, **configurable}}
+    return await graph.ainvoke({"messages": [HumanMessage(content="three questions")]}, config=config)
+
+
+class TestPlanRecovery:
+    """Tests for splitting the failed items of a turn."""
+
+    def test_retries_within_budget(self):
+        """Test that failed items are re-run until they used up their retries."""
+        request_items = {i: RequestItem(id=i, request_text="q", category="How-To") for i in ("a", "b", "c")}
+        response_items = {
+            "a": ResponseItem(request_id="a", response_found=True),
+            "b": ResponseItem(request_id="b", error=True, attempts=1),
+            "c": ResponseItem(request_id="c", error=True, attempts=2),
+        }
+
+        retry, given_up = plan_recovery(response_items, request_items, max_retries=1)
+
+        assert [item.id for item in retry] == ["b"]
+        assert [item.request_id for item in given_up] == ["c"]
+
+    def test_no_retries_after_deadline(self):
+        """Test that failed items are given up once the turn's fan-out deadline passed."""
+        request_items = {"a": RequestItem(id="a", request_text="q", category="How-To")}
+        response_items = {"a": ResponseItem(request_id="a", error=True, attempts=1)}
+
+        retry, _ = plan_recovery(response_items, request_items, max_retries=1, deadline=time.time() + 60)
+        assert [item.id for item in retry] == ["a"]
+
+        retry, given_up = plan_recovery(response_items, request_items, max_retries=1, deadline=time.time() - 1)
+        assert retry == []
+        assert [item.request_id for item in given_up] == ["a"]
+
+
+class TestPartialFailureRecovery:
+    """Tests for re-running failed response items within a turn."""
+
+    @pytest.mark.asyncio
+    async def test_failed_item_is_rerun_alone(self, flaky):
+        """Test that only the failed item is re-run and the turn is answered in full."""
+        model = flaky(failures=1)
+        retried = ITEM_RETRIES.value(outcome="retried")
+        recovered = PARTIAL_TURNS.value(outcome="recovered")
+        kept = KEPT_ITEMS.value()
+
+        result = await run_turn("recover", response_item_retries=1)
+
+        assert model.calls == {"question 0": 1, "question 1": 2, "question 2": 1}
+        assert result["messages"][-1].content == "final answer"
+        assert "answer to question 1" in model.assembled[-1][-1].content
+        assert ITEM_RETRIES.value(outcome="retried") == retried + 1
+        assert PARTIAL_TURNS.value(outcome="recovered") == recovered + 1
+        assert KEPT_ITEMS.value() == kept + 2
+
+    @pytest.mark.asyncio
+    async def test_rerun_keeps_turn_deadline(self, flaky, monkeypatch):
+        """Test that re-run items get the turn's fan-out deadline rather than a new one."""
+        flaky(failures=1)
+        deadlines = []
+        respond_to_item = chatbot.respond_to_item
+
+        async def recording(request_item, configuration, deadline=None, memory=None):
+            deadlines.append(deadline)
+            return await respond_to_item(request_item, configuration, deadline, memory)
+
+        monkeypatch.setattr(chatbot, "respond_to_item", recording)
+
+        result = await run_turn("deadline", response_item_retries=1, fan_out_deadline=60)
+
+        assert result["messages"][-1].content == "final answer"
+        assert len(deadlines) == 4
+        assert len(set(deadlines)) == 1 and deadlines[0] is not None
+        assert result["fan_out_deadline"] is None
+
+    @pytest.mark.asyncio
+    async def test_assembles_partial_results_after_retries(self, flaky):
+        """Test that an item still failing after its retries is assembled as not answered."""
+        model = flaky(failures=10)
+        partial = PARTIAL_TURNS.value(outcome="partial")
+
+        result = await run_turn("partial", response_item_retries=2)
+
+        assert model.calls["question 1"] == 3
+        assert result["messages"][-1].content == "final answer"
+        assert FAILED_ITEM_MSG in model.assembled[-1][-1].content
+        assert "answer to question 0" in model.assembled[-1][-1].content
+        assert PARTIAL_TURNS.value(outcome="partial") == partial + 1
+
+    @pytest.mark.asyncio
+    async def test_all_items_failing_is_an_error(self, flaky, monkeypatch):
+        """Test that the turn still fails when no item could be answered."""
+        model = flaky(failures=10)
+
+        async def broken_tools(configuration):
+            raise RuntimeError("MCP down")
+
+        monkeypatch.setattr(chatbot, "get_mcp_tools", broken_tools)
+
+        result = await run_turn("failed", response_item_retries=0)
+
+        assert result["messages"][-1].content.startswith(GENERIC_ERROR_MSG)
+        assert model.assembled == []
@@ -0,0 +1,256 @@
+"""Tests for the per-thread retrieval memory."""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.retrieval_memory import (
+    EVICTIONS,
+    RECALLS,
+    TOOL_RESULTS,
+    RetrievalMemory,
+    RetrievalMemoryChannel,
+    RetrievalMemoryUpdate,
+    RetrievedContext,
+    memory_key,
+    shared,
+)
+from src.api_support_chatbot.serde import ChatbotSerializer
+from src.api_support_chatbot.state import RequestItem
+from src.api_support_chatbot.turns import TurnRegistry
+
+PASSAGE = "To rotate the staging API key, create a new key in the console and revoke the old one."
+QUESTION = "How do I rotate the staging API key?"
+
+
+def entry(name, content="text", last_used_at=0.0, product_id="X-Series", stored_at=None):
+    return RetrievedContext(
+        key=name, tool="search", args={"query": name}, product_id=product_id,
+        content=content, stored_at=time.time() if stored_at is None else stored_at, last_used_at=last_used_at,
+    )
+
+
+def write(*entries, max_entries=10, max_chars=1000):
+    return RetrievalMemoryUpdate(entries=list(entries), max_entries=max_entries, max_chars=max_chars)
+
+
+class SearchTool:
+    name = "search"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, args):
+        self.calls += 1
+        return PASSAGE
+
+
+@pytest.fixture
+def searching(fake_model):
+    """A model that calls the search tool once per request, then answers."""
+    tool = SearchTool()
+    model = fake_model(
+        tools=[tool], items=[QUESTION], answer="answer", tool_calls="once", tool_args={"query": "rotate key"},
+    )
+    return model, tool
+
+
+def item(text=QUESTION, product_id="X-Series"):
+    return RequestItem(id="i1", request_text=text, category="How-To", product_id=product_id)
+
+
+class TestRetrievalMemoryChannel:
+    """Tests for RetrievalMemoryChannel."""
+
+    def test_merges_writes_of_a_step(self):
+        """Test that the writes of concurrent branches are merged by key."""
+        channel = RetrievalMemoryChannel()
+        channel.update([write(entry("a")), write(entry("b"))])
+        channel.update([write(entry("a", "new"))])
+        assert sorted(channel.get()) == ["a", "b"]
+        assert channel.get()["a"].content == "new"
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest entries are dropped over the entry and size limits."""
+        entries_before = EVICTIONS.value(reason="entries")
+        size_before = EVICTIONS.value(reason="size")
+        channel = RetrievalMemoryChannel()
+        channel.update([write(entry("a", last_used_at=1), entry("b", last_used_at=3), entry("c", last_used_at=2), max_entries=2)])
+        assert sorted(channel.get()) == ["b", "c"]
+
+        channel.update([write(entry("d", "x" * 8, last_used_at=4), max_entries=5, max_chars=12)])
+        assert sorted(channel.get()) == ["b", "d"]
+        assert EVICTIONS.value(reason="entries") == entries_before + 1
+        assert EVICTIONS.value(reason="size") == size_before + 1
+
+    def test_drops_expired_entries(self):
+        """Test that entries retrieved longer ago than the TTL of the write are dropped."""
+        expired = EVICTIONS.value(reason="expired")
+        channel = RetrievalMemoryChannel()
+        channel.update([write(entry("a", stored_at=time.time() - 120), entry("b"))])
+        assert sorted(channel.get()) == ["a", "b"]
+
+        channel.update([RetrievalMemoryUpdate(entries=[entry("c")], max_entries=10, max_chars=1000, ttl=60)])
+        assert sorted(channel.get()) == ["b", "c"]
+        assert EVICTIONS.value(reason="expired") == expired + 1
+
+    def test_empty_write_clears(self):
+        """Test that an empty dict resets the memory."""
+        channel = RetrievalMemoryChannel()
+        channel.update([write(entry("a"))])
+        channel.update([{}])
+        assert channel.get() == {}
+
+    def test_checkpoint_round_trip(self):
+        """Test that the memory survives the compact checkpoint serializer."""
+        channel = RetrievalMemoryChannel()
+        channel.update([write(entry("a", PASSAGE * 50))])
+        serde = ChatbotSerializer()
+        restored = RetrievalMemoryChannel().from_checkpoint(serde.loads_typed(serde.dumps_typed(channel.checkpoint())))
+        assert restored.get() == channel.get()
+
+
+class TestRetrievalMemory:
+    """Tests for recalling and reusing remembered tool results."""
+
+    def test_recall_needs_coverage(self):
+        """Test that passages are recalled only when they cover the request."""
+        memory = RetrievalMemory({"a": entry("a", PASSAGE)}, Configuration(retrieval_memory_min_coverage=0.8))
+        answered = RECALLS.value(outcome="answered")
+        retrieved = RECALLS.value(outcome="retrieved")
+
+        assert [e.key for e in memory.recall(QUESTION, "X-Series")] == ["a"]
+        assert memory.recall("How do I paginate webhook deliveries?", "X-Series") == []
+        assert memory.recall(QUESTION, "Other-Product") == []
+        assert RECALLS.value(outcome="answered") == answered + 1
+        assert RECALLS.value(outcome="retrieved") == retrieved + 2
+
+        update = memory.update()
+        assert update.entries[0].uses == 1 and update.entries[0].last_used_at > 0
+
+    def test_recall_disabled(self):
+        """Test that a zero coverage threshold never answers from memory."""
+        memory = RetrievalMemory({"a": entry("a", PASSAGE)}, Configuration(retrieval_memory_min_coverage=0))
+        assert memory.recall(QUESTION, "X-Series") == []
+
+    def test_tool_results_are_reused_and_stored(self):
+        """Test that a repeated tool call is answered from memory and new results are collected."""
+        key = memory_key("search", {"query": "rotate key"})
+        memory = RetrievalMemory({key: entry(key, PASSAGE)}, Configuration())
+        reused = TOOL_RESULTS.value(outcome="reused")
+
+        assert memory.tool_result("search", {"query": "rotate key"}) == PASSAGE
+        assert memory.tool_result("search", {"query": "other"}) is None
+        memory.store("search", {"query": "other"}, "X-Series", "found")
+        assert TOOL_RESULTS.value(outcome="reused") == reused + 1
+        assert sorted(e.content for e in memory.update().entries) == sorted(["found", PASSAGE])
+
+    def test_expired_entries_are_not_reused(self):
+        """Test that results retrieved longer ago than the TTL are neither recalled nor reused."""
+        key = memory_key("search", {"query": "rotate key"})
+        stale = {key: entry(key, PASSAGE, stored_at=time.time() - 120)}
+        memory = RetrievalMemory(stale, Configuration(retrieval_memory_ttl=60))
+
+        assert memory.recall(QUESTION, "X-Series") == []
+        assert memory.tool_result("search", {"query": "rotate key"}) is None
+        assert RetrievalMemory(stale, Configuration(retrieval_memory_ttl=0)).tool_result("search", {"query": "rotate key"}) == PASSAGE
+
+    def test_oversized_result_not_stored(self):
+        """Test that a result over the size limit is not remembered."""
+        memory = RetrievalMemory({}, Configuration(retrieval_memory_max_chars=10))
+        memory.store("search", {}, None, "x" * 11)
+        assert memory.update() is None
+
+
+class TestResponseAgentMemory:
+    """Tests for the response agent with a retrieval memory."""
+
+    @pytest.mark.asyncio
+    async def test_answers_from_memory_without_tools(self, searching):
+        """Test that a covered follow-up is answered without a tool round."""
+        model, tool = searching
+        memory = RetrievalMemory({"a": entry("a", PASSAGE)}, Configuration())
+
+        response_item, iterations = await chatbot.run_response_agent(item(), Configuration(), memory=memory)
+
+        assert response_item.response_found
+        assert iterations == 0
+        assert (model.tool_rounds, tool.calls) == (0, 0)
+        assert PASSAGE in model.prompts[-1].content
+
+    @pytest.mark.asyncio
+    async def test_retrieves_when_memory_does_not_cover(self, searching):
+        """Test that an uncovered request runs the tool loop and remembers the result."""
+        model, tool = searching
+        memory = RetrievalMemory({"a": entry("a", "webhook pagination")}, Configuration())
+
+        _, iterations = await chatbot.run_response_agent(item(), Configuration(), memory=memory)
+
+        assert iterations == 1 and tool.calls == 1
+        assert [e.content for e in memory.update().entries] == [PASSAGE]
+
+    @pytest.mark.asyncio
+    async def test_follow_up_turn_reuses_thread_memory(self, searching):
+        """Test that the second turn of a thread is answered from the first turn's retrieval."""
+        model, tool = searching
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {"thread_id": "memory", "enable_request_coalescing": False}}
+
+        await graph.ainvoke({"messages": [HumanMessage(content=QUESTION)]}, config=config)
+        result = await graph.ainvoke({"messages": [HumanMessage(content=f"Again: {QUESTION}")]}, config=config)
+
+        assert tool.calls == 1
+        assert model.tool_rounds == 1
+        assert shared("memory", list(result["retrieval_memory"])) == {}
+        assert [e.content for e in result["retrieval_memory"].values()] == [PASSAGE]
+        assert result["retrieval_memory"].popitem()[1].uses == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_turn_forgets_shared_memory(self, searching):
+        """Test that a turn cancelled mid fan-out drops the memory it shared with its agents."""
+        model, _ = searching
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {"thread_id": "cancelled", "enable_request_coalescing": False}}
+        result = await graph.ainvoke({"messages": [HumanMessage(content=QUESTION)]}, config=config)
+        keys = list(result["retrieval_memory"])
+
+        model.delay = 0.3
+        turn = await TurnRegistry().start(
+            graph, config, [HumanMessage(content=QUESTION)], lambda state, config: graph.ainvoke(state, config=config)
+        )
+        await asyncio.sleep(0.1)
+        assert sorted(shared("cancelled", keys)) == keys
+        turn.task.cancel()
+        await asyncio.wait([turn.task])
+
+        assert shared("cancelled", keys) == {}
+
+    @pytest.mark.asyncio
+    async def test_fan_out_payloads_carry_keys(self):
+        """Test that Send payloads carry memory keys and the agents resolve them in process."""
+        memory = {"a": entry("a"), "b": entry("b", product_id="Y-Series")}
+        state = {"request_items": {"1": item()}, "retrieval_memory": memory}
+        config = {"configurable": {"thread_id": "keys"}}
+
+        (send,) = await chatbot.fan_out_requests(state, config)
+
+        assert send.arg["retrieval_memory"] == ["a"]
+        assert shared("keys", send.arg["retrieval_memory"]) == {"a": memory["a"]}
+        assert shared("elsewhere", send.arg["retrieval_memory"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_memory_disabled(self, searching):
+        """Test that every turn retrieves with the retrieval memory disabled."""
+        model, tool = searching
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {"thread_id": "no-memory", "enable_request_coalescing": False, "enable_retrieval_memory": False}}
+
+        for _ in range(2):
+            result = await graph.ainvoke({"messages": [HumanMessage(content=QUESTION)]}, config=config)
+
+        assert tool.calls == 2
+        assert result["retrieval_memory"] == {}
@@ -0,0 +1,132 @@
+"""Tests for the compact checkpoint serializer."""
+
+import ormsgpack
+import pytest
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from src.api_support_chatbot.configuration import CheckpointCompression
+from src.api_support_chatbot.serde import SCHEMA_VERSION, TYPE_TAG, ChatbotSerializer
+from src.api_support_chatbot.state import (
+    AssembledResponse,
+    RequestDetails,
+    RequestItem,
+    ResponseItem,
+    mark_transient,
+)
+
+
+def round_trip(serde, value):
+    type_, data = serde.dumps_typed(value)
+    return type_, data, serde.loads_typed((type_, data))
+
+
+def messages():
+    final = AIMessage(content="final answer \n\n anything else?", id="a-2")
+    final.additional_kwargs = {"artifact": {"final_response": True}}
+    return [
+        HumanMessage(content="How do I rotate my key?", id="h-1"),
+        mark_transient(AIMessage(content="Working on your request...")),
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "retrieve_support_context", "args": {"query": "rotate"}, "id": "call-1"}],
+            usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15},
+            response_metadata={"model_name": "gpt-4o", "finish_reason": "tool_calls"},
+        ),
+        ToolMessage(content="context", tool_call_id="call-1", artifact={"source": "docs"}, status="error"),
+        SystemMessage(content=[{"type": "text", "text": "system"}]),
+        AIMessageChunk(content="partial", name="assembler"),
+        RemoveMessage(id="h-0"),
+        final,
+    ]
+
+
+class TestChatbotSerializer:
+    """Tests for ChatbotSerializer."""
+
+    def test_messages_round_trip_exactly(self):
+        """Test every message keeps its type and all of its fields."""
+        serde = ChatbotSerializer()
+        original = messages()
+
+        type_, _, restored = round_trip(serde, original)
+
+        assert type_ == TYPE_TAG
+        assert [type(m) for m in restored] == [type(m) for m in original]
+        assert restored == original
+        assert [m.model_dump() for m in restored] == [m.model_dump() for m in original]
+
+    def test_state_models_round_trip(self):
+        """Test the state's pydantic models and id-keyed item channels round-trip."""
+        serde = ChatbotSerializer()
+        items = {
+            "r1": ResponseItem(request_id="r1", request_text="q", response_text="a", response_found=True, pending=True),
+            "r2": ResponseItem(request_id="r2", error=True),
+        }
+        values = [
+            items,
+            {"q1": RequestItem(id="q1", request_text="q", category="How-To", product_id="X-Series")},
+            RequestDetails(valid_request_received=True, produtct_id="X-Series"),
+            AssembledResponse(response_text="answer"),
+            {},
+            [],
+        ]
+
+        for value in values:
+            type_, _, restored = round_trip(serde, value)
+            assert type_ == TYPE_TAG
+            assert restored == value
+
+    def test_appended_model_fields_get_defaults(self):
+        """Test a model encoded before a field was appended loads with the field's default."""
+        serde = ChatbotSerializer()
+        _, data = serde.dumps_typed(ResponseItem(request_id="r1", error=True))
+        version, (tag, index, fields) = ormsgpack.unpackb(data)
+        older = ormsgpack.packb([version, [tag, index, fields[:-1]]])
+
+        restored = serde.loads_typed((TYPE_TAG, older))
+
+        assert restored.error and restored.attempts == 1
+
+    def test_long_text_is_compressed(self):
+        """Test text over the threshold is stored compressed and restored."""
+        text = "Rotate the key in the console, then revoke the old key. " * 50
+        plain = ChatbotSerializer(CheckpointCompression.NONE)
+        compressed = ChatbotSerializer(CheckpointCompression.ZLIB, compression_threshold=256)
+        value = [HumanMessage(content=text), AssembledResponse(response_text=text)]
+
+        _, plain_data, _ = round_trip(plain, value)
+        _, data, restored = round_trip(compressed, value)
+
+        assert len(data) < len(plain_data) / 4
+        assert restored == value
+
+    def test_zstd_compression(self):
+        """Test zstd-compressed text round-trips."""
+        pytest.importorskip("zstandard")
+        serde = ChatbotSerializer(CheckpointCompression.ZSTD, compression_threshold=64)
+        value = [AIMessage(content="x" * 1000)]
+
+        assert round_trip(serde, value)[2] == value
+
+    def test_other_values_use_default_serializer(self):
+        """Test values that are not made of state types fall back to JsonPlusSerializer."""
+        serde = ChatbotSerializer()
+
+        for value in (3, None, {"clarification_attempts": 1}, ["text", HumanMessage(content="hi")]):
+            type_, _, restored = round_trip(serde, value)
+            assert type_ != TYPE_TAG
+            assert restored == value
+
+    def test_newer_schema_is_rejected(self):
+        """Test a checkpoint written by a newer schema version is not misread."""
+        payload = ormsgpack.packb([SCHEMA_VERSION + 1, [2, []]])
+
+        with pytest.raises(ValueError):
+            ChatbotSerializer().loads_typed((TYPE_TAG, payload))
@@ -0,0 +1,244 @@
+"""Tests for the HTTP service."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage
+from starlette.requests import ClientDisconnect
+
+import src.api_support_chatbot.server as server
+from src.api_support_chatbot.configuration import clear_configuration_cache
+from src.api_support_chatbot.server import _sse_event, app
+
+
+class FakeCheckpointer:
+    def __init__(self):
+        self.deleted = []
+
+    async def adelete_thread(self, thread_id):
+        self.deleted.append(thread_id)
+
+
+class FakeGraph:
+    """Minimal stand-in for the compiled chatbot graph."""
+
+    def __init__(self, delay=0.0):
+        self.configs = []
+        self.delay = delay
+        self.checkpointer = FakeCheckpointer()
+        self.state = None
+
+    async def aget_state(self, config):
+        return self.state
+
+    async def ainvoke(self, state, config):
+        self.configs.append(config)
+        await asyncio.sleep(self.delay)
+        result = {"messages": state["messages"] + [AIMessage(content="answer")]}
+        checkpoint = {"configurable": {**config["configurable"], "checkpoint_id": str(len(self.configs))}}
+        self.state = SimpleNamespace(values=result, config=checkpoint)
+        return result
+
+    async def astream(self, state, config, stream_mode):
+        self.configs.append(config)
+        yield {"get_request_details": {"messages": [AIMessage(content="Working on your request...")]}}
+        await asyncio.sleep(self.delay)
+        final = AIMessage(content="answer")
+        final.additional_kwargs = {"artifact": {"final_response": True}}
+        yield {"assemble_final_response": {"messages": [final]}}
+
+
+@pytest.fixture
+def fake_graph():
+    graph = FakeGraph()
+    app.state.graph = graph
+    return graph
+
+
+@pytest.fixture
+def client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestServer:
+    """Tests for the FastAPI service endpoints."""
+
+    def test_sse_event_format(self):
+        """Test Server-Sent Event framing."""
+        assert _sse_event("end", {"a": 1}) == 'event: end\ndata: {"a": 1}\n\n'
+
+    @pytest.mark.asyncio
+    async def test_post_message_uses_thread_config(self, fake_graph, client):
+        """Test that a message is run on the requested thread."""
+        async with client:
+            response = await client.post("/threads/t-1/messages", json={"message": "hi"})
+
+        assert response.status_code == 200
+        assert response.json() == {"thread_id": "t-1", "response": "answer"}
+        assert fake_graph.configs[0]["configurable"]["thread_id"] == "t-1"
+
+    @pytest.mark.asyncio
+    async def test_stream_message_emits_events(self, fake_graph, client):
+        """Test that streaming emits node, message and end events."""
+        async with client:
+            response = await client.post("/threads/t-2/stream", json={"message": "hi"})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line for line in response.text.splitlines() if line.startswith("event:")]
+        assert events == [
+            "event: node",
+            "event: message",
+            "event: node",
+            "event: message",
+            "event: end",
+        ]
+        assert '"final": true' in response.text
+
+    @pytest.mark.asyncio
+    async def test_create_thread(self, fake_graph, client):
+        """Test thread creation returns a fresh id."""
+        async with client:
+            first = (await client.post("/threads")).json()["thread_id"]
+            second = (await client.post("/threads")).json()["thread_id"]
+        assert first != second
+
+    @pytest.mark.asyncio
+    async def test_new_message_supersedes_in_flight_turn(self, client):
+        """Test that a second message cancels the first turn, which answers 409."""
+        graph = FakeGraph(delay=0.5)
+        app.state.graph = graph
+
+        async with client:
+            first = asyncio.create_task(client.post("/threads/t-3/messages", json={"message": "hi"}))
+            await asyncio.sleep(0.1)
+            second = await client.post("/threads/t-3/messages", json={"message": "I meant the other key"})
+            first = await first
+
+        assert first.status_code == 409
+        assert second.status_code == 200
+        assert graph.checkpointer.deleted == ["t-3"]
+        assert [c["configurable"]["thread_id"] for c in graph.configs] == ["t-3", "t-3"]
+
+    @pytest.mark.asyncio
+    async def test_superseded_stream_emits_event(self, client):
+        """Test that a superseded stream ends with a superseded event."""
+        graph = FakeGraph(delay=0.5)
+        app.state.graph = graph
+
+        async with client:
+            first = asyncio.create_task(client.post("/threads/t-4/stream", json={"message": "hi"}))
+            await asyncio.sleep(0.1)
+            second = await client.post("/threads/t-4/stream", json={"message": "correction"})
+            first = await first
+
+        assert "event: superseded" in first.text
+        assert "event: end" not in first.text
+        assert "event: end" in second.text
+
+    @pytest.mark.asyncio
+    async def test_debounce_merges_burst(self, client, monkeypatch):
+        """Test that a burst of messages is answered by one turn."""
+        monkeypatch.setenv("MESSAGE_DEBOUNCE_WINDOW", "0.2")
+        clear_configuration_cache()
+        graph = FakeGraph()
+        app.state.graph = graph
+
+        async def send(text, delay):
+            await asyncio.sleep(delay)
+            return await client.post("/threads/t-5/messages", json={"message": text})
+
+        try:
+            async with client:
+                first, second = await asyncio.gather(send("my key", 0), send("expired", 0.05))
+        finally:
+            clear_configuration_cache()
+
+        assert len(graph.configs) == 1
+        assert first.json()["response"] == second.json()["response"] == "answer"
+
+    @pytest.mark.asyncio
+    async def test_overload_rejects_with_retry_after(self, fake_graph, client, monkeypatch):
+        """Test that a rejected turn answers 503 with Retry-After."""
+        monkeypatch.setenv("DEGRADATION_MODE", "reject")
+        monkeypatch.setenv("ADMISSION_RETRY_AFTER", "9")
+        clear_configuration_cache()
+        try:
+            async with client:
+                response = await client.post("/threads/t-6/messages", json={"message": "hi"})
+                stream = await client.post("/threads/t-6/stream", json={"message": "hi"})
+        finally:
+            clear_configuration_cache()
+
+        assert response.status_code == stream.status_code == 503
+        assert response.headers["retry-after"] == "9"
+        assert fake_graph.configs == []
+
+    @pytest.mark.asyncio
+    async def test_stream_disconnect_releases_admission(self, fake_graph):
+        """Test that a stream the client drops before it starts gives its admission slot back."""
+        in_flight = server.admission_controller.in_flight
+        request = SimpleNamespace(app=app)
+        response = await server.stream_message("t-8", server.MessageRequest(message="hi"), request)
+        assert server.admission_controller.in_flight == in_flight + 1
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise OSError("connection reset")
+
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+        assert server.admission_controller.in_flight == in_flight
+        assert fake_graph.configs == []
+
+    @pytest.mark.asyncio
+    async def test_turn_runs_in_admitted_mode(self, fake_graph, client, monkeypatch):
+        """Test that the degradation mode of an admitted turn is passed to the graph."""
+        monkeypatch.setenv("DEGRADATION_MODE", "cap_fan_out")
+        clear_configuration_cache()
+        try:
+            async with client:
+                await client.post("/threads/t-7/messages", json={"message": "hi"})
+        finally:
+            clear_configuration_cache()
+
+        assert fake_graph.configs[0]["configurable"]["degradation_mode"] == "cap_fan_out"
+
+    @pytest.mark.asyncio
+    async def test_profiler_toggled_at_run_time(self, client):
+        """Test the node profiler can be started, dumped and stopped over HTTP."""
+        async with client:
+            started = await client.post("/debug/profile", json={"enabled": True, "interval": 0.01})
+            profile = await client.get("/debug/profile")
+            stopped = await client.post("/debug/profile", json={"enabled": False})
+
+        assert started.json()["enabled"] is True
+        assert started.json()["interval_s"] == 0.01
+        assert profile.status_code == 200
+        assert profile.headers["content-type"].startswith("text/plain")
+        assert stopped.json()["enabled"] is False
+
+
+class TestMain:
+    """Tests for the service entry point."""
+
+    def test_refuses_workers_with_in_memory_checkpoints(self, monkeypatch):
+        """Test that several workers are only started with per-worker checkpoints allowed explicitly."""
+        runs = []
+        monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: runs.append(kwargs))
+        monkeypatch.delenv("SERVER_PER_WORKER_CHECKPOINTS", raising=False)
+
+        monkeypatch.setattr("sys.argv", ["server", "--workers", "2"])
+        with pytest.raises(SystemExit):
+            server.main()
+        assert runs == []
+
+        monkeypatch.setattr("sys.argv", ["server", "--workers", "2", "--per-worker-checkpoints"])
+        server.main()
+        monkeypatch.setattr("sys.argv", ["server"])
+        server.main()
+        assert [run["workers"] for run in runs] == [2, 1]
@@ -0,0 +1,185 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import time
+
+import pytest
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.retrieval_memory import RetrievalMemory, RetrievedContext
+from src.api_support_chatbot.singleflight import (
+    SingleFlight,
+    normalize_text,
+    request_fingerprint,
+    response_singleflight,
+)
+from src.api_support_chatbot.state import RequestItem, ResponseItem
+from src.api_support_chatbot.telemetry import REGISTRY
+
+
+class TestFingerprint:
+    """Tests for request fingerprinting."""
+
+    def test_normalize_text(self):
+        """Test case, whitespace and edge punctuation normalization."""
+        assert normalize_text("  Webhooks   NOT firing?! ") == "webhooks not firing"
+        assert normalize_text(None) == ""
+
+    def test_equivalent_requests_share_fingerprint(self):
+        """Test that cosmetic differences do not change the fingerprint."""
+        fp1 = request_fingerprint("X-Series", "Technical", "Webhooks not firing")
+        fp2 = request_fingerprint("x-series", "technical", "  webhooks  not firing? ")
+        assert fp1 == fp2
+
+    def test_different_product_changes_fingerprint(self):
+        """Test that product id is part of the fingerprint."""
+        fp1 = request_fingerprint("X-Series", "Technical", "Webhooks not firing")
+        fp2 = request_fingerprint("R-Series", "Technical", "Webhooks not firing")
+        assert fp1 != fp2
+
+    def test_scope_separates_settings(self):
+        """Test that the same request under other settings gets another fingerprint."""
+        fp = request_fingerprint("X-Series", "Technical", "Webhooks not firing")
+        assert request_fingerprint("X-Series", "Technical", "Webhooks not firing", "") == fp
+        assert request_fingerprint("X-Series", "Technical", "Webhooks not firing", "abc") != fp
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_coalesced(self):
+        """Test that concurrent identical calls run the computation once."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        results = await asyncio.gather(*[flight.do("k", compute, 1.0) for _ in range(5)])
+
+        assert calls == 1
+        assert [r for r, _ in results] == ["answer"] * 5
+        assert sum(1 for _, shared in results if shared) == 4
+        assert flight.stats()["coalesced"] == 4
+        assert "in_flight" not in flight.stats()
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout_falls_back(self):
+        """Test that followers run independently after the bounded wait."""
+        flight = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            return "slow"
+
+        async def fast():
+            return "fast"
+
+        leader = asyncio.create_task(flight.do("k", slow, 1.0))
+        await asyncio.sleep(0)
+        result, shared = await flight.do("k", fast, 0.01)
+
+        assert (result, shared) == ("fast", False)
+        assert flight.stats()["fallback_timeout"] == 1
+        assert await leader == ("slow", False)
+
+    @pytest.mark.asyncio
+    async def test_leader_error_falls_back(self):
+        """Test that a failed leader does not propagate its error to followers."""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        async def ok():
+            return "ok"
+
+        leader = asyncio.create_task(flight.do("k", failing, 1.0))
+        await asyncio.sleep(0)
+        result, shared = await flight.do("k", ok, 1.0)
+
+        assert (result, shared) == ("ok", False)
+        assert flight.stats()["fallback_error"] == 1
+        with pytest.raises(RuntimeError):
+            await leader
+
+    def test_in_flight_is_exported_as_gauge(self):
+        """Test that the in-flight level is its own gauge, not an outcome of the event counts."""
+        text = REGISTRY.render()
+
+        assert "chatbot_response_coalescing_in_flight 0" in text
+        assert 'outcome="in_flight"' not in text
+
+
+class TestRespondToItem:
+    """Tests for coalescing response agent calls across threads."""
+
+    @pytest.fixture
+    def agent(self, monkeypatch):
+        calls = []
+
+        async def run_response_agent(request_item, configuration, deadline=None, memory=None):
+            calls.append(configuration)
+            await asyncio.sleep(0.05)
+            response = ResponseItem(
+                request_id=request_item.id, request_text=request_item.request_text, product_id=request_item.product_id,
+                response_text=f"answer from {configuration.azure_openai_deployment_name}",
+                response_found=True, confidence=0.9,
+            )
+            return response, 1
+
+        monkeypatch.setattr(chatbot, "run_response_agent", run_response_agent)
+        return calls
+
+    async def respond(self, *configurations, memories=None):
+        memories = memories or [None] * len(configurations)
+        return await asyncio.gather(*[
+            chatbot.respond_to_item(
+                RequestItem(id=f"i{n}", request_text="Webhooks not firing", category="Technical", product_id="X-Series"),
+                configuration,
+                memory=memory,
+            )
+            for n, (configuration, memory) in enumerate(zip(configurations, memories))
+        ])
+
+    @pytest.mark.asyncio
+    async def test_same_settings_coalesce(self, agent):
+        """Test that identical items of threads with the same settings run once."""
+        results = await self.respond(Configuration(), Configuration())
+
+        assert len(agent) == 1
+        assert [r.request_id for r, _ in results] == ["i0", "i1"]
+        assert response_singleflight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_different_settings_do_not_coalesce(self, agent):
+        """Test that threads with another deployment or MCP servers get their own answer."""
+        base = Configuration(azure_openai_deployment_name="tenant-a")
+        results = await self.respond(
+            base,
+            Configuration(azure_openai_deployment_name="tenant-b"),
+            base.model_copy(update={"mcp_servers": {}}),
+        )
+
+        assert len(agent) == 3
+        assert [r.response_text for r, _ in results][:2] == ["answer from tenant-a", "answer from tenant-b"]
+
+    @pytest.mark.asyncio
+    async def test_thread_memory_is_not_shared(self, agent):
+        """Test that an answer built from a thread's retrieval memory is not shared."""
+        configuration = Configuration()
+        remembered = RetrievedContext(
+            key="a", tool="search", args={}, product_id="X-Series", content="webhooks", stored_at=time.time(),
+        )
+        memory = RetrievalMemory({"a": remembered}, configuration)
+
+        await self.respond(configuration, configuration, memories=[memory, None])
+
+        assert len(agent) == 2
@@ -0,0 +1,75 @@
+"""Tests for the keyed item channels and post-turn state pruning."""
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.state import KeyedItemsChannel, ResponseItem, is_transient
+
+
+def response(request_id, text="ok"):
+    return ResponseItem(request_id=request_id, response_text=text, response_found=True)
+
+
+@pytest.fixture
+def fake_models(fake_model):
+    fake_model(items=[f"question {i}" for i in range(3)], follow_up_question="anything else?")
+
+
+class TestKeyedItemsChannel:
+    """Tests for KeyedItemsChannel."""
+
+    def test_merges_writes_by_id(self):
+        """Test that one super-step of writes is merged into the mapping."""
+        channel = KeyedItemsChannel()
+        assert channel.update([response("a"), response("b"), [response("c")]])
+        assert list(channel.get()) == ["a", "b", "c"]
+
+    def test_replaces_same_id(self):
+        """Test that a write for an existing id replaces the item."""
+        channel = KeyedItemsChannel()
+        channel.update([response("a", "old")])
+        channel.update([response("a", "new")])
+        assert channel.get()["a"].response_text == "new"
+
+    def test_empty_write_clears(self):
+        """Test that an empty list or dict resets the channel."""
+        channel = KeyedItemsChannel()
+        channel.update([response("a")])
+        assert channel.update([{}])
+        assert channel.get() == {}
+        assert not channel.update([])
+
+    def test_copy_does_not_share_updates(self):
+        """Test that updating a copy leaves the original untouched."""
+        channel = KeyedItemsChannel()
+        channel.update([response("a")])
+        copied = channel.copy()
+        copied.update([response("b")])
+        assert list(channel.get()) == ["a"]
+        assert list(copied.get()) == ["a", "b"]
+
+    def test_restores_legacy_list_checkpoint(self):
+        """Test that list values from older checkpoints are keyed on load."""
+        channel = KeyedItemsChannel().from_checkpoint([response("a"), response("b")])
+        assert list(channel.get()) == ["a", "b"]
+
+
+class TestStatePruning:
+    """Tests for state pruning after a committed turn."""
+
+    @pytest.mark.asyncio
+    async def test_turn_prunes_scratch_state(self, fake_models):
+        """Test that a completed turn leaves only the conversation and the answer."""
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {"thread_id": "prune", "enable_request_coalescing": False}}
+
+        for turn in range(2):
+            result = await graph.ainvoke({"messages": [HumanMessage(content=f"hi {turn}")]}, config=config)
+
+        assert result["request_items"] == {}
+        assert result["response_items"] == {}
+        assert result["request_details"] is None
+        assert result["assembled_response"].response_text == "final answer"
+        assert not any(is_transient(m) for m in result["messages"])
+        assert [m.type for m in result["messages"]] == ["human", "ai", "human", "ai"]
@@ -0,0 +1,105 @@
+"""Tests for tracing spans and Prometheus metrics."""
+
+import inspect
+
+import pytest
+
+from src.api_support_chatbot.telemetry import (
+    NODE_DURATION,
+    InMemorySpanExporter,
+    MetricsRegistry,
+    add_span_exporter,
+    remove_span_exporter,
+    span,
+    traced_node,
+)
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    add_span_exporter(exporter)
+    yield exporter
+    remove_span_exporter(exporter)
+
+
+class TestMetrics:
+    """Tests for the metrics registry."""
+
+    def test_histogram_render(self):
+        """Test cumulative buckets, sum and count in the text format."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ["node"], buckets=[0.1, 1.0])
+        histogram.observe(0.05, node="a")
+        histogram.observe(0.5, node="a")
+
+        text = registry.render()
+
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{node="a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{node="a",le="1"} 2' in text
+        assert 'latency_seconds_bucket{node="a",le="+Inf"} 2' in text
+        assert 'latency_seconds_sum{node="a"} 0.55' in text
+        assert 'latency_seconds_count{node="a"} 2' in text
+
+    def test_counter_and_gauge_callback(self):
+        """Test counters and scrape-time gauges."""
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors", ["node"]).inc(node="x")
+        registry.gauge("in_flight", "In flight", ["kind"], callback=lambda: {("a",): 3})
+
+        text = registry.render()
+
+        assert 'errors_total{node="x"} 1' in text
+        assert 'in_flight{kind="a"} 3' in text
+
+    def test_registration_is_idempotent(self):
+        """Test that registering a metric twice returns the same instance."""
+        registry = MetricsRegistry()
+        assert registry.counter("c", "C") is registry.counter("c", "C")
+
+
+class TestTracing:
+    """Tests for spans and exporters."""
+
+    def test_nested_spans_share_trace(self, exporter):
+        """Test that child spans link to their parent and inherit ids."""
+        with span("node.generate_response", thread_id="t1", request_item_id="abc") as parent:
+            with span("tool_call", tool="retrieve_support_context", iteration=1):
+                pass
+
+        child, root = exporter.get_finished_spans()
+        assert child.parent_id == root.span_id == parent.span_id
+        assert child.trace_id == root.trace_id
+        assert child.attributes["thread_id"] == "t1"
+        assert child.attributes["request_item_id"] == "abc"
+        assert child.attributes["iteration"] == 1
+        assert child.end_ns >= child.start_ns
+
+    def test_span_records_error(self, exporter):
+        """Test that exceptions mark the span as failed."""
+        with pytest.raises(ValueError):
+            with span("model_call"):
+                raise ValueError("bad")
+
+        (finished,) = exporter.get_finished_spans()
+        assert finished.status == "ERROR"
+        assert "bad" in finished.error
+
+    @pytest.mark.asyncio
+    async def test_traced_node(self, exporter):
+        """Test node spans carry thread id and the signature is preserved."""
+
+        @traced_node("test_node")
+        async def node(state, config):
+            return state
+
+        assert list(inspect.signature(node).parameters) == ["state", "config"]
+        before = NODE_DURATION.count(node="test_node")
+
+        await node({"x": 1}, config={"configurable": {"thread_id": "t9"}})
+
+        (finished,) = exporter.get_finished_spans()
+        assert finished.name == "node.test_node"
+        assert finished.attributes["thread_id"] == "t9"
+        assert NODE_DURATION.count(node="test_node") == before + 1
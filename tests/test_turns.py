@@ -0,0 +1,109 @@
+"""Tests for per-thread turn supersession."""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.api_support_chatbot.chatbot as chatbot
+from src.api_support_chatbot.telemetry import NODE_CANCELLATIONS
+from src.api_support_chatbot.turns import SUPERSEDED_TURNS, Superseded, TurnRegistry
+
+ANSWER = "final answer \n\n anything else?"
+
+
+@pytest.fixture
+def slow_model(fake_model):
+    # Response agents take a while, so that a turn can be superseded mid fan-out
+    return fake_model(delay=0.3, follow_up_question="anything else?")
+
+
+def run_graph(graph):
+    return lambda state, config: graph.ainvoke(state, config=config)
+
+
+async def supersede(registry, graph, config, first, second):
+    first_turn = await registry.start(graph, config, [HumanMessage(content=first)], run_graph(graph))
+    await asyncio.sleep(0.1)
+    second_turn = await registry.start(graph, config, [HumanMessage(content=second)], run_graph(graph))
+    with pytest.raises(Superseded):
+        await first_turn.result()
+    return await second_turn.result()
+
+
+class TestTurnSupersession:
+    """Tests for TurnRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_supersedes_first_turn(self, slow_model):
+        """Test that superseding the first turn of a thread restarts from an empty thread."""
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {"thread_id": "supersede-first", "enable_request_coalescing": False}}
+        superseded = SUPERSEDED_TURNS.value()
+        cancelled = NODE_CANCELLATIONS.value(node="generate_response")
+
+        result = await supersede(TurnRegistry(), graph, config, "rotate my key", "the staging key")
+
+        assert [(m.type, m.content) for m in result["messages"]] == [
+            ("human", "rotate my key"),
+            ("human", "the staging key"),
+            ("ai", ANSWER),
+        ]
+        assert len(slow_model.assembled) == 1
+        assert SUPERSEDED_TURNS.value() == superseded + 1
+        assert NODE_CANCELLATIONS.value(node="generate_response") == cancelled + 1
+
+    @pytest.mark.asyncio
+    async def test_restarts_from_last_committed_turn(self, slow_model):
+        """Test that a superseded turn leaves no trace after the last committed turn."""
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {"thread_id": "supersede-later", "enable_request_coalescing": False}}
+        await graph.ainvoke({"messages": [HumanMessage(content="hello")]}, config=config)
+
+        await supersede(TurnRegistry(), graph, config, "rotate my key", "the staging key")
+
+        snapshot = await graph.aget_state(config)
+        assert [m.content for m in snapshot.values["messages"]] == [
+            "hello", ANSWER, "rotate my key", "the staging key", ANSWER,
+        ]
+        assert snapshot.next == ()
+
+    @pytest.mark.asyncio
+    async def test_waits_when_supersession_disabled(self, slow_model):
+        """Test that without supersession the new turn runs after the in-flight one."""
+        graph = chatbot.create_chatbot_graph()
+        config = {"configurable": {"thread_id": "no-supersede", "enable_request_coalescing": False}}
+        registry = TurnRegistry()
+
+        first = await registry.start(graph, config, [HumanMessage(content="one")], run_graph(graph), supersede=False)
+        await asyncio.sleep(0.1)
+        second = await registry.start(graph, config, [HumanMessage(content="two")], run_graph(graph), supersede=False)
+
+        await first.result()
+        result = await second.result()
+        assert [m.content for m in result["messages"]] == ["one", ANSWER, "two", ANSWER]
+        assert registry.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_thread_lock_is_kept_for_woken_waiters(self):
+        """Test that a caller arriving while a woken waiter re-acquires the lock still waits its turn."""
+        registry = TurnRegistry()
+        inside, most = 0, 0
+
+        async def hold():
+            nonlocal inside, most
+            async with registry.exclusive("t"):
+                inside += 1
+                most = max(most, inside)
+                await asyncio.sleep(0.02)
+                inside -= 1
+
+        first = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        second = asyncio.create_task(hold())
+        await first
+        third = asyncio.create_task(hold())
+        await asyncio.gather(second, third)
+
+        assert most == 1
+        assert registry._locks == {}
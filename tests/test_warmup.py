@@ -0,0 +1,86 @@
+"""Tests for worker warm-up and readiness."""
+
+import httpx
+import pytest
+
+import src.api_support_chatbot.warmup as warmup
+from src.api_support_chatbot.clients import get_model_with_tools, get_structured_model
+from src.api_support_chatbot.configuration import Configuration
+from src.api_support_chatbot.server import app
+from src.api_support_chatbot.state import RequestDetails
+
+
+class FakeModel:
+    def __init__(self):
+        self.built = 0
+
+    def with_structured_output(self, schema):
+        self.built += 1
+        return (self, schema)
+
+    def bind_tools(self, tools):
+        self.built += 1
+        return (self, tuple(tools))
+
+
+@pytest.fixture
+def fake_steps(monkeypatch):
+    calls = []
+
+    async def ok(configuration):
+        calls.append("ok")
+
+    async def fail(configuration):
+        raise ConnectionError("unreachable")
+
+    monkeypatch.setattr(warmup, "_build_runnables", ok)
+    monkeypatch.setattr(warmup, "_open_connections", fail)
+    monkeypatch.setattr(warmup, "_load_mcp_tools", ok)
+    monkeypatch.setattr(warmup, "_probe_completion", ok)
+    return calls
+
+
+class TestWarmup:
+    """Tests for warm_up and the readiness probe."""
+
+    def test_derived_runnables_are_built_once(self):
+        """Test that structured-output and tool-bound runnables are cached per model."""
+        model, tools = FakeModel(), ["tool"]
+
+        assert get_structured_model(model, RequestDetails) is get_structured_model(model, RequestDetails)
+        assert get_model_with_tools(model, tools) is get_model_with_tools(model, tools)
+        assert model.built == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_step_does_not_block_readiness(self, fake_steps):
+        """Test that every step is timed and a failure is reported, not fatal."""
+        state = warmup.WarmupState()
+        report = await warmup.warm_up(Configuration(enable_warmup=True, warmup_probe=True), state)
+
+        assert report["ready"] is True
+        assert [s["name"] for s in report["steps"]] == ["runnables", "connections", "mcp_tools", "probe"]
+        assert [s["ok"] for s in report["steps"]] == [True, False, True, True]
+        assert "unreachable" in report["steps"][1]["error"]
+
+    @pytest.mark.asyncio
+    async def test_disabled_warmup_is_ready_immediately(self, fake_steps):
+        """Test that no steps run when warm-up is disabled."""
+        state = warmup.WarmupState()
+        report = await warmup.warm_up(Configuration(enable_warmup=False), state)
+
+        assert report["ready"] is True
+        assert report["steps"] == [] and fake_steps == []
+
+    @pytest.mark.asyncio
+    async def test_readyz_reflects_warmup(self, fake_steps):
+        """Test that the readiness probe fails until warm-up has finished."""
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        async with client:
+            warmup.warmup_state.reset()
+            assert (await client.get("/readyz")).status_code == 503
+
+            await warmup.warm_up(Configuration(enable_warmup=True, warmup_probe=False))
+            response = await client.get("/readyz")
+
+        assert response.status_code == 200
+        assert len(response.json()["steps"]) == 3